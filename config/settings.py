@@ -48,6 +48,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "movies.middleware.QueryCountMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -77,9 +78,26 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'data' / 'imdb.db',
+        # Une connexion persistante par thread : cache de pages, mmap et requêtes
+        # préparées restent chauds d'une requête HTTP à l'autre
+        'CONN_MAX_AGE': None,
+        'OPTIONS': {
+            # Même valeur que connection_pool.CACHED_STATEMENTS
+            'cached_statements': 256,
+        },
     }
 }
 
+# mmap, cache de pages et tables temporaires en RAM sur chaque connexion
+# (connection_pool.TUNED_PRAGMAS) ; False pour mesurer les réglages par défaut
+SQLITE_TUNED = True
+
+# True si imdb.db a été créée avec create_schema.py --int-ids (movie_id / person_id en INTEGER)
+IMDB_INT_IDS = False
+
+# En-têtes X-SQL-Queries / X-Mongo-Operations sur chaque réponse (test de charge)
+QUERY_COUNT_HEADERS = DEBUG
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
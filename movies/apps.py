@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class MoviesConfig(AppConfig):
     name = "movies"
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+        from movies.services.sqlite_service import reopen_if_swapped, tune_connection
+
+        # Bascule sur la nouvelle base après une reconstruction atomique
+        request_started.connect(reopen_if_swapped)
+        # mmap et cache de pages sur chaque nouvelle connexion SQLite
+        connection_created.connect(tune_connection)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import models
+
+from scripts.phase1_sqlite.imdb_ids import to_int, to_text
+
+
+class ImdbIdField(models.TextField):
+    """
+    Identifiant IMDB toujours manipulé sous forme texte (tt0111161) côté Django.
+    Avec une base créée en --int-ids (settings.IMDB_INT_IDS), il est stocké en INTEGER.
+    """
+
+    def __init__(self, *args, prefix="tt", **kwargs):
+        self.prefix = prefix
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["prefix"] = self.prefix
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        return to_text(value, self.prefix)
+
+    def to_python(self, value):
+        return to_text(value, self.prefix)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if getattr(settings, "IMDB_INT_IDS", False) and value:
+            try:
+                return to_int(value)
+            except ValueError:
+                # Identifiant mal formé (URL saisie à la main) : ne correspond à aucune ligne
+                return None
+        return value
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import connection
+
+from movies.services.mongo_service import command_counter
+
+
+class QueryCountMiddleware:
+    """
+    Ajoute à chaque réponse le nombre de requêtes SQL et de commandes MongoDB
+    exécutées pour la produire (en-têtes X-SQL-Queries / X-Mongo-Operations).
+    Lu par scripts/phase4_web/load_test.py ; actif si QUERY_COUNT_HEADERS est vrai.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_COUNT_HEADERS', False):
+            return self.get_response(request)
+
+        sql_queries = 0
+
+        def count_sql(execute, sql, params, many, context):
+            nonlocal sql_queries
+            sql_queries += 1
+            return execute(sql, params, many, context)
+
+        mongo_before = command_counter.count()
+        # execute_wrapper compte aussi sans DEBUG (contrairement à connection.queries)
+        with connection.execute_wrapper(count_sql):
+            response = self.get_response(request)
+
+        response['X-SQL-Queries'] = str(sql_queries)
+        response['X-Mongo-Operations'] = str(command_counter.count() - mongo_before)
+        return response
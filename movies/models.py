@@ -7,6 +7,8 @@
 # Feel free to rename the models, but don't rename db_table values or field names.
 from django.db import models
 
+from .fields import ImdbIdField
+
 
 class AuthGroup(models.Model):
     name = models.CharField(unique=True, max_length=150)
@@ -149,8 +151,24 @@ class Genres(models.Model):
         db_table = 'genres'
 
 
+class Leaderboards(models.Model):
+    pk = models.CompositePrimaryKey(
+        'min_votes', 'genre', 'decade', 'average_rating', 'num_votes', 'movie_id'
+    )
+    min_votes = models.IntegerField(blank=True)
+    genre = models.TextField(blank=True)
+    decade = models.IntegerField(blank=True)
+    average_rating = models.FloatField(blank=True)
+    num_votes = models.IntegerField(blank=True)
+    movie = models.ForeignKey('Movies', models.DO_NOTHING, blank=True, related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'leaderboards'
+
+
 class Movies(models.Model):
-    movie_id = models.TextField(primary_key=True, blank=True)
+    movie_id = ImdbIdField(primary_key=True, blank=True, prefix='tt')
     title = models.TextField(blank=True)
     original_title = models.TextField(blank=True)
     year = models.IntegerField(blank=True)
@@ -161,8 +179,40 @@ class Movies(models.Model):
         db_table = 'movies'
 
 
+class PersonCareerDecades(models.Model):
+    pk = models.CompositePrimaryKey('person_id', 'decade')
+    person = models.ForeignKey('Persons', models.DO_NOTHING, blank=True)
+    decade = models.IntegerField(blank=True)
+    movie_count = models.IntegerField(blank=True)
+    rated_count = models.IntegerField(blank=True)
+    rating_sum = models.FloatField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'person_career_decades'
+
+    @property
+    def avg_rating(self):
+        return round(self.rating_sum / self.rated_count, 2) if self.rated_count else None
+
+
+class PersonCareers(models.Model):
+    person = models.OneToOneField('Persons', models.DO_NOTHING, primary_key=True, blank=True)
+    first_year = models.IntegerField(blank=True)
+    last_year = models.IntegerField(blank=True)
+    career_span = models.IntegerField(blank=True)
+    film_count = models.IntegerField(blank=True)
+    first_hit_movie = models.ForeignKey(Movies, models.DO_NOTHING, blank=True, related_name='+')
+    first_hit_year = models.IntegerField(blank=True)
+    films_before_hit = models.IntegerField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'person_careers'
+
+
 class Persons(models.Model):
-    person_id = models.TextField(primary_key=True, blank=True)
+    person_id = ImdbIdField(primary_key=True, blank=True, prefix='nm')
     name = models.TextField(blank=True)
     birth_year = models.IntegerField(blank=True)
     death_year = models.IntegerField(blank=True)
@@ -205,6 +255,54 @@ class Ratings(models.Model):
         db_table = 'ratings'
 
 
+class SummaryCounts(models.Model):
+    name = models.TextField(primary_key=True, blank=True)
+    value = models.IntegerField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'summary_counts'
+
+
+class SummaryDecades(models.Model):
+    decade = models.IntegerField(primary_key=True, blank=True)
+    movie_count = models.IntegerField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'summary_decades'
+
+
+class SummaryGenres(models.Model):
+    genre = models.TextField(primary_key=True, blank=True)
+    movie_count = models.IntegerField(blank=True)
+    avg_rating = models.FloatField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'summary_genres'
+
+
+class SummaryRatingHistogram(models.Model):
+    bucket = models.IntegerField(primary_key=True, blank=True)
+    movie_count = models.IntegerField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'summary_rating_histogram'
+
+
+class SummaryTopActors(models.Model):
+    rank = models.IntegerField(primary_key=True, blank=True)
+    person_id = ImdbIdField(blank=True, prefix='nm')
+    name = models.TextField(blank=True)
+    movie_count = models.IntegerField(blank=True)
+
+    class Meta:
+        managed = False
+        db_table = 'summary_top_actors'
+
+
 class Titles(models.Model):
     title_id = models.AutoField(primary_key=True, blank=True)
     movie = models.ForeignKey(Movies, models.DO_NOTHING, blank=True)
@@ -1,8 +1,33 @@
-from pymongo import MongoClient
+import threading
+
+from pymongo import MongoClient, monitoring
 from django.conf import settings
 
 _client = None
 
+
+class CommandCounter(monitoring.CommandListener):
+    """Compte les commandes MongoDB envoyées par chaque thread (find, aggregate, getMore...)"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+    def started(self, event):
+        # pymongo publie l'événement dans le thread qui exécute la commande
+        self._local.count = self.count() + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+command_counter = CommandCounter()
+
 def get_mongo_db():
     """Retourne l'objet Database MongoDB (Singleton)"""
     global _client
@@ -10,11 +35,12 @@ def get_mongo_db():
         # On utilise l'URI définie dans settings.py
         _client = MongoClient(
             settings.MONGO_URI, 
-            serverSelectionTimeoutMS=5000
+            serverSelectionTimeoutMS=5000,
+            event_listeners=[command_counter],
         )
     return _client[settings.MONGO_DB_NAME]
 
 def get_movies_collection():
     """Raccourci vers la collection movies_complete"""
     db = get_mongo_db()
-    return db['movies_complete']
\ No newline at end of file
+    return db['movies_complete']
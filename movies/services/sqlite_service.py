@@ -1,5 +1,14 @@
+import os
+import threading
+
+from django.conf import settings
 from django.db import connection
 
+from scripts.phase1_sqlite.connection_pool import apply_pragmas
+
+# Inode du fichier SQLite vu par la connexion de chaque thread
+_snapshot = threading.local()
+
 def execute_raw_sql(query, params=None):
     """Exécute une requête SQL brute sur la base SQLite"""
     with connection.cursor() as cursor:
@@ -11,4 +20,29 @@ def execute_raw_sql(query, params=None):
                 dict(zip(columns, row)) 
                 for row in cursor.fetchall()
             ]
-        return None
\ No newline at end of file
+        return None
+
+def reopen_if_swapped(sender=None, **kwargs):
+    """
+    Signal request_started : si imdb.db a été remplacée (rebuild.py), la connexion
+    du thread pointe encore sur l'ancien fichier. On la ferme pour que la requête
+    rouvre la nouvelle base.
+    """
+    try:
+        inode = os.stat(connection.settings_dict['NAME']).st_ino
+    except OSError:
+        return
+    previous = getattr(_snapshot, 'inode', None)
+    if previous is not None and previous != inode:
+        connection.close()
+    _snapshot.inode = inode
+
+def tune_connection(sender, connection, **kwargs):
+    """
+    Signal connection_created : mêmes réglages que les connexions des scripts
+    (connection_pool.py). La connexion Django reste en écriture (sessions, admin),
+    mais ne change pas le mode de journal de la base (fixé par rebuild.py).
+    """
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNED', False):
+        return
+    apply_pragmas(connection.connection)
@@ -1,20 +1,36 @@
 from django.shortcuts import render, Http404, get_object_or_404
 from django.http import HttpResponse
 from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
 from django.db.models import Count
-from .models import Movies, Persons, Ratings, Genres, Principals, Directors, Writers
+from .models import (
+    Leaderboards, Movies, Persons, Ratings, Genres, Principals, Directors, Writers,
+    PersonCareers, PersonCareerDecades,
+    SummaryCounts, SummaryDecades, SummaryGenres, SummaryRatingHistogram, SummaryTopActors,
+)
 from movies.services.mongo_service import get_movies_collection
+from scripts.phase1_sqlite.imdb_ids import to_text
+from scripts.phase1_sqlite.leaderboards import ALL_DECADES, ALL_GENRES, LEADERBOARD_SIZE
+from scripts.phase1_sqlite.search_index import search_movies, search_persons
 import random
 
 def home(request):
     """Page d'accueil complète."""
-    # 1. Stats
-    total_movies = Movies.objects.count()
-    total_persons = Persons.objects.count()
-    total_directors = Directors.objects.values('person_id').distinct().count()
+    # 1. Stats (tables de synthèse calculées à l'import, sinon calcul direct)
+    counts = _summary_counts()
+    if counts:
+        total_movies = counts['movies']
+        total_persons = counts['persons']
+        total_directors = counts['directors']
+    else:
+        total_movies = Movies.objects.count()
+        total_persons = Persons.objects.count()
+        total_directors = Directors.objects.values('person_id').distinct().count()
     
-    # 2. Top 10 Films (Mieux notés)
-    top_movies_qs = Ratings.objects.select_related('movie').order_by('-average_rating', '-num_votes')[:6]
+    # 2. Top 10 Films (Mieux notés) : classement global matérialisé, sinon tri des notes
+    top_movies_qs = _leaderboard_top(6)
+    if top_movies_qs is None:
+        top_movies_qs = Ratings.objects.select_related('movie').order_by('-average_rating', '-num_votes')[:6]
     top_movies = _format_movies_for_template(top_movies_qs)
 
     # 3. Films Aléatoires (Suggestion)
@@ -69,7 +85,10 @@ def movie_list(request):
     elif sort_by == '-year':
         movies_qs = movies_qs.order_by('-year')
     elif sort_by == 'rating':
-        movies_qs = movies_qs.order_by('-ratings__average_rating')
+        movies_qs = movies_qs.order_by('-ratings__average_rating', '-ratings__num_votes', '-movie_id')
+        board = _rating_board(genre_filter, year_min, year_max, rating_min)
+        if board is not None:
+            movies_qs = _LeaderboardOrder(movies_qs, board)
     
     paginator = Paginator(movies_qs, 20)
     page_obj = paginator.get_page(request.GET.get('page'))
@@ -114,43 +133,13 @@ def movie_detail(request, movie_id):
 
 def stats(request):
     """Stats avec Distribution des notes."""
-    # 1. Genres
-    genres_data = Genres.objects.values('genre').annotate(total=Count('movie_id')).order_by('-total')[:15]
-    genres_labels = [item['genre'] for item in genres_data]
-    genres_counts = [item['total'] for item in genres_data]
-
-    # 2. Decennies
-    years = Movies.objects.values_list('year', flat=True).exclude(year__isnull=True)
-    decades = {}
-    for y in years:
-        decade = (y // 10) * 10
-        decades[decade] = decades.get(decade, 0) + 1
-    sorted_decades = sorted(decades.keys())
-    decades_counts = [decades[d] for d in sorted_decades]
-
-    # 3. Acteurs
-    top_actors_data = Principals.objects.filter(category__in=['actor', 'actress']) \
-        .values('person__name') \
-        .annotate(count=Count('movie_id')) \
-        .order_by('-count')[:10]
-    actors_labels = [item['person__name'] for item in top_actors_data]
-    actors_counts = [item['count'] for item in top_actors_data]
-
-    # 4. Distribution des notes
-    ratings = Ratings.objects.values_list('average_rating', flat=True).exclude(average_rating__isnull=True)
-    rating_dist = {i: 0 for i in range(11)}
-    for r in ratings:
-        rating_dist[int(r)] += 1
-    
-    rating_labels = list(rating_dist.keys())
-    rating_counts = list(rating_dist.values())
-
-    context = {
-        'genres_labels': genres_labels, 'genres_counts': genres_counts,
-        'decades_labels': sorted_decades, 'decades_counts': decades_counts,
-        'actors_labels': actors_labels, 'actors_counts': actors_counts,
-        'rating_labels': rating_labels, 'rating_counts': rating_counts,
-    }
+    try:
+        context = _stats_from_summaries()
+    except DatabaseError:
+        # Base importée avant les tables de synthèse (summaries.py)
+        context = None
+    if not context:
+        context = _stats_live()
     return render(request, 'movies/stats.html', context)
 
 def search(request):
@@ -160,8 +149,12 @@ def search(request):
     persons_results = []
 
     if query and len(query) > 2:
-        movies_results = Movies.objects.filter(title__icontains=query)[:10]
-        persons_results = Persons.objects.filter(name__icontains=query)[:10]
+        try:
+            movies_results, persons_results = _search_fts(query, 10)
+        except DatabaseError:
+            # Index FTS5 pas encore construit (search_index.py) : recherche historique
+            movies_results = Movies.objects.filter(title__icontains=query)[:10]
+            persons_results = Persons.objects.filter(name__icontains=query)[:10]
 
     context = {'query': query, 'movies': movies_results, 'persons': persons_results}
     return render(request, 'movies/search.html', context)
@@ -187,11 +180,16 @@ def person_detail(request, person_id):
         .select_related('movie')\
         .order_by('-movie__year')
 
+    # 5. Carrière précalculée à l'import (summaries.py) : lecture par clé primaire
+    career, career_decades = _person_career(person)
+
     context = {
         'person': person,
         'cast_roles': cast_roles,
         'director_roles': director_roles,
         'writer_roles': writer_roles,
+        'career': career,
+        'career_decades': career_decades,
     }
     return render(request, 'movies/person_detail.html', context)
 
@@ -208,6 +206,162 @@ def test_connection(request):
         return HttpResponse(f"Erreur: {e}")
 
 # Utilitaire
+def _summary_counts():
+    """Compteurs globaux matérialisés ({} si les tables de synthèse sont absentes)."""
+    try:
+        return dict(SummaryCounts.objects.values_list('name', 'value'))
+    except DatabaseError:
+        return {}
+
+def _leaderboard_top(limit):
+    """Meilleurs films du classement global (None si la table est absente ou vide)."""
+    try:
+        rows = list(
+            Leaderboards.objects.select_related('movie')
+            .filter(min_votes=0, genre=ALL_GENRES, decade=ALL_DECADES)
+            .order_by('-average_rating', '-num_votes', '-movie')[:limit]
+        )
+    except DatabaseError:
+        return None
+    return rows or None
+
+def _rating_board(genre, year_min, year_max, rating_min):
+    """
+    Classement couvrant les filtres du catalogue (genre, décennie entière, note minimale),
+    ou None si les filtres ne correspondent à aucun classement.
+    """
+    decade = ALL_DECADES
+    if year_min or year_max:
+        try:
+            year_min, year_max = int(year_min), int(year_max)
+        except (TypeError, ValueError):
+            return None
+        if year_min % 10 or year_max != year_min + 9:
+            return None
+        decade = year_min
+    board = Leaderboards.objects.filter(min_votes=0, genre=genre or ALL_GENRES, decade=decade)
+    if rating_min:
+        board = board.filter(average_rating__gte=rating_min)
+    return board.order_by('-average_rating', '-num_votes', '-movie')
+
+class _LeaderboardOrder:
+    """
+    Catalogue trié par note pour le Paginator : les pages comprises dans les
+    LEADERBOARD_SIZE premiers films sont lues dans le classement, les suivantes
+    (et le nombre total de films) dans la requête complète.
+    """
+
+    def __init__(self, movies_qs, board):
+        self.movies_qs = movies_qs
+        self.board = board
+
+    def count(self):
+        return self.movies_qs.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and index.stop is not None and index.stop <= LEADERBOARD_SIZE:
+            try:
+                rows = list(self.board.select_related('movie__ratings')[index])
+            except DatabaseError:
+                rows = []
+            # Classement incomplet (table absente, films sans note) : requête complète
+            if len(rows) == index.stop - (index.start or 0):
+                return [row.movie for row in rows]
+        return self.movies_qs[index]
+
+def _person_career(person):
+    """Carrière et décennies d'une personne ((None, []) si les tables sont absentes)."""
+    try:
+        career = PersonCareers.objects.select_related('first_hit_movie').filter(person=person).first()
+        decades = list(PersonCareerDecades.objects.filter(person=person).order_by('decade'))
+    except DatabaseError:
+        return None, []
+    return career, decades
+
+def _stats_from_summaries():
+    """Contexte de la page Statistiques lu dans les tables de synthèse."""
+    genres_data = list(SummaryGenres.objects.order_by('-movie_count')[:15])
+    if not genres_data:
+        return None
+    decades_data = list(SummaryDecades.objects.order_by('decade'))
+    actors_data = list(SummaryTopActors.objects.filter(rank__lte=10).order_by('rank'))
+    rating_dist = {i: 0 for i in range(11)}
+    for item in SummaryRatingHistogram.objects.all():
+        rating_dist[item.bucket] = item.movie_count
+
+    return {
+        'genres_labels': [g.genre for g in genres_data],
+        'genres_counts': [g.movie_count for g in genres_data],
+        'decades_labels': [d.decade for d in decades_data],
+        'decades_counts': [d.movie_count for d in decades_data],
+        'actors_labels': [a.name for a in actors_data],
+        'actors_counts': [a.movie_count for a in actors_data],
+        'rating_labels': list(rating_dist.keys()),
+        'rating_counts': list(rating_dist.values()),
+    }
+
+def _stats_live():
+    """Calcul direct des statistiques (avant le premier calcul des synthèses)."""
+    # 1. Genres
+    genres_data = Genres.objects.values('genre').annotate(total=Count('movie_id')).order_by('-total')[:15]
+    genres_labels = [item['genre'] for item in genres_data]
+    genres_counts = [item['total'] for item in genres_data]
+
+    # 2. Decennies
+    years = Movies.objects.values_list('year', flat=True).exclude(year__isnull=True)
+    decades = {}
+    for y in years:
+        decade = (y // 10) * 10
+        decades[decade] = decades.get(decade, 0) + 1
+    sorted_decades = sorted(decades.keys())
+    decades_counts = [decades[d] for d in sorted_decades]
+
+    # 3. Acteurs
+    top_actors_data = Principals.objects.filter(category__in=['actor', 'actress']) \
+        .values('person__name') \
+        .annotate(count=Count('movie_id')) \
+        .order_by('-count')[:10]
+    actors_labels = [item['person__name'] for item in top_actors_data]
+    actors_counts = [item['count'] for item in top_actors_data]
+
+    # 4. Distribution des notes
+    ratings = Ratings.objects.values_list('average_rating', flat=True).exclude(average_rating__isnull=True)
+    rating_dist = {i: 0 for i in range(11)}
+    for r in ratings:
+        rating_dist[int(r)] += 1
+    
+    rating_labels = list(rating_dist.keys())
+    rating_counts = list(rating_dist.values())
+
+    return {
+        'genres_labels': genres_labels, 'genres_counts': genres_counts,
+        'decades_labels': sorted_decades, 'decades_counts': decades_counts,
+        'actors_labels': actors_labels, 'actors_counts': actors_counts,
+        'rating_labels': rating_labels, 'rating_counts': rating_counts,
+    }
+
+def _search_fts(query, limit):
+    """Recherche via l'index plein texte (search_index.py) : insensible aux accents, classée par bm25."""
+    connection.ensure_connection()
+    # search_index attend une connexion sqlite3 (paramètres « ? ») ; les erreurs
+    # (index absent) sont converties en DatabaseError pour le repli de search()
+    with connection.wrap_database_errors:
+        movie_ids = search_movies(connection.connection, query, limit)
+        person_ids = search_persons(connection.connection, query, limit)
+    # Base en --int-ids : l'index renvoie la partie numérique de l'identifiant
+    movie_ids = [to_text(i, 'tt') for i in movie_ids]
+    person_ids = [to_text(i, 'nm') for i in person_ids]
+    movies = Movies.objects.in_bulk(movie_ids)
+    persons = Persons.objects.in_bulk(person_ids)
+    # in_bulk ne conserve pas l'ordre : on rétablit le classement bm25
+    return (
+        [movies[i] for i in movie_ids if i in movies],
+        [persons[i] for i in person_ids if i in persons],
+    )
+
 def _format_movies_for_template(queryset):
     res = []
     for r in queryset:
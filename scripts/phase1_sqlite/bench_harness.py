@@ -0,0 +1,274 @@
+# Harnais de benchmark Q1-Q9 : échauffement, itérations répétées, percentiles,
+# mesures à froid explicites, résultats JSON et comparaison avec seuil de régression.
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.connection_pool import (
+    TUNINGS,
+    connection_settings,
+    open_readonly,
+)
+
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+
+WARMUP = 2
+ITERATIONS = 10
+COLD_RUNS = 3
+
+# Régression signalée au-delà de +10 % sur la métrique comparée
+THRESHOLD = 0.10
+METRICS = ("p50", "p95", "p99", "mean")
+
+
+def percentile(sorted_values, q):
+    """Percentile q (0-100) par interpolation linéaire, sur des valeurs déjà triées"""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    low, high = math.floor(pos), math.ceil(pos)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+def summarize(samples_ns):
+    """Statistiques (ms) d'une série de mesures en nanosecondes"""
+    values = sorted(ns / 1e6 for ns in samples_ns)
+    return {
+        "n": len(values),
+        "min": values[0],
+        "mean": statistics.fmean(values),
+        "stddev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+    }
+
+
+def measure(func, warmup=WARMUP, iterations=ITERATIONS):
+    """
+    Exécute `func` `warmup` fois sans mesurer, puis `iterations` fois en mesurant.
+    Le ramasse-miettes est suspendu pendant les mesures pour ne pas les bruiter.
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            func()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def drop_page_cache(db_path):
+    """
+    Demande au noyau d'oublier les pages du fichier en cache (posix_fadvise, Linux).
+    Pas besoin d'être root : seules les pages de ce fichier sont concernées.
+    Retourne False si la plateforme ne le permet pas (la mesure reste "connexion neuve").
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    dropped = False
+    # data/imdb.db peut être un lien vers la version en service (rebuild.py)
+    db_path = os.path.realpath(db_path)
+    for path in (db_path, f"{db_path}-wal"):
+        if not os.path.exists(path):
+            continue
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            dropped = True
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return dropped
+
+
+def open_connection(db_path, tuning="default"):
+    """Connexion en lecture seule, réglages SQLite par défaut ou TUNED_PRAGMAS"""
+    return open_readonly(db_path, tuning)
+
+
+def run_suite(
+    db_path,
+    tasks_factory,
+    warmup=WARMUP,
+    iterations=ITERATIONS,
+    cold_runs=COLD_RUNS,
+    tuning="default",
+):
+    """
+    Mesure chaque tâche à chaud (connexion partagée, après échauffement) puis à froid
+    (cache de pages vidé et connexion neuve avant chaque exécution).
+    `tasks_factory(conn)` renvoie la liste [(nom, fonction sans argument)].
+    `tuning` : "default" ou "tuned" (connection_pool.py), pour comparer les deux
+    fichiers de résultats avec `compare`.
+    """
+    # Import local : query_plans importe benchmark, qui importe ce module
+    from scripts.phase1_sqlite.query_plans import sqlite_plans
+
+    results = {
+        "meta": {
+            "db_path": os.path.abspath(db_path),
+            "db_size_mb": os.path.getsize(db_path) / (1024 * 1024),
+            "sqlite_version": sqlite3.sqlite_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "warmup": warmup,
+            "iterations": iterations,
+            "cold_runs": cold_runs,
+            "page_cache_dropped": None,
+            "tuning": tuning,
+        },
+        "queries": {},
+    }
+
+    print(f"--- 🔥 À CHAUD ({warmup} échauffements, {iterations} itérations) ---")
+    conn = open_connection(db_path, tuning)
+    results["meta"]["settings"] = connection_settings(conn)
+    for name, func in tasks_factory(conn):
+        stats = summarize(measure(func, warmup, iterations))
+        results["queries"][name] = {"warm": stats}
+        print(
+            f"   👉 {name:<25} : p50 {stats['p50']:8.2f} ms | p95 {stats['p95']:8.2f} ms | "
+            f"σ {stats['stddev']:6.2f} ms"
+        )
+    # Plans stockés avec les temps : compare signale aussi les changements de plan
+    results["plans"] = {"sqlite": sqlite_plans(conn, tasks_factory)}
+    conn.close()
+
+    if cold_runs > 0:
+        print(f"\n--- 🧊 À FROID ({cold_runs} exécutions) ---")
+        names = [name for name, _ in tasks_factory(None)]
+        samples = {name: [] for name in names}
+        dropped = True
+        for _ in range(cold_runs):
+            for index, name in enumerate(names):
+                dropped = drop_page_cache(db_path) and dropped
+                conn = open_connection(db_path, tuning)
+                func = tasks_factory(conn)[index][1]
+                samples[name].extend(measure(func, warmup=0, iterations=1))
+                conn.close()
+        results["meta"]["page_cache_dropped"] = dropped
+        if not dropped:
+            print("   (cache de pages non vidé sur cette plateforme : connexion neuve uniquement)")
+        for name in names:
+            stats = summarize(samples[name])
+            results["queries"][name]["cold"] = stats
+            print(f"   👉 {name:<25} : p50 {stats['p50']:8.2f} ms | max {stats['max']:8.2f} ms")
+
+    return results
+
+
+def compare_results(baseline, current, threshold=THRESHOLD, metric="p50", mode="warm"):
+    """
+    Compare deux fichiers de résultats. Retourne la liste des requêtes dont la
+    métrique a augmenté de plus de `threshold` (0.10 = +10 %).
+    """
+    regressions = []
+    print("\n" + "=" * 85)
+    print(f"{'REQUÊTE':<25} | {'RÉFÉRENCE (ms)':>14} | {'ACTUEL (ms)':>12} | {'ÉCART':>8} |")
+    print("-" * 85)
+    for name, data in current["queries"].items():
+        base = baseline["queries"].get(name, {}).get(mode)
+        if base is None or mode not in data:
+            print(f"{name:<25} | {'-':>14} | {'-':>12} | {'-':>8} | absente de la référence")
+            continue
+        before, after = base[metric], data[mode][metric]
+        delta = (after - before) / before if before > 0 else 0.0
+        flag = ""
+        if delta > threshold:
+            regressions.append(name)
+            flag = "❌ régression"
+        print(f"{name:<25} | {before:14.2f} | {after:12.2f} | {delta:+7.1%} | {flag}")
+    print("=" * 85)
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Harnais de benchmark Q1-Q9")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Mesure Q1-Q9 et écrit les résultats JSON")
+    run_parser.add_argument("--db-path", default=DB_PATH)
+    run_parser.add_argument("--warmup", type=int, default=WARMUP)
+    run_parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    run_parser.add_argument("--cold-runs", type=int, default=COLD_RUNS)
+    run_parser.add_argument("--output", help="Fichier JSON de résultats")
+    run_parser.add_argument(
+        "--tuning",
+        choices=TUNINGS,
+        default="default",
+        help="Réglages des connexions : SQLite par défaut ou mmap/cache (connection_pool.py)",
+    )
+
+    compare_parser = sub.add_parser(
+        "compare", help="Compare deux résultats (code retour 1 si régression)"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    compare_parser.add_argument("--metric", choices=METRICS, default="p50")
+    compare_parser.add_argument("--mode", choices=("warm", "cold"), default="warm")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        from scripts.phase1_sqlite.benchmark import build_tasks
+
+        if not os.path.exists(args.db_path):
+            print(f"❌ Base introuvable : {args.db_path}")
+            sys.exit(1)
+        results = run_suite(
+            args.db_path, build_tasks, args.warmup, args.iterations, args.cold_runs, args.tuning
+        )
+        if args.output:
+            save_results(results, args.output)
+            print(f"\nRésultats écrits dans {args.output}")
+    else:
+        from scripts.phase1_sqlite.query_plans import diff_plans, print_diff
+
+        baseline, current = load_results(args.baseline), load_results(args.current)
+        regressions = compare_results(
+            baseline, current, args.threshold, args.metric, args.mode
+        )
+        plan_changes = diff_plans(baseline.get("plans", {}), current.get("plans", {}))
+        print_diff(plan_changes)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%} : "
+                  f"{', '.join(regressions)}")
+        if plan_changes:
+            print(f"❌ {len(plan_changes)} changement(s) de plan.")
+        if regressions or plan_changes:
+            sys.exit(1)
+        print(f"\n✅ Aucune régression au-delà de {args.threshold:.0%} ({args.metric}).")
@@ -1,5 +1,8 @@
 # T1.4: Indexation et benchmark
+import argparse
+import json
 import sqlite3
+import tempfile
 import time
 import os
 import sys
@@ -10,11 +13,35 @@ sys.path.append(
 )
 
 from scripts.phase1_sqlite import queries
+from scripts.phase1_sqlite.bench_harness import measure, summarize
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
 
+# Paramètres des requêtes, communs à tous les benchmarks (SQLite et MongoDB)
+QUERY_PARAMS = {
+    "actor_q1": "Brad Pitt",
+    "genre": "Action",
+    "year_start": 2000,
+    "year_end": 2010,
+    "top_n": 10,
+    "actor_q4": "Johnny Depp",
+    "actor_q6": "Tom Hanks",
+    "min_votes_q7": 1000,
+}
+
+# Chaque temps affiché est une médiane (p50) ; bench_harness.py pour le détail des percentiles
+WARMUP = 1
+ITERATIONS = 5
+
+# Ablation : une requête compte comme "aidée" si elle ralentit de plus de 10 % sans l'index
+ABLATION_NOISE = 0.10
+ABLATION_ITERATIONS = 15
+# Lignes réinsérées par table pour estimer le surcoût d'un index à l'import
+INSERT_SAMPLE = 100_000
+INSERT_REPEAT = 3
+
 # --- LISTE DES INDEX À CRÉER ---
 INDEXES = [
     # Pour Q1, Q4, Q6, Q8, Q9 (Recherche par nom et filtres par catégorie)
@@ -34,21 +61,61 @@ INDEXES = [
 ]
 
 
-def get_db_size():
+def get_db_size(db_path=DB_PATH):
     """Retourne la taille du fichier DB en Mo"""
-    if os.path.exists(DB_PATH):
-        return os.path.getsize(DB_PATH) / (1024 * 1024)
+    if os.path.exists(db_path):
+        return os.path.getsize(db_path) / (1024 * 1024)
     return 0
 
 
+def build_tasks(conn, params=None, module=queries):
+    """
+    Tâches Q1-Q9 (nom, fonction sans argument) sur la connexion donnée.
+    `module` : queries, ou une variante de même interface (query_cache.CachedQueries).
+    """
+    p = {**QUERY_PARAMS, **(params or {})}
+    return [
+        (
+            "Q1 - Filmographie",
+            lambda: module.query_actor_filmography(conn, p["actor_q1"]),
+        ),
+        (
+            "Q2 - Top N films",
+            lambda: module.query_top_movies_by_genre(
+                conn, p["genre"], p["year_start"], p["year_end"], p["top_n"]
+            ),
+        ),
+        ("Q3 - Multi-rôles", lambda: module.query_multi_role_actors(conn)),
+        (
+            "Q4 - Collaborations",
+            lambda: module.query_director_collaborations(conn, p["actor_q4"]),
+        ),
+        ("Q5 - Genres Pop.", lambda: module.query_popular_genres(conn)),
+        ("Q6 - Carrière", lambda: module.query_actor_career_stats(conn, p["actor_q6"])),
+        (
+            "Q7 - Classement Genre",
+            lambda: module.query_top_3_per_genre(conn, p["min_votes_q7"]),
+        ),
+        ("Q8 - Percée", lambda: module.query_breakthrough_actors(conn)),
+        ("Q9 - Longévité", lambda: module.query_longest_careers(conn)),
+    ]
+
+
+def index_name(idx_sql):
+    """Nom de l'index d'une requête de INDEXES"""
+    return idx_sql.split("INDEX IF NOT EXISTS ")[1].split(" ON")[0]
+
+
+def index_table(idx_sql):
+    return idx_sql.split(" ON ")[1].split("(")[0].strip()
+
+
 def drop_indexes(conn):
     """Supprime tous les index créés pour repartir à zéro"""
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = OFF;")
     for idx_sql in INDEXES:
-        # On extrait le nom de l'index de la requête SQL
-        idx_name = idx_sql.split("INDEX IF NOT EXISTS ")[1].split(" ON")[0]
-        cursor.execute(f"DROP INDEX IF EXISTS {idx_name};")
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name(idx_sql)};")
     conn.commit()
     print("  Index supprimés (État initial)")
 
@@ -72,27 +139,7 @@ def run_benchmark():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
 
-    # --- DÉFINITION DES TÂCHES DE REQUÊTES ---
-    tasks = [
-        (
-            "Q1 - Filmographie",
-            lambda: queries.query_actor_filmography(conn, "Brad Pitt"),
-        ),
-        (
-            "Q2 - Top N films",
-            lambda: queries.query_top_movies_by_genre(conn, "Action", 2000, 2010, 10),
-        ),
-        ("Q3 - Multi-rôles", lambda: queries.query_multi_role_actors(conn)),
-        (
-            "Q4 - Collaborations",
-            lambda: queries.query_director_collaborations(conn, "Johnny Depp"),
-        ),
-        ("Q5 - Genres Pop.", lambda: queries.query_popular_genres(conn)),
-        ("Q6 - Carrière", lambda: queries.query_actor_career_stats(conn, "Tom Hanks")),
-        ("Q7 - Classement Genre", lambda: queries.query_top_3_per_genre(conn)),
-        ("Q8 - Percée", lambda: queries.query_breakthrough_actors(conn)),
-        ("Q9 - Longévité", lambda: queries.query_longest_careers(conn)),
-    ]
+    tasks = build_tasks(conn)
 
     results = {}
 
@@ -102,10 +149,7 @@ def run_benchmark():
     size_before = get_db_size()
 
     for name, func in tasks:
-        start = time.time()
-        # On exécute
-        func()
-        duration_ms = (time.time() - start) * 1000
+        duration_ms = summarize(measure(func, WARMUP, ITERATIONS))["p50"]
         results[name] = {"before": duration_ms}
         print(f"   👉 {name:<25} : {duration_ms:.2f} ms")
 
@@ -115,9 +159,7 @@ def run_benchmark():
     size_after = get_db_size()
 
     for name, func in tasks:
-        start = time.time()
-        func()
-        duration_ms = (time.time() - start) * 1000
+        duration_ms = summarize(measure(func, WARMUP, ITERATIONS))["p50"]
         results[name]["after"] = duration_ms
         print(f"   👉 {name:<25} : {duration_ms:.2f} ms")
 
@@ -147,5 +189,221 @@ def run_benchmark():
     conn.close()
 
 
+def compare_databases(db_a, db_b):
+    """
+    Compare deux variantes de la base (ex : identifiants TEXT vs INTEGER,
+    create_schema.py --int-ids) : taille du fichier et temps de Q1-Q9.
+    """
+    results = {}
+    sizes = {}
+    for label, path in (("A", db_a), ("B", db_b)):
+        if not os.path.exists(path):
+            print(f"❌ Base introuvable : {path}")
+            return
+
+        print(f"\n--- ⏱️  MESURE BASE {label} ({os.path.basename(path)}) ---")
+        sizes[label] = get_db_size(path)
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        for name, func in build_tasks(conn):
+            duration_ms = summarize(measure(func, WARMUP, ITERATIONS))["p50"]
+            results.setdefault(name, {})[label] = duration_ms
+            print(f"   👉 {name:<25} : {duration_ms:.2f} ms")
+        conn.close()
+
+    print("\n" + "=" * 85)
+    print(f"{'REQUÊTE':<25} | {'BASE A (ms)':<15} | {'BASE B (ms)':<15} | {'GAIN (%)':<10}")
+    print("-" * 85)
+    for name, data in results.items():
+        gain = ((data["A"] - data["B"]) / data["A"]) * 100 if data["A"] > 0 else 0
+        print(f"{name:<25} | {data['A']:15.2f} | {data['B']:15.2f} | {gain:+.1f}%")
+    print("=" * 85)
+
+    print(f"\n📦 TAILLE DES BASES :")
+    print(f"   - A : {sizes['A']:.2f} Mo ({db_a})")
+    print(f"   - B : {sizes['B']:.2f} Mo ({db_b})")
+    if sizes["A"] > 0:
+        print(f"   - Écart : {(sizes['B'] - sizes['A']) / sizes['A'] * 100:+.1f}%")
+
+
+def measure_p50(conn, iterations=ITERATIONS):
+    return {
+        name: summarize(measure(func, WARMUP, iterations))["p50"]
+        for name, func in build_tasks(conn)
+    }
+
+
+def insert_overhead(conn, idx_sql, sample=INSERT_SAMPLE):
+    """
+    Surcoût (s) de l'index sur l'import de toute sa table, estimé en réinsérant
+    `sample` lignes (dans l'ordre du fichier, par executemany comme import_data.py)
+    dans une copie vide de la table, sans puis avec l'index.
+    """
+    table = index_table(idx_sql)
+    total_rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    rows = conn.execute(f"SELECT * FROM {table} LIMIT ?", (sample,)).fetchall()
+    if not rows:
+        return 0.0
+    placeholders = ", ".join("?" * len(rows[0]))
+    clone = f"_ablation_{table}"
+    clone_index = idx_sql.replace(f" ON {table}(", f" ON {clone}(").replace(
+        index_name(idx_sql), f"_ablation_{index_name(idx_sql)}"
+    )
+
+    # Meilleur de INSERT_REPEAT essais, sans puis avec l'index
+    durations = {False: [], True: []}
+    for _ in range(INSERT_REPEAT):
+        for with_index in (False, True):
+            conn.execute(f"DROP TABLE IF EXISTS {clone}")
+            conn.execute(f"CREATE TABLE {clone} AS SELECT * FROM {table} WHERE 0")
+            if with_index:
+                conn.execute(clone_index)
+            start = time.perf_counter()
+            conn.executemany(f"INSERT INTO {clone} VALUES ({placeholders})", rows)
+            conn.commit()
+            durations[with_index].append(time.perf_counter() - start)
+    conn.execute(f"DROP TABLE {clone}")
+    conn.commit()
+
+    without_index, with_index = min(durations[False]), min(durations[True])
+    return max(0.0, with_index - without_index) * total_rows / len(rows)
+
+
+def run_ablation(db_path=DB_PATH, output=None):
+    """
+    Ablation des index de INDEXES, sur une copie de la base : on retire les index un
+    par un (les autres restent en place) et on mesure pour chacun le ralentissement
+    de Q1-Q9, sa taille (dbstat), son temps de construction (import fast load) et son
+    surcoût sur les insertions (import en flux). Rapport classé par gain total.
+    """
+    # Import local : index_advisor importe ce module
+    from scripts.phase1_sqlite.index_advisor import capture_workload, index_size_mb, query_plan
+
+    if not os.path.exists(db_path):
+        print(f"❌ Base introuvable : {db_path}")
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print("📋 Copie de travail de la base...")
+        src = sqlite3.connect(db_path)
+        conn = sqlite3.connect(os.path.join(tmp_dir, "ablation.db"))
+        src.backup(conn)
+        src.close()
+        conn.row_factory = sqlite3.Row
+
+        create_indexes(conn)
+        conn.execute("ANALYZE")
+        conn.commit()
+        workload = capture_workload(conn)
+
+        report = []
+        for idx_sql in INDEXES:
+            name = index_name(idx_sql)
+            print(f"\n--- 🔬 {name} ---")
+            size = index_size_mb(conn, name)
+            # Seules les requêtes dont le plan utilise l'index peuvent en dépendre :
+            # un écart sur les autres n'est que du bruit de mesure
+            used_by = [
+                query["name"]
+                for query in workload
+                if any(
+                    name in detail.split()
+                    for detail in query_plan(conn, query["sql"], query["params"])
+                )
+            ]
+            # Référence remesurée juste avant chaque retrait : la dérive (cache, CPU)
+            # ne se confond pas avec l'effet de l'index
+            reference = measure_p50(conn, ABLATION_ITERATIONS)
+            conn.execute(f"DROP INDEX {name}")
+            conn.commit()
+            latencies = measure_p50(conn, ABLATION_ITERATIONS)
+
+            start = time.perf_counter()
+            conn.execute(idx_sql)
+            conn.commit()
+            build_s = time.perf_counter() - start
+            conn.execute(f"ANALYZE {name}")
+            conn.commit()
+
+            deltas = {
+                query: (latencies[query] - ms) / ms if ms > 0 else 0.0
+                for query, ms in reference.items()
+            }
+            helped = [q for q in used_by if deltas[q] > ABLATION_NOISE]
+            entry = {
+                "index": name,
+                "table": index_table(idx_sql),
+                "size_mb": size,
+                "build_s": build_s,
+                "insert_overhead_s": insert_overhead(conn, idx_sql),
+                "latency_with_ms": reference,
+                "latency_without_ms": latencies,
+                "delta": deltas,
+                "used_by": used_by,
+                "gain_ms": sum(latencies[q] - reference[q] for q in helped),
+                "helped": helped,
+            }
+            report.append(entry)
+            for query in helped:
+                print(
+                    f"   👉 {query:<25} : {reference[query]:.2f} -> "
+                    f"{latencies[query]:.2f} ms ({deltas[query]:+.0%})"
+                )
+            if not used_by:
+                print("   Utilisé par aucun plan de Q1-Q9.")
+            elif not helped:
+                print(f"   Utilisé ({len(used_by)} plans) mais aucune requête ralentie sans lui.")
+        conn.close()
+
+    report.sort(key=lambda e: e["gain_ms"], reverse=True)
+
+    print("\n" + "=" * 118)
+    print(
+        f"{'#':>2} | {'INDEX':<24} | {'GAIN (ms)':>15} | {'TAILLE (Mo)':>11} | "
+        f"{'CONSTR. (s)':>11} | {'INSERT. (s)':>11} | REQUÊTES AIDÉES"
+    )
+    print("-" * 118)
+    for rank, entry in enumerate(report, 1):
+        size = f"{entry['size_mb']:.2f}" if entry["size_mb"] is not None else "-"
+        helped = ", ".join(q.split(" - ")[0] for q in entry["helped"]) or "aucune (à retirer ?)"
+        print(
+            f"{rank:>2} | {entry['index']:<24} | {entry['gain_ms']:15.2f} | {size:>11} | "
+            f"{entry['build_s']:11.2f} | {entry['insert_overhead_s']:11.2f} | {helped}"
+        )
+    print("=" * 118)
+    print(
+        f"Gain : temps perdu, quand l'index est retiré (les autres restant en place), par les "
+        f"requêtes dont le plan l'utilise et qui ralentissent de plus de {ABLATION_NOISE:.0%}. "
+        "CONSTR. : création après un "
+        "import fast load ; INSERT. : surcoût estimé d'un import en flux."
+    )
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"indexes": report}, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {output}")
+    return report
+
+
 if __name__ == "__main__":
-    run_benchmark()
+    parser = argparse.ArgumentParser(description="Benchmark Q1-Q9 avec et sans index")
+    # Sans sous-commande : mesure avec et sans index sur la base par défaut
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("run", help="Mesure Q1-Q9 avec et sans index (par défaut)")
+
+    compare_parser = sub.add_parser("compare", help="Compare la taille et Q1-Q9 de deux bases")
+    compare_parser.add_argument("db_a")
+    compare_parser.add_argument("db_b")
+
+    ablation_parser = sub.add_parser("ablation", help="Gain de chaque index de INDEXES")
+    ablation_parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    ablation_parser.add_argument("output", nargs="?", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare_databases(args.db_a, args.db_b)
+    elif args.command == "ablation":
+        run_ablation(args.db_path, args.output)
+    else:
+        run_benchmark()
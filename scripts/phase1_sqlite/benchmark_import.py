@@ -0,0 +1,157 @@
+# Benchmark de l'import : chargement historique (--mode full) vs lecteurs par lots
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.create_schema import TABLES_DDL
+from scripts.phase1_sqlite.import_data import (
+    CHUNK_SIZE,
+    CSV_DIR,
+    TABLES_CONFIG,
+    build_insert_sql,
+    prepare_frame,
+    read_typed_chunks,
+)
+
+# Mêmes noms que les modes de import_data.py ; "full" = point de départ historique
+READERS = ("full", "stream", "typed")
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus courant (Mo), None si indisponible (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def iter_batches(reader, csv_path, sql_columns, chunksize):
+    """Lots de lignes prêts pour executemany, selon le lecteur choisi"""
+    if reader == "typed":
+        for columns in read_typed_chunks(csv_path, sql_columns, chunksize):
+            yield list(zip(*columns))
+    elif reader == "full":
+        # Tout le fichier en mémoire, un seul lot (import_table_full)
+        df_final = prepare_frame(pd.read_csv(csv_path, low_memory=False), sql_columns)
+        yield list(df_final.itertuples(index=False, name=None))
+    else:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, low_memory=False):
+            df_final = prepare_frame(chunk, sql_columns)
+            yield list(df_final.itertuples(index=False, name=None))
+
+
+def run_reader(reader, chunksize, csv_dir=CSV_DIR):
+    """Importe tous les CSV dans une base jetable en séparant parsing et insertion"""
+    results = {"reader": reader, "tables": {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = sqlite3.connect(os.path.join(tmp_dir, "bench_import.db"))
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        for _, ddl in TABLES_DDL:
+            conn.execute(ddl)
+
+        for csv_file, table_name, sql_columns in TABLES_CONFIG:
+            csv_path = os.path.join(csv_dir, csv_file)
+            if not os.path.exists(csv_path):
+                continue
+
+            sql = build_insert_sql(table_name, sql_columns)
+            parse_s = insert_s = 0.0
+            rows = 0
+            batches = iter_batches(reader, csv_path, sql_columns, chunksize)
+
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, None)
+                parse_s += time.perf_counter() - start
+                if batch is None:
+                    break
+
+                start = time.perf_counter()
+                conn.executemany(sql, batch)
+                conn.commit()
+                insert_s += time.perf_counter() - start
+                rows += len(batch)
+
+            results["tables"][table_name] = {
+                "rows": rows,
+                "parse_s": round(parse_s, 3),
+                "insert_s": round(insert_s, 3),
+            }
+
+        conn.close()
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def run_benchmark(chunksize=CHUNK_SIZE, output=None, csv_dir=CSV_DIR):
+    # Chaque lecteur tourne dans son propre processus pour isoler le pic mémoire
+    all_results = {}
+    for reader in READERS:
+        print(f"⏱️  Lecteur {reader}...", flush=True)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run", reader,
+             "--chunksize", str(chunksize), "--csv-dir", csv_dir],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        all_results[reader] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print("\n" + "=" * 85)
+    print(
+        f"{'TABLE':<12} | {'LECTEUR':<10} | {'LIGNES':>10} | {'PARSING (s)':>11} | "
+        f"{'INSERTION (s)':>13} | {'TOTAL (s)':>9}"
+    )
+    print("-" * 85)
+    for _, table_name, _ in TABLES_CONFIG:
+        for reader in READERS:
+            stats = all_results[reader]["tables"].get(table_name)
+            if not stats:
+                continue
+            total = stats["parse_s"] + stats["insert_s"]
+            print(
+                f"{table_name:<12} | {reader:<10} | {stats['rows']:>10} | "
+                f"{stats['parse_s']:>11.2f} | {stats['insert_s']:>13.2f} | {total:>9.2f}"
+            )
+    print("=" * 85)
+
+    print("\n📦 PIC MÉMOIRE (RSS) :")
+    for reader in READERS:
+        peak = all_results[reader]["peak_rss_mb"]
+        peak_str = f"{peak:.1f} Mo" if peak is not None else "indisponible"
+        print(f"   - {reader:<10} : {peak_str}")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nRésultats écrits dans {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des lecteurs CSV de l'import")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--csv-dir", default=CSV_DIR, help="Dossier des CSV à importer")
+    parser.add_argument("--run", choices=READERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_reader(args.run, args.chunksize, args.csv_dir)))
+    else:
+        run_benchmark(args.chunksize, args.output, args.csv_dir)
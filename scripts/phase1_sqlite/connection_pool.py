@@ -0,0 +1,191 @@
+# Connexions SQLite partagées par les scripts (queries.py, benchmarks) et réglages
+# de lecture communs avec le site Django (movies/services/sqlite_service.py).
+# Une connexion en lecture seule par thread et par base, ouverte une fois puis
+# réutilisée : les requêtes préparées (cached_statements), le cache de pages et le
+# mmap restent chauds d'un appel à l'autre.
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from urllib.request import pathname2url
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+sys.path.append(BASE_DIR)
+
+# Requêtes préparées gardées par connexion (défaut Python : 128)
+CACHED_STATEMENTS = 256
+
+# Réglages de lecture : fichier projeté en mémoire, 64 Mo de cache de pages,
+# tables temporaires (ORDER BY, requêtes groupées) en RAM
+TUNED_PRAGMAS = (
+    ("mmap_size", 256 * 1024 * 1024),
+    ("cache_size", -64 * 1024),
+    ("temp_store", "MEMORY"),
+)
+
+TUNINGS = ("default", "tuned")
+
+
+def apply_pragmas(conn):
+    """
+    Réglages TUNED_PRAGMAS sur une connexion ouverte (scripts ou Django).
+    Le mode de journal n'en fait pas partie : il est stocké dans le fichier, et
+    seul rebuild.py le change (WAL), sur une base qui n'est pas encore en service.
+    """
+    for name, value in TUNED_PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def open_readonly(db_path, tuning="tuned"):
+    """
+    Connexion URI `mode=ro` : aucune écriture possible sur la base (les tables
+    temporaires restent autorisées). `tuning="default"` garde les réglages par
+    défaut de SQLite, pour comparaison (bench_harness.py --tuning).
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"La base {db_path} est introuvable.")
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    if tuning == "default":
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(
+            uri, uri=True, check_same_thread=False, cached_statements=CACHED_STATEMENTS
+        )
+        apply_pragmas(conn)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def is_open(conn):
+    try:
+        conn.total_changes
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+
+class ConnectionPool:
+    """
+    Une connexion en lecture seule par thread et par base. Une connexion fermée
+    par l'appelant, ou dont le fichier a été remplacé (rebuild.py), est rouverte
+    au prochain get().
+    """
+
+    def __init__(self, tuning="tuned"):
+        self.tuning = tuning
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # [(thread, connexion)] : close_all() depuis n'importe quel thread, et
+        # fermeture des connexions des threads terminés
+        self._connections = []
+
+    def get(self, db_path=DB_PATH):
+        db_path = os.path.abspath(db_path)
+        inode = os.stat(db_path).st_ino
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        entry = connections.get(db_path)
+        if entry is not None and entry[0] == inode and is_open(entry[1]):
+            return entry[1]
+        if entry is not None:
+            self._discard(entry[1])
+
+        conn = open_readonly(db_path, self.tuning)
+        connections[db_path] = (inode, conn)
+        with self._lock:
+            dead = [c for thread, c in self._connections if not thread.is_alive()]
+            self._connections = [
+                (thread, c) for thread, c in self._connections if thread.is_alive()
+            ]
+            self._connections.append((threading.current_thread(), conn))
+        for c in dead:
+            c.close()
+        return conn
+
+    def _discard(self, conn):
+        conn.close()
+        with self._lock:
+            self._connections = [(t, c) for t, c in self._connections if c is not conn]
+
+    def close_all(self):
+        """Ferme les connexions de tous les threads (fin de script, fin de benchmark)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+        # Les threads qui rappellent get() rouvrent une connexion (is_open)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(tuning="tuned"):
+    """Pool partagé du processus, un par réglage"""
+    with _pools_lock:
+        if tuning not in _pools:
+            _pools[tuning] = ConnectionPool(tuning)
+        return _pools[tuning]
+
+
+def get_connection(db_path=DB_PATH, tuning="tuned"):
+    """Connexion en lecture seule du thread courant sur `db_path`"""
+    return get_pool(tuning).get(db_path)
+
+
+def connection_settings(conn):
+    """Réglages effectifs d'une connexion (affichés par le benchmark)"""
+    return {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ("journal_mode", "mmap_size", "cache_size", "temp_store")
+    }
+
+
+if __name__ == "__main__":
+    from scripts.phase1_sqlite.bench_harness import measure, summarize
+    from scripts.phase1_sqlite.benchmark import build_tasks
+
+    parser = argparse.ArgumentParser(
+        description="Q1-Q9 sur connexion neuve à chaque appel vs connexion du pool"
+    )
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    def fresh(index):
+        # Ancien comportement de get_db_connection() : connexion neuve par appel
+        def run():
+            conn = sqlite3.connect(args.db_path)
+            conn.row_factory = sqlite3.Row
+            build_tasks(conn)[index][1]()
+            conn.close()
+
+        return run
+
+    def pooled(index):
+        return lambda: build_tasks(get_connection(args.db_path))[index][1]()
+
+    names = [name for name, _ in build_tasks(None)]
+    print(f"Réglages du pool : {connection_settings(get_connection(args.db_path))}")
+    print(f"\n{'REQUÊTE':<25} | {'CONNEXION NEUVE (ms)':>20} | {'POOL (ms)':>10}")
+    print("-" * 62)
+    start = time.perf_counter()
+    for index, name in enumerate(names):
+        fresh_ms = summarize(measure(fresh(index), 1, args.iterations))["p50"]
+        pooled_ms = summarize(measure(pooled(index), 1, args.iterations))["p50"]
+        print(f"{name:<25} | {fresh_ms:20.2f} | {pooled_ms:10.2f}")
+    get_pool().close_all()
+    print(f"\nTerminé en {time.perf_counter() - start:.2f} s.")
@@ -1,174 +1,296 @@
+import argparse
 import sqlite3
 import os
+import sys
+import time
+
+# Ajout du chemin racine pour importer la liste des index du benchmark
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from scripts.phase1_sqlite.benchmark import INDEXES
+from scripts.phase1_sqlite.imdb_ids import schema_ddl, uses_int_ids
 
 # Chemin vers la base de données
 DB_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "imdb.db"
 )
 
+# Définition des tables (ordre parents -> enfants)
+TABLES_DDL = [
+    # --- 1. Tables Principales ---
+    # Table MOVIES
+    (
+        "movies",
+        """
+        CREATE TABLE IF NOT EXISTS movies (
+            movie_id TEXT PRIMARY KEY,
+            title TEXT,
+            original_title TEXT,
+            year INTEGER,
+            runtime INTEGER
+        );
+        """,
+    ),
+    # Table PERSONS
+    (
+        "persons",
+        """
+        CREATE TABLE IF NOT EXISTS persons (
+            person_id TEXT PRIMARY KEY,
+            name TEXT,
+            birth_year INTEGER,
+            death_year INTEGER
+        );
+        """,
+    ),
+    # --- 2. Tables de Détails ---
+    # Table RATINGS (1-1 avec movies, donc movie_id est PK)
+    (
+        "ratings",
+        """
+        CREATE TABLE IF NOT EXISTS ratings (
+            movie_id TEXT PRIMARY KEY,
+            average_rating REAL,
+            num_votes INTEGER,
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id)
+        );
+        """,
+    ),
+    # Table TITLES (PK auto-incrémentée car un film a plusieurs titres)
+    (
+        "titles",
+        """
+        CREATE TABLE IF NOT EXISTS titles (
+            title_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            movie_id TEXT,
+            ordering INTEGER,
+            title TEXT,
+            region TEXT,
+            language TEXT,
+            types TEXT,
+            attributes TEXT,
+            is_original_title INTEGER,
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id)
+        );
+        """,
+    ),
+    # Table GENRES (PK Composite)
+    (
+        "genres",
+        """
+        CREATE TABLE IF NOT EXISTS genres (
+            movie_id TEXT,
+            genre TEXT,
+            PRIMARY KEY (movie_id, genre),
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id)
+        );
+        """,
+    ),
+    # --- 3. Tables de Relations (Casting & Crew) ---
+    # Table PRINCIPALS (PK Composite complexe)
+    (
+        "principals",
+        """
+        CREATE TABLE IF NOT EXISTS principals (
+            movie_id TEXT,
+            ordering INTEGER,
+            person_id TEXT,
+            category TEXT,
+            job TEXT,
+            PRIMARY KEY (movie_id, person_id, category, ordering),
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
+            FOREIGN KEY (person_id) REFERENCES persons(person_id)
+        );
+        """,
+    ),
+    # Table CHARACTERS (PK Composite : Film + Acteur + Rôle)
+    (
+        "characters",
+        """
+        CREATE TABLE IF NOT EXISTS characters (
+            movie_id TEXT,
+            person_id TEXT,
+            character_name TEXT,
+            PRIMARY KEY (movie_id, person_id, character_name),
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
+            FOREIGN KEY (person_id) REFERENCES persons(person_id)
+        );
+        """,
+    ),
+    # Table DIRECTORS (PK Composite)
+    (
+        "directors",
+        """
+        CREATE TABLE IF NOT EXISTS directors (
+            movie_id TEXT,
+            person_id TEXT,
+            PRIMARY KEY (movie_id, person_id),
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
+            FOREIGN KEY (person_id) REFERENCES persons(person_id)
+        );
+        """,
+    ),
+    # Table WRITERS (PK Composite)
+    (
+        "writers",
+        """
+        CREATE TABLE IF NOT EXISTS writers (
+            movie_id TEXT,
+            person_id TEXT,
+            PRIMARY KEY (movie_id, person_id),
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
+            FOREIGN KEY (person_id) REFERENCES persons(person_id)
+        );
+        """,
+    ),
+    # Table PROFESSIONS (PK Composite)
+    (
+        "professions",
+        """
+        CREATE TABLE IF NOT EXISTS professions (
+            person_id TEXT,
+            job_name TEXT,
+            PRIMARY KEY (person_id, job_name),
+            FOREIGN KEY (person_id) REFERENCES persons(person_id)
+        );
+        """,
+    ),
+]
+
+# Ordre de tri utilisé lors de la finalisation du mode "fast load" (= clé primaire).
+# None : PK auto-incrémentée, on conserve simplement l'ordre d'insertion.
+PRIMARY_KEYS = {
+    "movies": ["movie_id"],
+    "persons": ["person_id"],
+    "ratings": ["movie_id"],
+    "titles": None,
+    "genres": ["movie_id", "genre"],
+    "principals": ["movie_id", "person_id", "category", "ordering"],
+    "characters": ["movie_id", "person_id", "character_name"],
+    "directors": ["movie_id", "person_id"],
+    "writers": ["movie_id", "person_id"],
+    "professions": ["person_id", "job_name"],
+}
+
 
-def create_schema():
+def create_schema(fast_load=False, db_path=DB_PATH, int_ids=False):
     # Suppression de l'ancienne base pour repartir proprement
-    if os.path.exists(DB_PATH):
+    if os.path.exists(db_path):
         try:
-            os.remove(DB_PATH)
-            print(f"🗑️ Ancienne base supprimée : {DB_PATH}")
+            os.remove(db_path)
+            print(f"🗑️ Ancienne base supprimée : {db_path}")
         except PermissionError:
             print(
-                f"❌ Impossible de supprimer {DB_PATH}. Fermez toute connexion active."
+                f"❌ Impossible de supprimer {db_path}. Fermez toute connexion active."
             )
             return
 
-    print(f"Création de la base de données dans : {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
+    print(f"Création de la base de données dans : {db_path}")
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = ON;")
 
-    # --- 1. Tables Principales ---
+    # int_ids : movie_id / person_id stockés en INTEGER (partie numérique de tt/nm)
+    for _, ddl in TABLES_DDL:
+        cursor.execute(schema_ddl(ddl, int_ids))
 
-    # Table MOVIES
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS movies (
-        movie_id TEXT PRIMARY KEY,
-        title TEXT,
-        original_title TEXT,
-        year INTEGER,
-        runtime INTEGER
-    );
-    """
-    )
+    if fast_load:
+        cursor.execute("PRAGMA foreign_keys = OFF;")
+        create_staging_tables(conn)
 
-    # Table PERSONS
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS persons (
-        person_id TEXT PRIMARY KEY,
-        name TEXT,
-        birth_year INTEGER,
-        death_year INTEGER
-    );
-    """
-    )
+    conn.commit()
+    conn.close()
+    if int_ids:
+        print("   Identifiants movie_id / person_id stockés en INTEGER.")
+    if fast_load:
+        print("✅ Schéma FAST LOAD créé (tables sans clés, finalisées après l'import).")
+    else:
+        print("✅ Nouveau schéma STRICT (PK sur toutes les tables) créé avec succès !")
 
-    # --- 2. Tables de Détails ---
 
-    # Table RATINGS (1-1 avec movies, donc movie_id est PK)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS ratings (
-        movie_id TEXT PRIMARY KEY,
-        average_rating REAL,
-        num_votes INTEGER,
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id)
-    );
+def create_staging_tables(conn):
     """
-    )
-
-    # Table TITLES (PK auto-incrémentée car un film a plusieurs titres)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS titles (
-        title_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        movie_id TEXT,
-        ordering INTEGER,
-        title TEXT,
-        region TEXT,
-        language TEXT,
-        types TEXT,
-        attributes TEXT,
-        is_original_title INTEGER,
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id)
-    );
+    Remplace chaque table par une copie sans PK ni FK (mêmes colonnes et types).
+    L'import y fait alors de simples ajouts en fin de table, sans sonde d'unicité.
     """
-    )
+    cursor = conn.cursor()
+    for table, _ in TABLES_DDL:
+        cursor.execute(f"CREATE TABLE {table}_staging AS SELECT * FROM {table} WHERE 0")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_staging RENAME TO {table}")
+    conn.commit()
 
-    # Table GENRES (PK Composite)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS genres (
-        movie_id TEXT,
-        genre TEXT,
-        PRIMARY KEY (movie_id, genre),
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id)
-    );
-    """
-    )
 
-    # --- 3. Tables de Relations (Casting & Crew) ---
+def is_staging_schema(conn):
+    """Vrai si la base est en mode fast load (table movies créée sans clé primaire)"""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'movies'"
+    ).fetchone()
+    return row is not None and "PRIMARY KEY" not in row[0].upper()
 
-    # Table PRINCIPALS (PK Composite complexe)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS principals (
-        movie_id TEXT,
-        ordering INTEGER,
-        person_id TEXT,
-        category TEXT,
-        job TEXT,
-        PRIMARY KEY (movie_id, person_id, category, ordering),
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
-        FOREIGN KEY (person_id) REFERENCES persons(person_id)
-    );
-    """
-    )
 
-    # Table CHARACTERS (PK Composite : Film + Acteur + Rôle)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS characters (
-        movie_id TEXT,
-        person_id TEXT,
-        character_name TEXT,
-        PRIMARY KEY (movie_id, person_id, character_name),
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
-        FOREIGN KEY (person_id) REFERENCES persons(person_id)
-    );
+def finalize_fast_load(conn):
     """
-    )
-
-    # Table DIRECTORS (PK Composite)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS directors (
-        movie_id TEXT,
-        person_id TEXT,
-        PRIMARY KEY (movie_id, person_id),
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
-        FOREIGN KEY (person_id) REFERENCES persons(person_id)
-    );
+    Construit les tables définitives à partir des tables de staging :
+    dédoublonnage (INSERT OR IGNORE) et tri par clé primaire en une passe,
+    puis création des index du benchmark.
+    À doublon égal, on conserve la première ligne importée (comme l'import direct).
     """
-    )
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA foreign_keys = OFF")
+    int_ids = uses_int_ids(conn)
+    start = time.time()
 
-    # Table WRITERS (PK Composite)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS writers (
-        movie_id TEXT,
-        person_id TEXT,
-        PRIMARY KEY (movie_id, person_id),
-        FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
-        FOREIGN KEY (person_id) REFERENCES persons(person_id)
-    );
-    """
-    )
+    for table, ddl in TABLES_DDL:
+        print(f"  Finalisation de {table}...", end=" ", flush=True)
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_staging")
+        cursor.execute(schema_ddl(ddl, int_ids))
 
-    # Table PROFESSIONS (PK Composite)
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS professions (
-        person_id TEXT,
-        job_name TEXT,
-        PRIMARY KEY (person_id, job_name),
-        FOREIGN KEY (person_id) REFERENCES persons(person_id)
-    );
-    """
-    )
+        # Colonnes alimentées par l'import (la PK auto-incrémentée est régénérée)
+        auto_pk = PRIMARY_KEYS[table] is None
+        columns = [
+            name
+            for _, name, _, _, _, pk in cursor.execute(f"PRAGMA table_info({table})")
+            if not (auto_pk and pk)
+        ]
+        cols = ", ".join(columns)
+        order = ", ".join((PRIMARY_KEYS[table] or []) + ["rowid"])
+
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {table} ({cols}) "
+            f"SELECT {cols} FROM {table}_staging ORDER BY {order}"
+        )
+        cursor.execute(f"DROP TABLE {table}_staging")
+        conn.commit()
+        count = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"{count} lignes")
 
+    print("  Création des index...")
+    for sql in INDEXES:
+        cursor.execute(sql)
     conn.commit()
-    conn.close()
-    print("✅ Nouveau schéma STRICT (PK sur toutes les tables) créé avec succès !")
+
+    # Récupère l'espace libéré par les tables de staging
+    cursor.execute("VACUUM")
+    cursor.execute("PRAGMA foreign_keys = ON")
+    print(f"✅ Tables finalisées en {time.time() - start:.2f} s.")
 
 
 if __name__ == "__main__":
-    create_schema()
+    parser = argparse.ArgumentParser(description="Création du schéma SQLite")
+    parser.add_argument(
+        "--fast-load",
+        action="store_true",
+        help="Tables sans clés pendant l'import, clés et index construits ensuite",
+    )
+    parser.add_argument(
+        "--int-ids",
+        action="store_true",
+        help="movie_id / person_id en INTEGER (tt0111161 -> 111161)",
+    )
+    parser.add_argument("--db-path", default=DB_PATH)
+    args = parser.parse_args()
+
+    create_schema(fast_load=args.fast_load, db_path=args.db_path, int_ids=args.int_ids)
@@ -0,0 +1,121 @@
+# Export d'une requête Q1-Q9 complète (sans la limite des versions de démonstration)
+# vers un fichier CSV / JSON Lines, ou la sortie standard. Les lignes passent par les
+# variantes *_stream : lues par paquets, écrites au fil de l'eau, mémoire constante.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite import queries
+from scripts.phase1_sqlite.benchmark import DB_PATH, QUERY_PARAMS
+from scripts.phase1_sqlite.connection_pool import get_connection
+
+QUERIES = ("Q1", "Q2", "Q3", "Q4", "Q5", "Q6", "Q7", "Q8", "Q9")
+
+
+def sqlite_streams(conn, p):
+    """{Q: fonction(limit, offset, batch_size) -> générateur de lignes}"""
+    return {
+        "Q1": lambda *page: queries.query_actor_filmography_stream(conn, p["actor"], *page),
+        "Q2": lambda *page: queries.query_top_movies_by_genre_stream(
+            conn, p["genre"], p["year_start"], p["year_end"], *page
+        ),
+        "Q3": lambda *page: queries.query_multi_role_actors_stream(conn, *page),
+        "Q4": lambda *page: queries.query_director_collaborations_stream(conn, p["actor"], *page),
+        "Q5": lambda *page: queries.query_popular_genres_stream(conn, *page),
+        "Q6": lambda *page: queries.query_actor_career_stats_stream(conn, p["actor"], *page),
+        "Q7": lambda *page: queries.query_top_3_per_genre_stream(conn, p["min_votes"], *page),
+        "Q8": lambda *page: queries.query_breakthrough_actors_stream(conn, *page),
+        "Q9": lambda *page: queries.query_longest_careers_stream(conn, *page),
+    }
+
+
+def structured_streams(db, p):
+    from scripts.phase2_mongodb import queries_structured as st
+
+    return {
+        "Q1": lambda *page: st.q1_filmography_struct_stream(db, p["actor"], *page),
+        "Q2": lambda *page: st.q2_top_movies_struct_stream(
+            db, p["genre"], p["year_start"], p["year_end"], *page, min_votes=p["min_votes"]
+        ),
+        "Q3": lambda *page: st.q3_multi_roles_struct_stream(db, *page),
+        "Q4": lambda *page: st.q4_collaborations_struct_stream(db, p["actor"], *page),
+        "Q5": lambda *page: st.q5_popular_genres_struct_stream(db, *page),
+        "Q6": lambda *page: st.q6_career_struct_stream(db, p["actor"], *page),
+        "Q7": lambda *page: st.q7_rank_genre_struct_stream(db, p["min_votes"], *page),
+        "Q8": lambda *page: st.q8_breakout_struct_stream(db, *page),
+        "Q9": lambda *page: st.q9_complex_struct_stream(db, *page),
+    }
+
+
+def write_rows(rows, out, fmt="csv"):
+    """Écrit les lignes (sqlite3.Row ou documents) une à une ; retourne leur nombre"""
+    count = 0
+    writer = None
+    for row in rows:
+        record = dict(row) if not isinstance(row, dict) else row
+        if fmt == "jsonl":
+            # default=str : ObjectId des documents MongoDB
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        else:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(record), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(record)
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export en flux d'une requête Q1-Q9")
+    parser.add_argument("query", choices=QUERIES)
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--mongo-uri", help="Lit MongoDB structuré au lieu de SQLite")
+    parser.add_argument("--output", help="Fichier de sortie (défaut : sortie standard)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--limit", type=int, help="Nombre de lignes (défaut : toutes)")
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=queries.STREAM_BATCH_SIZE)
+    parser.add_argument("--actor", default=QUERY_PARAMS["actor_q1"], help="Q1, Q4, Q6")
+    parser.add_argument("--genre", default=QUERY_PARAMS["genre"], help="Q2")
+    parser.add_argument("--year-start", type=int, default=QUERY_PARAMS["year_start"])
+    parser.add_argument("--year-end", type=int, default=QUERY_PARAMS["year_end"])
+    parser.add_argument("--min-votes", type=int, default=QUERY_PARAMS["min_votes_q7"])
+    args = parser.parse_args()
+
+    params = {
+        "actor": args.actor,
+        "genre": args.genre,
+        "year_start": args.year_start,
+        "year_end": args.year_end,
+        "min_votes": args.min_votes,
+    }
+    if args.mongo_uri:
+        import pymongo
+
+        from scripts.phase2_mongodb.queries_structured import DB_NAME
+
+        streams = structured_streams(pymongo.MongoClient(args.mongo_uri)[DB_NAME], params)
+    else:
+        if not os.path.exists(args.db_path):
+            print(f"❌ Erreur : Base {args.db_path} introuvable.", file=sys.stderr)
+            sys.exit(1)
+        streams = sqlite_streams(get_connection(args.db_path), params)
+
+    start = time.perf_counter()
+    rows = streams[args.query](args.limit, args.offset, args.batch_size)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            count = write_rows(rows, out, args.format)
+    else:
+        count = write_rows(rows, sys.stdout, args.format)
+    # Compte rendu sur stderr : la sortie standard peut être redirigée vers un fichier
+    print(
+        f"✅ {args.query} : {count} lignes exportées en {time.perf_counter() - start:.2f} s.",
+        file=sys.stderr,
+    )
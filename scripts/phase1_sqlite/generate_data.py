@@ -0,0 +1,387 @@
+# Générateur de données synthétiques au format IMDB (mêmes CSV que TABLES_CONFIG)
+# pour mesurer le comportement du pipeline à 1x / 10x / 100x la taille de référence.
+# Distributions réalistes : taille des castings, votes et popularité des personnes
+# suivent des lois de puissance (Zipf / Pareto), les genres sont tirés selon une
+# matrice de co-occurrence. Même échelle + même graine = mêmes fichiers.
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.benchmark import QUERY_PARAMS
+from scripts.phase1_sqlite.import_data import COLUMN_MAPPING, TABLES_CONFIG
+
+SYNTH_DIR = os.path.join(BASE_DIR, "data", "synthetic")
+
+# En-têtes des CSV sources (mid, primaryName...) : l'import les renomme via COLUMN_MAPPING
+SOURCE_HEADERS = {sql: source for source, sql in COLUMN_MAPPING.items()}
+
+# Échelle 1 = 10 000 films, 2 personnes par film
+BASE_MOVIES = 10_000
+PERSONS_PER_MOVIE = 2.0
+SEED = 42
+
+# Films générés et écrits par lot (mémoire constante quelle que soit l'échelle)
+BATCH_SIZE = 10_000
+
+# Répartition des personnes par métier principal
+POOL_SHARES = (("actor", 0.55), ("director", 0.10), ("writer", 0.15), ("crew", 0.20))
+
+# Popularité : Zipf-Mandelbrot 1 / (rang + décalage)^exposant. Quelques acteurs
+# tournent dans des centaines de films, la plupart dans un ou deux ; le décalage
+# évite qu'une poignée de noms n'apparaisse dans un film sur trois
+POPULARITY_EXPONENT = 1.0
+POPULARITY_OFFSET = 20
+
+# Taille du casting : Zipf (a=1.6) décalé, bornée comme les principals IMDB
+CAST_EXPONENT = 1.6
+CAST_MIN, CAST_MAX = 1, 8
+
+# Votes : Pareto (queue lourde), la médiane tourne autour d'une centaine de votes
+VOTES_SHAPE = 0.75
+VOTES_SCALE = 30
+VOTES_MAX = 3_000_000
+RATED_SHARE = 0.85
+
+# Titres alternatifs (titles) : Zipf, 1 à 8 par film
+AKAS_EXPONENT = 2.0
+AKAS_MAX = 8
+
+YEAR_MIN, YEAR_MAX = 1900, 2025
+
+# Part de chaque genre comme genre principal
+GENRE_WEIGHTS = {
+    "Drama": 0.26, "Comedy": 0.16, "Action": 0.08, "Documentary": 0.07,
+    "Thriller": 0.06, "Horror": 0.06, "Romance": 0.05, "Crime": 0.05,
+    "Adventure": 0.04, "Animation": 0.03, "Family": 0.03, "Sci-Fi": 0.02,
+    "Mystery": 0.02, "Fantasy": 0.02, "Biography": 0.02, "Music": 0.01,
+    "History": 0.01, "War": 0.005, "Western": 0.005,
+}
+
+# Genres secondaires probables sachant le genre principal (poids relatifs) ;
+# un genre absent de la table tire ses compléments selon GENRE_WEIGHTS
+CO_OCCURRENCE = {
+    "Drama": {"Romance": 5, "Crime": 4, "Comedy": 3, "Biography": 2, "History": 2, "War": 1},
+    "Comedy": {"Romance": 5, "Drama": 4, "Family": 2, "Crime": 1, "Music": 1},
+    "Action": {"Adventure": 5, "Thriller": 4, "Crime": 4, "Sci-Fi": 3, "Fantasy": 1, "War": 1},
+    "Thriller": {"Crime": 5, "Mystery": 4, "Drama": 3, "Horror": 2, "Action": 2},
+    "Horror": {"Thriller": 5, "Mystery": 4, "Fantasy": 1, "Sci-Fi": 1},
+    "Romance": {"Drama": 5, "Comedy": 5, "Music": 1},
+    "Crime": {"Drama": 5, "Thriller": 4, "Mystery": 2, "Action": 2},
+    "Adventure": {"Action": 5, "Fantasy": 3, "Family": 3, "Animation": 2, "Sci-Fi": 2},
+    "Animation": {"Family": 5, "Adventure": 4, "Comedy": 4, "Fantasy": 2},
+    "Family": {"Comedy": 5, "Animation": 3, "Adventure": 3},
+    "Sci-Fi": {"Action": 5, "Adventure": 3, "Thriller": 3, "Horror": 1},
+    "Documentary": {"Biography": 4, "History": 3, "Music": 3},
+    "Biography": {"Drama": 5, "History": 3, "Music": 1},
+}
+GENRE_COUNT_WEIGHTS = (0.45, 0.35, 0.20)
+
+JOBS = {
+    "actor": ("actor", "actress"),
+    "director": ("director",),
+    "writer": ("writer",),
+    "crew": ("producer", "composer", "cinematographer", "editor"),
+}
+
+# Noms : prénoms et noms accentués inclus pour exercer l'index FTS5
+FIRST_NAMES = (
+    "Adam", "Alice", "Amélie", "André", "Anna", "Bruno", "Camille", "Carlos", "Chloé",
+    "Daniel", "Élodie", "Emma", "Ethan", "François", "Grace", "Hugo", "Inès", "Isabel",
+    "Jack", "James", "Jean", "José", "Julia", "Kenji", "Laura", "Léa", "Lucas", "Maria",
+    "Mathis", "Mei", "Noah", "Olivia", "Omar", "Paul", "Rosa", "Sofia", "Søren", "Thomas",
+    "Yuki", "Zoé",
+)
+LAST_NAMES = (
+    "Anderson", "Bernard", "Brown", "Castro", "Chen", "Dubois", "Durand", "Fernández",
+    "Fischer", "García", "Girard", "Hansen", "Ito", "Jensen", "Kim", "Lefèvre", "Lopez",
+    "Martin", "Moreau", "Müller", "Nakamura", "Novák", "Petit", "Rossi", "Russo", "Schmidt",
+    "Silva", "Smith", "Tanaka", "Wagner", "Walker", "Wilson", "Yılmaz", "Zhang",
+)
+
+TITLE_ADJECTIVES = (
+    "Silent", "Broken", "Last", "Hidden", "Golden", "Dark", "Lost", "Red", "Endless",
+    "Wild", "Secret", "Frozen", "Burning", "Little", "Final", "Crimson", "Quiet", "Eternal",
+)
+TITLE_NOUNS = (
+    "River", "City", "Night", "Dream", "Road", "Garden", "Storm", "Island", "Summer",
+    "Kingdom", "Shadow", "Heart", "Mirror", "Train", "Promise", "Winter", "Empire", "Voyage",
+)
+# Titres originaux / alternatifs non anglais : (langue, région, adjectifs, noms)
+LOCAL_WORDS = (
+    ("fr", "FR", ("Dernier", "Secret", "Perdu", "Éternel", "Doré"),
+     ("Été", "Cœur", "Rêve", "Château", "Fleuve")),
+    ("es", "ES", ("Último", "Secreto", "Perdido", "Eterno", "Dorado"),
+     ("Corazón", "Sueño", "Río", "Verano", "Camino")),
+    ("de", "DE", ("Letzte", "Geheime", "Verlorene", "Ewige", "Goldene"),
+     ("Traum", "Fluss", "Sommer", "Straße", "Spiegel")),
+    ("it", "IT", ("Ultimo", "Segreto", "Perduto", "Eterno", "Dorato"),
+     ("Cuore", "Sogno", "Fiume", "Estate", "Strada")),
+    ("ja", "JP", ("Shizuka", "Kieta", "Akai", "Eien", "Kin"),
+     ("Yume", "Kawa", "Natsu", "Kokoro", "Michi")),
+)
+CHARACTER_NAMES = (
+    "Self", "The Detective", "The Doctor", "Narrator", "Mother", "Father", "Captain",
+    "The Stranger", "Professor", "Sheriff", "Lieutenant", "The King", "Nurse",
+)
+MULTI_ROLE_SHARE = 0.03
+
+# Noms recherchés par les benchmarks (Q1, Q4, Q6) : attribués aux acteurs les plus
+# populaires pour que les requêtes aient des résultats à toutes les échelles
+FAMOUS_ACTORS = [value for key, value in QUERY_PARAMS.items() if key.startswith("actor_")]
+
+
+def actor_category(index):
+    """actor / actress selon la personne (les noms des benchmarks sont des acteurs)"""
+    return "actor" if index < len(FAMOUS_ACTORS) or index % 2 == 0 else "actress"
+
+
+def zipf_cdf(size, exponent=POPULARITY_EXPONENT, offset=POPULARITY_OFFSET):
+    """Fonction de répartition d'une loi de Zipf sur `size` rangs (rang 0 = le plus tiré)"""
+    weights = 1.0 / (np.arange(1, size + 1) + offset) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def bounded_zipf(rng, exponent, low, high, size):
+    """Tirages Zipf ramenés dans [low, high]"""
+    return np.minimum(rng.zipf(exponent, size) + (low - 1), high)
+
+
+def person_pools(n_persons):
+    """Plages d'indices de personnes par métier principal : {métier: (début, taille)}"""
+    pools = {}
+    start = 0
+    for index, (role, share) in enumerate(POOL_SHARES):
+        size = n_persons - start if index == len(POOL_SHARES) - 1 else int(n_persons * share)
+        pools[role] = (start, max(size, 1))
+        start += size
+    return pools
+
+
+class PersonSampler:
+    """Tirage de personnes d'un métier selon leur popularité (Zipf sur le rang)"""
+
+    def __init__(self, rng, start, size):
+        self.rng = rng
+        self.start = start
+        self.cdf = zipf_cdf(size)
+
+    def draw(self, count):
+        """`count` personnes distinctes (moins si le tirage retombe sur les mêmes)"""
+        picks = np.searchsorted(self.cdf, self.rng.random(count * 2), side="right")
+        return list(dict.fromkeys(int(p) + self.start for p in picks))[:count]
+
+
+def format_id(prefix, index):
+    return f"{prefix}{index + 1:07d}"
+
+
+def pick_genres(rng, count):
+    genres = list(GENRE_WEIGHTS)
+    weights = np.array(list(GENRE_WEIGHTS.values()))
+    chosen = [genres[rng.choice(len(genres), p=weights / weights.sum())]]
+    while len(chosen) < count:
+        related = {g: w for g, w in CO_OCCURRENCE.get(chosen[0], GENRE_WEIGHTS).items()
+                   if g not in chosen}
+        if not related:
+            break
+        names = list(related)
+        probs = np.array(list(related.values()), dtype=float)
+        chosen.append(names[rng.choice(len(names), p=probs / probs.sum())])
+    return chosen
+
+
+def make_title(rng):
+    title = f"{rng.choice(TITLE_ADJECTIVES)} {rng.choice(TITLE_NOUNS)}"
+    roll = rng.random()
+    if roll < 0.15:
+        title = f"The {title}"
+    elif roll < 0.22:
+        title = f"{title} {rng.integers(2, 5)}"
+    return title
+
+
+def make_local_title(rng, words):
+    _, _, adjectives, nouns = words
+    return f"{rng.choice(nouns)} {rng.choice(adjectives)}"
+
+
+def open_writers(output_dir):
+    """Un csv.writer par table, colonnes dans l'ordre de TABLES_CONFIG"""
+    os.makedirs(output_dir, exist_ok=True)
+    files, writers = {}, {}
+    for csv_file, table_name, sql_columns in TABLES_CONFIG:
+        f = open(os.path.join(output_dir, csv_file), "w", newline="", encoding="utf-8")
+        writer = csv.writer(f)
+        writer.writerow([SOURCE_HEADERS.get(col, col) for col in sql_columns])
+        files[table_name] = f
+        writers[table_name] = writer
+    return files, writers
+
+
+def write_persons(rng, writers, n_persons, pools):
+    actor_start = pools["actor"][0]
+    roles = [(role, start, start + size) for role, (start, size) in pools.items()]
+
+    births = rng.integers(1900, 2006, n_persons)
+    professions = 0
+    for index in range(n_persons):
+        role = next(r for r, start, end in roles if start <= index < end)
+        rank = index - actor_start
+        if role == "actor" and rank < len(FAMOUS_ACTORS):
+            name = FAMOUS_ACTORS[rank]
+        else:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        birth = int(births[index]) if rng.random() < 0.7 else None
+        death = None
+        if birth is not None and birth < 1950 and rng.random() < 0.6:
+            death = int(min(birth + rng.integers(40, 95), YEAR_MAX))
+
+        person_id = format_id("nm", index)
+        writers["persons"].writerow([person_id, name, birth, death])
+
+        jobs = (actor_category(index),) if role == "actor" else JOBS[role]
+        writers["professions"].writerow([person_id, jobs[int(rng.integers(len(jobs)))]])
+        professions += 1
+        if rng.random() < 0.2:
+            other = JOBS[POOL_SHARES[int(rng.integers(len(POOL_SHARES)))][0]]
+            extra = other[int(rng.integers(len(other)))]
+            if extra not in jobs and extra not in JOBS["actor"]:
+                writers["professions"].writerow([person_id, extra])
+                professions += 1
+    return professions
+
+
+def write_movies(rng, writers, n_movies, pools):
+    samplers = {role: PersonSampler(rng, start, size) for role, (start, size) in pools.items()}
+    counts = dict.fromkeys(writers, 0)
+
+    for batch_start in range(0, n_movies, BATCH_SIZE):
+        n = min(BATCH_SIZE, n_movies - batch_start)
+        # Années concentrées sur la période récente, comme le catalogue IMDB
+        years = np.clip(YEAR_MAX - rng.exponential(22, n), YEAR_MIN, YEAR_MAX).astype(int)
+        runtimes = np.clip(rng.normal(100, 22, n), 40, 240).astype(int)
+        votes = np.minimum(
+            (rng.pareto(VOTES_SHAPE, n) + 1) * VOTES_SCALE, VOTES_MAX
+        ).astype(int)
+        # Les films très votés sont en moyenne mieux notés
+        ratings = np.clip(rng.normal(6.2, 1.1, n) + 0.15 * np.log10(votes), 1.0, 10.0)
+        rated = rng.random(n) < RATED_SHARE
+        cast_sizes = bounded_zipf(rng, CAST_EXPONENT, CAST_MIN, CAST_MAX, n)
+        aka_counts = bounded_zipf(rng, AKAS_EXPONENT, 1, AKAS_MAX, n)
+        genre_counts = rng.choice(len(GENRE_COUNT_WEIGHTS), n, p=GENRE_COUNT_WEIGHTS) + 1
+
+        for i in range(n):
+            movie_id = format_id("tt", batch_start + i)
+            title = make_title(rng)
+            original = title
+            if rng.random() < 0.2:
+                original = make_local_title(rng, LOCAL_WORDS[int(rng.integers(len(LOCAL_WORDS)))])
+            runtime = int(runtimes[i]) if rng.random() < 0.95 else None
+            writers["movies"].writerow([movie_id, title, original, int(years[i]), runtime])
+            counts["movies"] += 1
+
+            if rated[i]:
+                writers["ratings"].writerow([movie_id, round(float(ratings[i]), 1), int(votes[i])])
+                counts["ratings"] += 1
+
+            for genre in pick_genres(rng, int(genre_counts[i])):
+                writers["genres"].writerow([movie_id, genre])
+                counts["genres"] += 1
+
+            # Titres alternatifs : l'original d'abord, puis des titres régionaux
+            writers["titles"].writerow([movie_id, 1, original, None, None, "original", None, 1])
+            for ordering in range(2, int(aka_counts[i]) + 1):
+                words = LOCAL_WORDS[int(rng.integers(len(LOCAL_WORDS)))]
+                language, region = words[0], words[1]
+                local = make_local_title(rng, words) if rng.random() < 0.5 else title
+                writers["titles"].writerow(
+                    [movie_id, ordering, local, region, language, "imdbDisplay", None, 0]
+                )
+            counts["titles"] += int(aka_counts[i])
+
+            ordering = 0
+            for person in samplers["actor"].draw(int(cast_sizes[i])):
+                ordering += 1
+                person_id = format_id("nm", person)
+                writers["principals"].writerow(
+                    [movie_id, ordering, person_id, actor_category(person), None]
+                )
+                n_roles = 2 if rng.random() < MULTI_ROLE_SHARE else 1
+                for _ in range(n_roles):
+                    writers["characters"].writerow(
+                        [movie_id, person_id, rng.choice(CHARACTER_NAMES)]
+                    )
+                    counts["characters"] += 1
+
+            for role, table, max_count in (("director", "directors", 2), ("writer", "writers", 3)):
+                # La plupart des films ont un seul réalisateur, souvent plusieurs scénaristes
+                k = int(bounded_zipf(rng, 2.5, 1, max_count, 1)[0])
+                for person in samplers[role].draw(k):
+                    ordering += 1
+                    person_id = format_id("nm", person)
+                    writers[table].writerow([movie_id, person_id])
+                    writers["principals"].writerow([movie_id, ordering, person_id, role, None])
+                    counts[table] += 1
+
+            for person in samplers["crew"].draw(int(rng.integers(0, 3))):
+                ordering += 1
+                writers["principals"].writerow(
+                    [movie_id, ordering, format_id("nm", person), "producer", "producer"]
+                )
+            counts["principals"] += ordering
+
+        print(f"   {batch_start + n:>10,} / {n_movies:,} films", flush=True)
+    return counts
+
+
+def generate(scale=1.0, seed=SEED, output_dir=None):
+    """
+    Écrit les CSV de TABLES_CONFIG pour `scale` fois la taille de référence.
+    Retourne le nombre de lignes écrites par table.
+    """
+    n_movies = max(int(BASE_MOVIES * scale), 1)
+    n_persons = max(int(n_movies * PERSONS_PER_MOVIE), len(POOL_SHARES))
+    output_dir = output_dir or os.path.join(SYNTH_DIR, f"x{scale:g}", "csv")
+
+    rng = np.random.default_rng(seed)
+    pools = person_pools(n_persons)
+
+    print(f"Génération x{scale:g} (graine {seed}) : {n_movies:,} films, "
+          f"{n_persons:,} personnes -> {output_dir}")
+    files, writers = open_writers(output_dir)
+    try:
+        professions = write_persons(rng, writers, n_persons, pools)
+        counts = write_movies(rng, writers, n_movies, pools)
+    finally:
+        for f in files.values():
+            f.close()
+    counts["persons"] = n_persons
+    counts["professions"] = professions
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère des CSV IMDB synthétiques")
+    parser.add_argument(
+        "--scale", type=float, default=1.0,
+        help=f"Facteur d'échelle (1 = {BASE_MOVIES:,} films)",
+    )
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument(
+        "--output-dir", help="Dossier des CSV (défaut : data/synthetic/x<échelle>/csv)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.scale, args.seed, args.output_dir)
+    for table_name, count in counts.items():
+        print(f"✅ {table_name} : {count:,} lignes.")
+    print(f"Données générées en {time.perf_counter() - start:.2f} s.")
@@ -0,0 +1,56 @@
+# Identifiants IMDB : forme texte (tt0111161, nm0000138) <-> partie numérique (111161, 138)
+
+# Colonnes qui portent un identifiant IMDB dans le schéma
+ID_COLUMNS = {"movie_id": "tt", "person_id": "nm"}
+
+# Les identifiants historiques sont complétés à 7 chiffres (les récents en ont 8)
+ID_DIGITS = 7
+
+
+def to_int(imdb_id):
+    """'tt0111161' -> 111161 (None et entiers inchangés)"""
+    if imdb_id is None or isinstance(imdb_id, int):
+        return imdb_id
+    return int(imdb_id[2:])
+
+
+def to_text(value, prefix):
+    """111161 -> 'tt0111161' (None et textes inchangés)"""
+    if value is None or isinstance(value, str):
+        return value
+    return f"{prefix}{value:0{ID_DIGITS}d}"
+
+
+def sql_value(column, expr, int_ids):
+    """
+    Expression SQL qui convertit `expr` (identifiant texte) vers le type stocké.
+    Utilisée dans les INSERT : la conversion est faite par SQLite, pour tous les modes d'import.
+    """
+    if int_ids and column in ID_COLUMNS:
+        return f"CAST(substr({expr}, 3) AS INTEGER)"
+    return expr
+
+
+def schema_ddl(ddl, int_ids):
+    """Variante du DDL avec movie_id / person_id stockés en INTEGER"""
+    if not int_ids:
+        return ddl
+    for column in ID_COLUMNS:
+        ddl = ddl.replace(f"{column} TEXT", f"{column} INTEGER")
+    return ddl
+
+
+def uses_int_ids(conn):
+    """Vrai si la base a été créée avec des identifiants entiers (create_schema --int-ids)"""
+    for row in conn.execute("PRAGMA table_info(movies)"):
+        if row[1] == "movie_id":
+            return row[2].upper().startswith("INT")
+    return False
+
+
+def textualize_row(row):
+    """Document Mongo / dict de ligne : identifiants entiers remis sous forme texte"""
+    for column, prefix in ID_COLUMNS.items():
+        if column in row:
+            row[column] = to_text(row[column], prefix)
+    return row
@@ -1,11 +1,26 @@
+import argparse
+import multiprocessing
 import sqlite3
 import pandas as pd
 import os
 import time
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from queue import Empty
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.create_schema import finalize_fast_load, is_staging_schema
+from scripts.phase1_sqlite.imdb_ids import sql_value, uses_int_ids
+from scripts.phase1_sqlite.leaderboards import build_leaderboards
+from scripts.phase1_sqlite.name_resolver import build_name_index
+from scripts.phase1_sqlite.search_index import build_search_index
+from scripts.phase1_sqlite.summaries import refresh_summaries
+
 DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
 CSV_DIR = os.path.join(BASE_DIR, "data", "csv")
 
@@ -84,18 +99,306 @@ TABLES_CONFIG = [
 ]
 
 
+# Types explicites par colonne pour le lecteur typé (mode "typed").
+# Les colonnes absentes restent en "object" (texte).
+COLUMN_DTYPES = {
+    "year": "Int32",
+    "runtime": "Int32",
+    "birth_year": "Int32",
+    "death_year": "Int32",
+    "num_votes": "Int32",
+    "ordering": "Int32",
+    "is_original_title": "Int32",
+    "average_rating": "float32",
+    "genre": "category",
+    "category": "category",
+    "job_name": "category",
+}
+
+# Les notes IMDB ont une décimale : on arrondit le float32 pour retrouver la valeur du CSV
+FLOAT_DECIMALS = 4
+
+# Taille des lots en mode streaming (lignes lues puis validées par transaction)
+CHUNK_SIZE = 100_000
+
+# Mode parallèle : nombre de lots en attente max entre les workers et l'écrivain SQLite
+QUEUE_MAXSIZE = 8
+
+# Mode parallèle : un CSV plus gros est découpé en tranches d'octets (alignées sur les
+# fins de ligne) lues par des workers différents
+RANGE_BYTES = 64 * 1024 * 1024
+
+IMPORT_MODES = ("stream", "full", "parallel", "typed")
+
+# File partagée avec les workers (initialisée par _init_worker dans chaque processus)
+_batch_queue = None
+
+
 def clean_header(col_name):
     """Nettoie les en-têtes: ('mid',) -> mid"""
     clean = re.sub(r"[()',]", "", str(col_name))
     return clean.strip()
 
 
-def import_data():
-    if not os.path.exists(DB_PATH):
-        print(f"❌ Erreur : Base {DB_PATH} introuvable.")
-        return
+def prepare_frame(df, sql_columns):
+    """Renomme les colonnes d'un DataFrame, complète les manquantes et remplace NaN par None"""
+    df.columns = [clean_header(c) for c in df.columns]
+    df = df.rename(columns=COLUMN_MAPPING)
+
+    # Vérification et Remplissage
+    for col in sql_columns:
+        if col not in df.columns:
+            df[col] = None
+
+    df_final = df[sql_columns]
+    return df_final.where(pd.notnull(df_final), None)
+
+
+def build_insert_sql(table_name, sql_columns, int_ids=False):
+    # int_ids : SQLite convertit lui-même 'tt0111161' -> 111161 à l'insertion
+    placeholders = ", ".join(sql_value(col, "?", int_ids) for col in sql_columns)
+    return f"INSERT OR IGNORE INTO {table_name} ({', '.join(sql_columns)}) VALUES ({placeholders})"
+
+
+def import_table_full(conn, csv_path, table_name, sql_columns):
+    """Import historique : tout le fichier en mémoire puis un seul executemany"""
+    df = pd.read_csv(csv_path, low_memory=False)
+    df_final = prepare_frame(df, sql_columns)
+    data_to_insert = list(df_final.itertuples(index=False, name=None))
+
+    sql = build_insert_sql(table_name, sql_columns, uses_int_ids(conn))
+    conn.executemany(sql, data_to_insert)
+    conn.commit()
+    return len(data_to_insert)
+
+
+def import_table_streaming(conn, csv_path, table_name, sql_columns, chunksize=CHUNK_SIZE):
+    """
+    Import par lots de `chunksize` lignes : un lot est lu, inséré puis validé
+    avant de lire le suivant. La mémoire reste bornée quelle que soit la taille du fichier.
+    """
+    sql = build_insert_sql(table_name, sql_columns, uses_int_ids(conn))
+    total = 0
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, low_memory=False):
+        df_final = prepare_frame(chunk, sql_columns)
+        # Le générateur est consommé directement par executemany (pas de liste intermédiaire)
+        conn.executemany(sql, df_final.itertuples(index=False, name=None))
+        conn.commit()
+        total += len(df_final)
+
+    return total
+
+
+def read_typed_chunks(csv_path, sql_columns, chunksize=CHUNK_SIZE):
+    """
+    Lecteur typé : seules les colonnes utiles sont lues, avec leur type explicite
+    (COLUMN_DTYPES). Produit des lots orientés colonnes (une liste Python par colonne,
+    None pour les valeurs manquantes), prêts pour `executemany(sql, zip(*lot))`.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    renamed = {}
+    for raw in header:
+        name = COLUMN_MAPPING.get(clean_header(raw), clean_header(raw))
+        if name in sql_columns and name not in renamed.values():
+            renamed[raw] = name
+    dtypes = {raw: COLUMN_DTYPES[name] for raw, name in renamed.items() if name in COLUMN_DTYPES}
+
+    for chunk in pd.read_csv(
+        csv_path, usecols=list(renamed), dtype=dtypes, chunksize=chunksize
+    ):
+        chunk = chunk.rename(columns=renamed)
+        size = len(chunk)
+        columns = []
+        for col in sql_columns:
+            if col not in chunk.columns:
+                columns.append([None] * size)
+                continue
+            series = chunk[col]
+            if series.dtype == "float32":
+                series = series.astype("float64").round(FLOAT_DECIMALS)
+            columns.append(series.to_numpy(dtype=object, na_value=None).tolist())
+        yield columns
+
+
+def import_table_typed(conn, csv_path, table_name, sql_columns, chunksize=CHUNK_SIZE):
+    """Import par lots avec le lecteur typé (pas de conversion ligne à ligne via itertuples)"""
+    sql = build_insert_sql(table_name, sql_columns, uses_int_ids(conn))
+    total = 0
 
-    conn = sqlite3.connect(DB_PATH)
+    for columns in read_typed_chunks(csv_path, sql_columns, chunksize):
+        conn.executemany(sql, zip(*columns))
+        conn.commit()
+        total += len(columns[0]) if columns else 0
+
+    return total
+
+
+def _init_worker(queue):
+    global _batch_queue
+    _batch_queue = queue
+
+
+def split_ranges(csv_path, range_bytes=RANGE_BYTES):
+    """
+    Tranches [début, fin) du fichier, en-tête exclu, chacune commençant au début
+    d'une ligne. Suppose une ligne par enregistrement (vrai des exports IMDB :
+    aucun champ ne contient de retour à la ligne).
+    """
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        f.readline()
+        bounds = [f.tell()]
+        while bounds[-1] + range_bytes < size:
+            f.seek(bounds[-1] + range_bytes)
+            f.readline()
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+class _RangeReader:
+    """Fichier binaire limité à [début, fin) : lu directement par pd.read_csv"""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._end = end
+        f.seek(start)
+
+    def read(self, size=-1):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return b""
+        return self._f.read(remaining if size is None or size < 0 else min(size, remaining))
+
+
+def _parse_range_worker(csv_path, start, end, table_name, sql_columns, chunksize):
+    """
+    Worker (processus séparé) : lit et nettoie une tranche d'un CSV par lots, puis
+    envoie chaque lot à l'écrivain. Un lot `None` signale la fin de la tranche.
+    """
+    try:
+        header = list(pd.read_csv(csv_path, nrows=0).columns)
+        with open(csv_path, "rb") as f:
+            chunks = pd.read_csv(
+                _RangeReader(f, start, end),
+                header=None,
+                names=header,
+                chunksize=chunksize,
+                low_memory=False,
+            )
+            for chunk in chunks:
+                df_final = prepare_frame(chunk, sql_columns)
+                _batch_queue.put(
+                    (table_name, list(df_final.itertuples(index=False, name=None)))
+                )
+    except pd.errors.EmptyDataError:
+        # Tranche vide (fichier sans autre ligne que l'en-tête)
+        pass
+    finally:
+        _batch_queue.put((table_name, None))
+
+
+def import_parallel(conn, tables, chunksize=CHUNK_SIZE, workers=None, range_bytes=RANGE_BYTES):
+    """
+    Le parsing des CSV tourne dans un pool de processus ; une seule connexion
+    (celle-ci) écrit dans SQLite en vidant la file bornée au fil de l'eau.
+    Chaque CSV est découpé en tranches de `range_bytes` (split_ranges) : un gros
+    fichier occupe plusieurs workers. Les lots d'une table arrivent donc dans le
+    désordre (title_id des titres alternatifs, premier doublon gardé par
+    INSERT OR IGNORE). L'écriture reste séquentielle : c'est la borne du gain.
+    `tables` : liste de (csv_path, table_name, sql_columns).
+    Retourne (lignes insérées par table, {table en échec: erreur}).
+    """
+    workers = workers or os.cpu_count() or 1
+    queue = multiprocessing.Queue(maxsize=QUEUE_MAXSIZE)
+    int_ids = uses_int_ids(conn)
+    sqls = {table: build_insert_sql(table, cols, int_ids) for _, table, cols in tables}
+    counts = {table: 0 for _, table, _ in tables}
+    jobs = [
+        (path, start, end, table, cols)
+        for path, table, cols in tables
+        for start, end in split_ranges(path, range_bytes)
+    ]
+    # Aucun CSV présent : pas de pool à lancer (ProcessPoolExecutor refuse 0 worker)
+    if not jobs:
+        return counts, {}
+
+    # Tranches restant à recevoir par table, et début de table (premier lot reçu)
+    remaining = {table: 0 for table in counts}
+    for job in jobs:
+        remaining[job[3]] += 1
+    started = {}
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        initializer=_init_worker,
+        initargs=(queue,),
+    ) as pool:
+        futures = {
+            pool.submit(_parse_range_worker, path, start, end, table, cols, chunksize): table
+            for path, start, end, table, cols in jobs
+        }
+
+        pending = set(counts)
+        while pending:
+            try:
+                table_name, rows = queue.get(timeout=1)
+            except Empty:
+                # Un worker tué (OOM...) casse le pool : on ne recevra jamais sa fin de table
+                for future in futures:
+                    if future.done() and isinstance(future.exception(), BrokenProcessPool):
+                        raise future.exception()
+                continue
+
+            now = time.perf_counter()
+            started.setdefault(table_name, now)
+            if rows is None:
+                remaining[table_name] -= 1
+                if remaining[table_name]:
+                    continue
+                pending.discard(table_name)
+                duration = now - started[table_name]
+                rate = counts[table_name] / duration if duration > 0 else 0
+                print(
+                    f"✅ {table_name.upper()} : {counts[table_name]} lignes insérées "
+                    f"en {duration:.2f} s ({rate:,.0f} lignes/s)."
+                )
+                continue
+
+            conn.executemany(sqls[table_name], rows)
+            conn.commit()
+            counts[table_name] += len(rows)
+
+        failures = {}
+        for future, table_name in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Erreur sur {table_name}: {e}")
+                failures.setdefault(table_name, str(e))
+
+    return counts, failures
+
+
+def import_data(
+    mode="stream", chunksize=CHUNK_SIZE, workers=None, db_path=DB_PATH, csv_dir=CSV_DIR
+):
+    """
+    Importe les CSV de `csv_dir` puis construit index et synthèses.
+    Retourne la liste des problèmes rencontrés (fichier manquant, table en
+    échec) : une liste vide signifie que toutes les tables ont été importées.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Mode inconnu : {mode} (attendu : {', '.join(IMPORT_MODES)})")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Erreur : Base {db_path} introuvable.")
+        return [f"base {db_path} introuvable"]
+
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     # Optimisation import
@@ -105,45 +408,87 @@ def import_data():
 
     start_global = time.time()
 
+    problems = []
+    tables = []
     for csv_file, table_name, sql_columns in TABLES_CONFIG:
-        csv_path = os.path.join(CSV_DIR, csv_file)
+        csv_path = os.path.join(csv_dir, csv_file)
 
         if not os.path.exists(csv_path):
             print(f"⏩ Fichier manquant : {csv_file} (Table {table_name} ignorée)")
+            problems.append(f"{csv_file} manquant")
             continue
+        tables.append((csv_path, table_name, sql_columns))
 
-        print(f"\nTraitement de {table_name.upper()} (depuis {csv_file})...")
+    if mode == "parallel":
+        print(f"\nImport parallèle de {len(tables)} tables...")
+        _, failures = import_parallel(conn, tables, chunksize, workers)
+        problems += [f"{table} : {error}" for table, error in failures.items()]
+    else:
+        for csv_path, table_name, sql_columns in tables:
+            csv_file = os.path.basename(csv_path)
+            print(f"\nTraitement de {table_name.upper()} (depuis {csv_file}, mode {mode})...")
 
-        try:
-            df = pd.read_csv(csv_path, low_memory=False)
-            df.columns = [clean_header(c) for c in df.columns]
-            df = df.rename(columns=COLUMN_MAPPING)
+            try:
+                start = time.perf_counter()
+                if mode == "stream":
+                    count = import_table_streaming(
+                        conn, csv_path, table_name, sql_columns, chunksize
+                    )
+                elif mode == "typed":
+                    count = import_table_typed(
+                        conn, csv_path, table_name, sql_columns, chunksize
+                    )
+                else:
+                    count = import_table_full(conn, csv_path, table_name, sql_columns)
+                duration = time.perf_counter() - start
 
-            # Vérification et Remplissage
-            missing_cols = [col for col in sql_columns if col not in df.columns]
-            if missing_cols:
-                for col in missing_cols:
-                    df[col] = None
+                rate = count / duration if duration > 0 else 0
+                print(f"✅ {count} lignes insérées en {duration:.2f} s ({rate:,.0f} lignes/s).")
 
-            df_final = df[sql_columns]
-            df_final = df_final.where(pd.notnull(df_final), None)
+            except Exception as e:
+                print(f"❌ Erreur sur {table_name}: {e}")
+                problems.append(f"{table_name} : {e}")
 
-            data_to_insert = list(df_final.itertuples(index=False, name=None))
+    # Schéma créé avec --fast-load : clés et index sont construits maintenant
+    if is_staging_schema(conn):
+        print("\nFinalisation du schéma fast load...")
+        finalize_fast_load(conn)
 
-            placeholders = ", ".join(["?"] * len(sql_columns))
-            sql = f"INSERT OR IGNORE INTO {table_name} ({', '.join(sql_columns)}) VALUES ({placeholders})"
+    print("\nConstruction de l'index de recherche (FTS5)...")
+    build_search_index(conn)
 
-            cursor.executemany(sql, data_to_insert)
-            conn.commit()
-            print(f"✅ {len(data_to_insert)} lignes insérées.")
+    print("Construction de l'index des noms (préfixes + trigrammes)...")
+    build_name_index(conn)
+
+    print("Calcul des classements par genre et décennie...")
+    build_leaderboards(conn)
 
-        except Exception as e:
-            print(f"❌ Erreur sur {table_name}: {e}")
+    print("Calcul des tables de synthèse...")
+    refresh_summaries(conn)
 
     cursor.execute("PRAGMA foreign_keys = ON")
     conn.close()
     print(f"\n🎉 IMPORT GLOBAL TERMINÉ en {time.time() - start_global:.2f} s.")
+    return problems
 
 
 if __name__ == "__main__":
-    import_data()
+    parser = argparse.ArgumentParser(description="Import des CSV IMDB dans SQLite")
+    parser.add_argument("--mode", choices=IMPORT_MODES, default="stream")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processus de parsing (mode parallel)"
+    )
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument(
+        "--csv-dir", default=CSV_DIR, help="Dossier des CSV (ex. données synthétiques)"
+    )
+    args = parser.parse_args()
+
+    import_data(
+        mode=args.mode,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        db_path=args.db_path,
+        csv_dir=args.csv_dir,
+    )
@@ -0,0 +1,292 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Ajout du chemin racine pour réutiliser la configuration de l'import CSV
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.create_schema import finalize_fast_load, is_staging_schema
+from scripts.phase1_sqlite.imdb_ids import uses_int_ids
+from scripts.phase1_sqlite.import_data import (
+    CHUNK_SIZE,
+    DB_PATH,
+    TABLES_CONFIG,
+    build_insert_sql,
+)
+from scripts.phase1_sqlite.leaderboards import build_leaderboards
+from scripts.phase1_sqlite.name_resolver import build_name_index
+from scripts.phase1_sqlite.search_index import build_search_index
+from scripts.phase1_sqlite.summaries import refresh_summaries
+
+# Dumps officiels (https://datasets.imdbws.com/), laissés compressés
+DUMPS_DIR = os.path.join(BASE_DIR, "data", "imdb")
+
+# Valeur manquante dans les dumps IMDB
+NULL = "\\N"
+
+# Par défaut on ne garde que les films (pas les épisodes, courts-métrages...)
+DEFAULT_TITLE_TYPES = ("movie",)
+
+# Dump qui fixe l'ensemble des films retenus : sans lui, les autres n'importent rien
+TITLE_BASICS = "title.basics.tsv.gz"
+
+# Lignes mal formées montrées en exemple (les autres sont seulement comptées)
+MAX_BAD_EXAMPLES = 3
+
+TABLE_COLUMNS = {table: columns for _, table, columns in TABLES_CONFIG}
+
+# Certains champs (characters, titres alternatifs) dépassent la limite par défaut du module csv
+csv.field_size_limit(1 << 24)
+
+
+def _text(value):
+    return None if value == NULL else value
+
+
+def _int(value):
+    return None if value == NULL else int(value)
+
+
+def _float(value):
+    return None if value == NULL else float(value)
+
+
+def _split(value):
+    """Champ multi-valué 'Drama,Romance' -> ['Drama', 'Romance']"""
+    return [] if value == NULL or not value else value.split(",")
+
+
+# --- Découpage d'une ligne de dump en lignes de tables (table, tuple) ---
+
+
+def split_title_basics(rec, movie_ids):
+    movie = (
+        rec["tconst"],
+        _text(rec["primaryTitle"]),
+        _text(rec["originalTitle"]),
+        _int(rec["startYear"]),
+        _int(rec["runtimeMinutes"]),
+    )
+    # Film retenu seulement si sa ligne est bien formée
+    if movie_ids is not None:
+        movie_ids.add(rec["tconst"])
+    yield "movies", movie
+    for genre in _split(rec["genres"]):
+        yield "genres", (rec["tconst"], genre)
+
+
+def split_name_basics(rec, movie_ids):
+    yield "persons", (
+        rec["nconst"],
+        _text(rec["primaryName"]),
+        _int(rec["birthYear"]),
+        _int(rec["deathYear"]),
+    )
+    for job in _split(rec["primaryProfession"]):
+        yield "professions", (rec["nconst"], job)
+
+
+def split_title_ratings(rec, movie_ids):
+    yield "ratings", (rec["tconst"], _float(rec["averageRating"]), _int(rec["numVotes"]))
+
+
+def split_title_akas(rec, movie_ids):
+    yield "titles", (
+        rec["titleId"],
+        _int(rec["ordering"]),
+        _text(rec["title"]),
+        _text(rec["region"]),
+        _text(rec["language"]),
+        _text(rec["types"]),
+        _text(rec["attributes"]),
+        _int(rec["isOriginalTitle"]),
+    )
+
+
+def split_title_principals(rec, movie_ids):
+    yield "principals", (
+        rec["tconst"],
+        _int(rec["ordering"]),
+        rec["nconst"],
+        _text(rec["category"]),
+        _text(rec["job"]),
+    )
+    # characters est un tableau JSON : ["Woody","Buzz"]
+    if rec["characters"] != NULL:
+        for name in json.loads(rec["characters"]):
+            yield "characters", (rec["tconst"], rec["nconst"], name)
+
+
+def split_title_crew(rec, movie_ids):
+    for person_id in _split(rec["directors"]):
+        yield "directors", (rec["tconst"], person_id)
+    for person_id in _split(rec["writers"]):
+        yield "writers", (rec["tconst"], person_id)
+
+
+# (fichier, colonne identifiant le titre ou None, fonction de découpage)
+# title.basics passe en premier : il fixe l'ensemble des films retenus.
+DUMPS_CONFIG = [
+    (TITLE_BASICS, "tconst", split_title_basics),
+    ("name.basics.tsv.gz", None, split_name_basics),
+    ("title.ratings.tsv.gz", "tconst", split_title_ratings),
+    ("title.akas.tsv.gz", "titleId", split_title_akas),
+    ("title.principals.tsv.gz", "tconst", split_title_principals),
+    ("title.crew.tsv.gz", "tconst", split_title_crew),
+]
+
+
+def iter_dump(path):
+    """Lit un .tsv.gz en flux (décompression à la volée, une ligne à la fois)"""
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        # Les dumps ne sont pas "quotés" : un guillemet dans un titre est un caractère normal
+        yield from csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+
+
+def import_dump(conn, path, id_column, splitter, movie_ids, title_types, batch_size):
+    """
+    Répartit un dump vers ses tables cibles par lots de `batch_size` lignes.
+    Une ligne mal formée (colonnes décalées, nombre illisible) est ignorée et
+    comptée, sans interrompre le dump.
+    Retourne le nombre de lignes insérées par table.
+    """
+    buffers = {}
+    counts = {}
+    bad_rows = 0
+    int_ids = uses_int_ids(conn)
+
+    def flush(table):
+        rows = buffers.pop(table, [])
+        if rows:
+            conn.executemany(build_insert_sql(table, TABLE_COLUMNS[table], int_ids), rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+
+    for rec in iter_dump(path):
+        if splitter is split_title_basics:
+            if title_types and rec["titleType"] not in title_types:
+                continue
+        elif id_column and movie_ids is not None and rec[id_column] not in movie_ids:
+            continue
+
+        try:
+            # Toute la ligne est découpée avant d'être mise en lot : rien de partiel
+            rows = list(splitter(rec, movie_ids))
+        except (ValueError, TypeError) as e:
+            bad_rows += 1
+            if bad_rows <= MAX_BAD_EXAMPLES:
+                print(f"⚠️ Ligne ignorée ({next(iter(rec.values()))}) : {e}")
+            continue
+
+        for table, row in rows:
+            buffer = buffers.setdefault(table, [])
+            buffer.append(row)
+            if len(buffer) >= batch_size:
+                flush(table)
+                conn.commit()
+
+    for table in list(buffers):
+        flush(table)
+    conn.commit()
+    if bad_rows:
+        print(f"⚠️ {bad_rows} lignes mal formées ignorées dans {os.path.basename(path)}.")
+    return counts
+
+
+def import_dumps(
+    dumps_dir=DUMPS_DIR,
+    title_types=DEFAULT_TITLE_TYPES,
+    batch_size=CHUNK_SIZE,
+    db_path=DB_PATH,
+):
+    """
+    Importe les dumps de `dumps_dir` puis construit index et synthèses.
+    Retourne la liste des problèmes rencontrés (dump manquant, dump en échec) :
+    une liste vide signifie que tous les dumps ont été importés.
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Erreur : Base {db_path} introuvable.")
+        return [f"base {db_path} introuvable"]
+
+    # Sans title.basics, les autres dumps seraient filtrés sur un ensemble vide
+    if not os.path.exists(os.path.join(dumps_dir, TITLE_BASICS)):
+        print(f"❌ Erreur : {TITLE_BASICS} introuvable dans {dumps_dir}.")
+        return [f"{TITLE_BASICS} manquant"]
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # Optimisation import
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+    cursor.execute("PRAGMA foreign_keys = OFF")
+
+    # Identifiants des films retenus, pour filtrer les autres dumps
+    movie_ids = set() if title_types else None
+    start_global = time.time()
+
+    problems = []
+    for dump_file, id_column, splitter in DUMPS_CONFIG:
+        path = os.path.join(dumps_dir, dump_file)
+
+        if not os.path.exists(path):
+            print(f"⏩ Dump manquant : {dump_file}")
+            problems.append(f"{dump_file} manquant")
+            continue
+
+        print(f"\nTraitement de {dump_file}...")
+        try:
+            start = time.perf_counter()
+            counts = import_dump(
+                conn, path, id_column, splitter, movie_ids, title_types, batch_size
+            )
+            duration = time.perf_counter() - start
+            for table, count in counts.items():
+                rate = count / duration if duration > 0 else 0
+                print(f"✅ {table.upper()} : {count} lignes ({rate:,.0f} lignes/s).")
+            print(f"   Terminé en {duration:.2f} s.")
+        except Exception as e:
+            print(f"❌ Erreur sur {dump_file}: {e}")
+            problems.append(f"{dump_file} : {e}")
+
+    if is_staging_schema(conn):
+        print("\nFinalisation du schéma fast load...")
+        finalize_fast_load(conn)
+
+    print("\nConstruction de l'index de recherche (FTS5)...")
+    build_search_index(conn)
+
+    print("Construction de l'index des noms (préfixes + trigrammes)...")
+    build_name_index(conn)
+
+    print("Calcul des classements par genre et décennie...")
+    build_leaderboards(conn)
+
+    print("Calcul des tables de synthèse...")
+    refresh_summaries(conn)
+
+    cursor.execute("PRAGMA foreign_keys = ON")
+    conn.close()
+    print(f"\n🎉 IMPORT DES DUMPS TERMINÉ en {time.time() - start_global:.2f} s.")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import direct des dumps IMDB .tsv.gz")
+    parser.add_argument("--dumps-dir", default=DUMPS_DIR)
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument(
+        "--title-types",
+        default=",".join(DEFAULT_TITLE_TYPES),
+        help="Types de titres conservés (ex: movie,tvMovie). Vide = tous.",
+    )
+    parser.add_argument("--batch-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    types = tuple(t for t in args.title_types.split(",") if t)
+    import_dumps(args.dumps_dir, types, args.batch_size, db_path=args.db_path)
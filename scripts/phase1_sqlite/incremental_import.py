@@ -0,0 +1,392 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+# Ajout du chemin racine pour réutiliser la configuration de l'import complet
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.create_schema import PRIMARY_KEYS, is_staging_schema
+from scripts.phase1_sqlite.imdb_ids import ID_COLUMNS, sql_value, to_text, uses_int_ids
+from scripts.phase1_sqlite.import_data import (
+    CHUNK_SIZE,
+    CSV_DIR,
+    DB_PATH,
+    TABLES_CONFIG,
+    prepare_frame,
+)
+from scripts.phase1_sqlite.leaderboards import (
+    INCREMENTAL_LIMIT,
+    LEADERBOARD_SOURCES,
+    build_leaderboards,
+    has_leaderboards,
+    update_leaderboards,
+)
+from scripts.phase1_sqlite.name_resolver import build_name_index
+from scripts.phase1_sqlite.search_index import build_search_index
+from scripts.phase1_sqlite.summaries import refresh_summaries
+
+# Empreintes des fichiers CSV déjà appliqués à la base (à côté de la base : --db-path)
+MANIFEST_NAME = "import_manifest.json"
+MANIFEST_PATH = os.path.join(os.path.dirname(DB_PATH), MANIFEST_NAME)
+
+# Identité d'une ligne pour le calcul du delta (= PK, sauf titles dont la PK est technique)
+ROW_KEYS = {**PRIMARY_KEYS, "titles": ["movie_id", "ordering"]}
+
+# Tables dont une modification impose de reconstruire l'index de recherche
+SEARCH_INDEX_TABLES = {"movies", "titles", "persons"}
+# ... et l'index des noms (popularité = nombre de lignes de principals)
+NAME_INDEX_TABLES = {"persons", "principals"}
+
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-256 d'un fichier, lu par blocs"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _normalize(value):
+    # pandas lit 1994 en 1994.0 dès qu'un lot contient un NaN : même empreinte dans les deux cas
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    # NaN des colonnes numériques de pandas = NULL une fois en base (seed_hashes)
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def row_hash(row):
+    """Empreinte courte du contenu d'une ligne"""
+    normalized = tuple(_normalize(v) for v in row)
+    return hashlib.blake2b(repr(normalized).encode(), digest_size=8).hexdigest()
+
+
+def hash_table_name(table_name):
+    return f"import_hashes_{table_name}"
+
+
+def ensure_hash_table(conn, table_name):
+    """Table des empreintes par ligne : clé de la ligne -> hash du contenu"""
+    keys = ROW_KEYS[table_name]
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {hash_table_name(table_name)} "
+        f"({', '.join(keys)}, row_hash TEXT, PRIMARY KEY ({', '.join(keys)}))"
+    )
+
+
+def drop_duplicate_keys(conn, table_name, keys):
+    """
+    Une PRIMARY KEY SQLite (table avec rowid) laisse passer les doublons dès qu'une
+    colonne de la clé est NULL (character_name absent...) : INSERT OR IGNORE ne les
+    écarte pas. On garde la 1ère ligne de chacune de ces clés, comme pour les autres.
+    """
+    any_null = " OR ".join(f"{k} IS NULL" for k in keys)
+    conn.execute(
+        f"""
+        DELETE FROM {table_name}
+        WHERE ({any_null}) AND rowid NOT IN (
+            SELECT MIN(rowid) FROM {table_name} WHERE {any_null} GROUP BY {', '.join(keys)}
+        )
+        """
+    )
+
+
+def seed_hashes(conn, table_name, sql_columns, batch_size=CHUNK_SIZE):
+    """
+    Premier passage sur une base issue de import_data.py : les empreintes sont
+    calculées depuis le contenu actuel de la table, comme si ses lignes venaient du
+    CSV. Le delta ne contient alors que les vraies différences, au lieu de réécrire
+    toute la table. Retourne le nombre d'empreintes enregistrées.
+    """
+    keys = ROW_KEYS[table_name]
+    hashes = hash_table_name(table_name)
+    key_positions = [sql_columns.index(k) for k in keys]
+    # Les empreintes gardent les identifiants texte du CSV (schéma --int-ids)
+    id_positions = (
+        [(i, ID_COLUMNS[c]) for i, c in enumerate(sql_columns) if c in ID_COLUMNS]
+        if uses_int_ids(conn)
+        else []
+    )
+    insert = (
+        f"INSERT OR IGNORE INTO {hashes} ({', '.join(keys)}, row_hash) "
+        f"VALUES ({', '.join(['?'] * (len(keys) + 1))})"
+    )
+
+    ensure_hash_table(conn, table_name)
+    # Ordre de la table (rowid) : en cas de doublon de clé, la 1ère ligne importée
+    rows = conn.execute(f"SELECT {', '.join(sql_columns)} FROM {table_name}")
+    total = 0
+    while True:
+        batch = rows.fetchmany(batch_size)
+        if not batch:
+            break
+        seeded = []
+        for row in batch:
+            row = list(row)
+            for i, prefix in id_positions:
+                row[i] = to_text(row[i], prefix)
+            seeded.append((*(row[i] for i in key_positions), row_hash(row)))
+        conn.executemany(insert, seeded)
+        total += len(seeded)
+    drop_duplicate_keys(conn, hashes, keys)
+    conn.commit()
+    return total
+
+
+def apply_table_delta(
+    conn, csv_path, table_name, sql_columns, chunksize=CHUNK_SIZE, touched_movies=None
+):
+    """
+    Compare le CSV aux empreintes enregistrées et n'applique que les différences.
+    Retourne (insérées, modifiées, supprimées). Si `touched_movies` (set) est fourni,
+    y ajoute les movie_id (type stocké) des lignes insérées, modifiées ou supprimées.
+    """
+    keys = ROW_KEYS[table_name]
+    hashes = hash_table_name(table_name)
+    key_list = ", ".join(keys)
+    cols = ", ".join(sql_columns)
+    # IS plutôt que = / IN : une clé avec une colonne NULL doit se retrouver elle-même
+    join_on = " AND ".join(f"h.{k} IS i.{k}" for k in keys)
+
+    # Les tables temporaires et d'empreintes gardent les identifiants texte du CSV ;
+    # on ne convertit qu'au contact de la table cible (schéma --int-ids)
+    int_ids = uses_int_ids(conn)
+    target_on = " AND ".join(f"t.{k} IS {sql_value(k, f'd.{k}', int_ids)}" for k in keys)
+    hashes_on = " AND ".join(f"h.{k} IS d.{k}" for k in keys)
+    stored_cols = ", ".join(sql_value(c, c, int_ids) for c in sql_columns)
+
+    ensure_hash_table(conn, table_name)
+
+    # 1. Chargement du CSV dans une table temporaire (1ère occurrence d'une clé conservée)
+    conn.execute("DROP TABLE IF EXISTS temp.incoming")
+    conn.execute(
+        f"CREATE TEMP TABLE incoming ({cols}, row_hash TEXT, PRIMARY KEY ({key_list}))"
+    )
+    placeholders = ", ".join(["?"] * (len(sql_columns) + 1))
+    insert_incoming = f"INSERT OR IGNORE INTO temp.incoming VALUES ({placeholders})"
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, low_memory=False):
+        df_final = prepare_frame(chunk, sql_columns)
+        conn.executemany(
+            insert_incoming,
+            (
+                (*row, row_hash(row))
+                for row in df_final.itertuples(index=False, name=None)
+            ),
+        )
+    drop_duplicate_keys(conn, "temp.incoming", keys)
+
+    # 2. Calcul du delta
+    conn.execute("DROP TABLE IF EXISTS temp.changed")
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE changed AS
+        SELECT i.*, h.row_hash IS NULL AS is_new
+        FROM temp.incoming i
+        LEFT JOIN {hashes} h ON ({join_on})
+        WHERE h.row_hash IS NULL OR h.row_hash != i.row_hash
+        """
+    )
+    conn.execute("DROP TABLE IF EXISTS temp.deleted")
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE deleted AS
+        SELECT {key_list} FROM {hashes} h
+        WHERE NOT EXISTS (SELECT 1 FROM temp.incoming i WHERE {join_on})
+        """
+    )
+
+    inserted, updated = conn.execute(
+        "SELECT COALESCE(SUM(is_new), 0), COALESCE(SUM(1 - is_new), 0) FROM temp.changed"
+    ).fetchone()
+    deleted = conn.execute("SELECT COUNT(*) FROM temp.deleted").fetchone()[0]
+
+    if touched_movies is not None and "movie_id" in keys:
+        movie_id = sql_value("movie_id", "movie_id", int_ids)
+        touched_movies.update(
+            row[0]
+            for row in conn.execute(
+                f"SELECT {movie_id} FROM temp.changed UNION SELECT {movie_id} FROM temp.deleted"
+            )
+        )
+
+    # 3. Application ensembliste : suppression des anciennes versions, puis insertion.
+    # Les clés "nouvelles" sont aussi purgées : au premier passage (empreintes vides),
+    # la ligne peut déjà exister dans la base issue de import_data.py.
+    # Jointure depuis le delta (petit) vers la table, par rowid : l'index de la clé sert
+    conn.execute(
+        f"""
+        DELETE FROM {table_name} WHERE rowid IN (
+            SELECT t.rowid FROM temp.deleted d JOIN {table_name} t ON {target_on}
+            UNION ALL
+            SELECT t.rowid FROM temp.changed d JOIN {table_name} t ON {target_on}
+        )
+        """
+    )
+    conn.execute(
+        f"INSERT OR IGNORE INTO {table_name} ({cols}) SELECT {stored_cols} FROM temp.changed"
+    )
+
+    # Pas d'INSERT OR REPLACE : il ne remplace pas une clé contenant NULL
+    conn.execute(
+        f"""
+        DELETE FROM {hashes} WHERE rowid IN (
+            SELECT h.rowid FROM temp.deleted d JOIN {hashes} h ON {hashes_on}
+            UNION ALL
+            SELECT h.rowid FROM temp.changed d JOIN {hashes} h ON {hashes_on}
+        )
+        """
+    )
+    conn.execute(
+        f"INSERT INTO {hashes} ({key_list}, row_hash) "
+        f"SELECT {key_list}, row_hash FROM temp.changed"
+    )
+    conn.commit()
+
+    for tmp in ("incoming", "changed", "deleted"):
+        conn.execute(f"DROP TABLE temp.{tmp}")
+
+    return inserted, updated, deleted
+
+
+def incremental_import(
+    chunksize=CHUNK_SIZE, force=False, db_path=DB_PATH, csv_dir=CSV_DIR, manifest_path=None
+):
+    """
+    `manifest_path` : par défaut import_manifest.json dans le dossier de la base.
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Erreur : Base {db_path} introuvable.")
+        return
+    manifest_path = manifest_path or os.path.join(os.path.dirname(db_path), MANIFEST_NAME)
+
+    conn = sqlite3.connect(db_path)
+    if is_staging_schema(conn):
+        print("❌ Base en mode fast load non finalisée : lancez d'abord import_data.py.")
+        conn.close()
+        return
+
+    conn.execute("PRAGMA foreign_keys = OFF")
+    manifest = load_manifest(manifest_path)
+    start_global = time.time()
+    reindex = False
+    rebuild_names = False
+    changed = False
+    # Films dont la note, les votes, l'année ou les genres ont changé (classements)
+    touched_movies = set()
+
+    for csv_file, table_name, sql_columns in TABLES_CONFIG:
+        csv_path = os.path.join(csv_dir, csv_file)
+
+        if not os.path.exists(csv_path):
+            print(f"⏩ Fichier manquant : {csv_file} (Table {table_name} ignorée)")
+            continue
+
+        checksum = file_checksum(csv_path)
+        ensure_hash_table(conn, table_name)
+        has_hashes = conn.execute(
+            f"SELECT 1 FROM {hash_table_name(table_name)} LIMIT 1"
+        ).fetchone()
+        if not force and has_hashes and manifest.get(csv_file, {}).get("sha256") == checksum:
+            print(f"= {table_name.upper()} : fichier inchangé.")
+            continue
+        if not has_hashes:
+            seeded = seed_hashes(conn, table_name, sql_columns, chunksize)
+            print(f"   {table_name.upper()} : {seeded} empreintes calculées depuis la base.")
+
+        try:
+            start = time.perf_counter()
+            inserted, updated, deleted = apply_table_delta(
+                conn,
+                csv_path,
+                table_name,
+                sql_columns,
+                chunksize,
+                touched_movies if table_name in LEADERBOARD_SOURCES else None,
+            )
+            duration = time.perf_counter() - start
+            print(
+                f"✅ {table_name.upper()} : +{inserted} / ~{updated} / -{deleted} "
+                f"lignes en {duration:.2f} s."
+            )
+            if inserted or updated or deleted:
+                changed = True
+                reindex = reindex or table_name in SEARCH_INDEX_TABLES
+                rebuild_names = rebuild_names or table_name in NAME_INDEX_TABLES
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Erreur sur {table_name}: {e}")
+            continue
+
+        manifest[csv_file] = {
+            "sha256": checksum,
+            "table": table_name,
+            "applied_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        save_manifest(manifest, manifest_path)
+
+    if reindex:
+        print("\nReconstruction de l'index de recherche (FTS5)...")
+        build_search_index(conn)
+    if rebuild_names:
+        print("Reconstruction de l'index des noms (préfixes + trigrammes)...")
+        build_name_index(conn)
+    if touched_movies:
+        if has_leaderboards(conn) and len(touched_movies) <= INCREMENTAL_LIMIT:
+            print(f"Mise à jour des classements ({len(touched_movies)} films)...")
+            update_leaderboards(conn, touched_movies)
+        else:
+            print("Calcul des classements par genre et décennie...")
+            build_leaderboards(conn)
+    if changed:
+        print("Calcul des tables de synthèse...")
+        refresh_summaries(conn)
+
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.close()
+    print(f"\n🎉 MISE À JOUR INCRÉMENTALE TERMINÉE en {time.time() - start_global:.2f} s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import incrémental des CSV IMDB")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--force", action="store_true", help="Recalcule le delta même si le fichier est inchangé"
+    )
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--csv-dir", default=CSV_DIR)
+    parser.add_argument(
+        "--manifest", help=f"Manifeste des fichiers appliqués (défaut : {MANIFEST_NAME} près de la base)"
+    )
+    args = parser.parse_args()
+
+    incremental_import(
+        chunksize=args.chunksize,
+        force=args.force,
+        db_path=args.db_path,
+        csv_dir=args.csv_dir,
+        manifest_path=args.manifest,
+    )
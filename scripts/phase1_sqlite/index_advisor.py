@@ -0,0 +1,444 @@
+# Conseiller d'index pour la charge Q1-Q9 :
+# analyse des plans (EXPLAIN QUERY PLAN), génération de candidats composites / couvrants,
+# test de chaque candidat sur une copie jetable de la base, puis sélection du plus
+# petit jeu d'index qui respecte un objectif de latence.
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.benchmark import DB_PATH, INDEXES, build_tasks, index_name
+
+# Objectif de latence par requête (ms) et nombre d'exécutions par mesure (médiane)
+TARGET_MS = 100.0
+REPEAT = 3
+
+# Un index n'est retenu que s'il fait gagner au moins 5 % sur les requêtes hors objectif
+MIN_GAIN = 0.05
+
+# Au-delà, un index "couvrant" coûte presque autant que la table
+MAX_INDEX_COLUMNS = 5
+
+# Mots-clés qui peuvent suivre un nom de table à la place d'un alias
+_NOT_ALIASES = {
+    "ON", "WHERE", "JOIN", "LEFT", "INNER", "CROSS", "NATURAL", "USING", "GROUP",
+    "ORDER", "LIMIT", "HAVING", "UNION", "WINDOW", "AS",
+}
+_TABLE_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_COLUMN_RE = re.compile(r"\b(\w+)\.(\w+)\b")
+_EQ_LEFT_RE = re.compile(r"\b(\w+)\.(\w+)\s*(?:=|\bIN\b)", re.IGNORECASE)
+_EQ_RIGHT_RE = re.compile(r"=\s*(\w+)\.(\w+)\b")
+_RANGE_RE = re.compile(r"\b(\w+)\.(\w+)\s*(?:\bBETWEEN\b|<|>)", re.IGNORECASE)
+_SORT_RE = re.compile(
+    r"\b(?:ORDER|GROUP|PARTITION)\s+BY\s+(.*?)(?=\)|\bLIMIT\b|\bHAVING\b|\bORDER\b|;|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+class _RecordingConnection:
+    """Connexion qui garde la trace des requêtes exécutées (SQL + paramètres)"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, params))
+        return self._conn.execute(sql, params)
+
+
+def capture_workload(conn, tasks_factory=build_tasks):
+    """
+    Exécute Q1-Q9 (mêmes paramètres que benchmark.py) et récupère pour chacune
+    la requête SQL réellement envoyée à SQLite.
+    """
+    recorder = _RecordingConnection(conn)
+    workload = []
+    for name, func in tasks_factory(recorder):
+        func()
+        sql, params = recorder.statements[-1]
+        workload.append({"name": name, "sql": sql, "params": tuple(params)})
+    return workload
+
+
+def query_plan(conn, sql, params):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def plan_issues(details, aliases):
+    """Parcours complets de tables, index automatiques et B-trees temporaires"""
+    issues = []
+    for detail in details:
+        words = detail.split()
+        if words[0] == "SCAN" and words[1] in aliases:
+            issues.append(detail)
+        elif "AUTOMATIC" in detail or detail.startswith("USE TEMP B-TREE"):
+            issues.append(detail)
+    return issues
+
+
+def table_aliases(conn, sql):
+    """Alias -> table, pour les vraies tables de la requête (ni CTE, ni FTS5)"""
+    tables = {
+        name
+        for name, ddl in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'")
+        if ddl and not ddl.upper().startswith("CREATE VIRTUAL")
+    }
+    aliases = {}
+    for table, alias in _TABLE_RE.findall(sql):
+        if table not in tables:
+            continue
+        if not alias or alias.upper() in _NOT_ALIASES:
+            alias = table
+        aliases[alias] = table
+    return aliases
+
+
+def column_usage(sql, aliases):
+    """
+    Rôle des colonnes de chaque alias dans la requête :
+    égalités / jointures, intervalles, tris et regroupements, et toutes les colonnes lues.
+    """
+    usage = {alias: {"eq": [], "range": [], "sort": [], "used": []} for alias in aliases}
+
+    def add(kind, alias, column):
+        if alias in usage and column not in usage[alias][kind]:
+            usage[alias][kind].append(column)
+
+    for alias, column in _EQ_LEFT_RE.findall(sql) + _EQ_RIGHT_RE.findall(sql):
+        add("eq", alias, column)
+    for alias, column in _RANGE_RE.findall(sql):
+        add("range", alias, column)
+    for clause in _SORT_RE.findall(sql):
+        for alias, column in _COLUMN_RE.findall(clause):
+            add("sort", alias, column)
+    for alias, column in _COLUMN_RE.findall(sql):
+        add("used", alias, column)
+    return usage
+
+
+def existing_prefixes(conn, table):
+    """Listes de colonnes des index déjà présents (clés primaires comprises)"""
+    prefixes = []
+    for row in conn.execute(f"PRAGMA index_list({table})"):
+        columns = [info[2] for info in conn.execute(f"PRAGMA index_info({row[1]})")]
+        prefixes.append(tuple(columns))
+    return prefixes
+
+
+def propose_candidates(conn, workload):
+    """
+    Candidats par table : colonne d'égalité seule, composite (égalités puis
+    intervalle ou tri) et version couvrante (toutes les colonnes lues).
+    """
+    candidates = {}
+    for query in workload:
+        aliases = query["aliases"]
+        for alias, usage in column_usage(query["sql"], aliases).items():
+            table = aliases[alias]
+            eq, tail = usage["eq"], usage["range"] + usage["sort"]
+            shapes = [(column,) for column in eq]
+            if len(eq) > 1:
+                shapes.append(tuple(eq))
+            for column in tail:
+                shapes.append(tuple(eq) + (column,) if column not in eq else tuple(eq))
+            for shape in list(shapes):
+                covering = shape + tuple(c for c in usage["used"] if c not in shape)
+                if covering != shape:
+                    shapes.append(covering)
+
+            existing = existing_prefixes(conn, table)
+            for shape in shapes:
+                if not shape or len(shape) > MAX_INDEX_COLUMNS:
+                    continue
+                # Déjà servi par un index existant (clé primaire comprise)
+                if any(prefix[: len(shape)] == shape for prefix in existing):
+                    continue
+                name = f"adv_{table}_{'_'.join(shape)}"
+                candidate = candidates.setdefault(
+                    name, {"name": name, "table": table, "columns": shape, "queries": []}
+                )
+                if query["name"] not in candidate["queries"]:
+                    candidate["queries"].append(query["name"])
+    return list(candidates.values())
+
+
+def create_sql(candidate):
+    return (
+        f"CREATE INDEX IF NOT EXISTS {candidate['name']} "
+        f"ON {candidate['table']}({', '.join(candidate['columns'])});"
+    )
+
+
+def index_size_mb(conn, name):
+    """Taille d'un index (Mo) via la table virtuelle dbstat"""
+    try:
+        size = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (name,)).fetchone()[0]
+    except sqlite3.OperationalError:
+        # SQLite compilé sans SQLITE_ENABLE_DBSTAT_VTAB
+        return None
+    return (size or 0) / (1024 * 1024)
+
+
+def time_query(conn, query, repeat):
+    """Latence médiane (ms) d'une requête"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query["sql"], query["params"]).fetchall()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def run_workload(conn, workload, repeat, names=None):
+    return {
+        query["name"]: time_query(conn, query, repeat)
+        for query in workload
+        if names is None or query["name"] in names
+    }
+
+
+def over_target(latencies, target_ms):
+    """Somme des dépassements de l'objectif (ms) : 0 quand tout est dans l'objectif"""
+    return sum(max(0.0, ms - target_ms) for ms in latencies.values())
+
+
+def make_scratch_copy(db_path, scratch_path):
+    """Copie de travail sans index secondaires (seules les clés primaires restent)"""
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(scratch_path)
+    src.backup(dst)
+    src.close()
+
+    dropped = [
+        name
+        for (name,) in dst.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        ).fetchall()
+    ]
+    for name in dropped:
+        dst.execute(f"DROP INDEX {name}")
+    dst.execute("ANALYZE")
+    dst.commit()
+    return dst, dropped
+
+
+def add_index(conn, candidate):
+    conn.execute(create_sql(candidate))
+    conn.execute(f"ANALYZE {candidate['name']}")
+    conn.commit()
+
+
+def drop_index(conn, candidate):
+    conn.execute(f"DROP INDEX IF EXISTS {candidate['name']}")
+    conn.commit()
+
+
+def evaluate_candidates(conn, workload, candidates, baseline, repeat):
+    """Teste chaque candidat seul : utilisé par le planificateur ? gain ? taille ?"""
+    by_name = {query["name"]: query for query in workload}
+    useful = []
+    for candidate in candidates:
+        add_index(conn, candidate)
+        used_by = [
+            name
+            for name in candidate["queries"]
+            if any(
+                candidate["name"] in detail
+                for detail in query_plan(conn, by_name[name]["sql"], by_name[name]["params"])
+            )
+        ]
+        if used_by:
+            latencies = run_workload(conn, workload, repeat, names=used_by)
+            candidate["size_mb"] = index_size_mb(conn, candidate["name"])
+            candidate["gain_ms"] = sum(
+                max(0.0, baseline[name] - ms) for name, ms in latencies.items()
+            )
+            candidate["used_by"] = used_by
+            if candidate["gain_ms"] > 0:
+                useful.append(candidate)
+        drop_index(conn, candidate)
+
+        status = f"gain {candidate['gain_ms']:.1f} ms" if used_by else "ignoré par le planificateur"
+        print(f"   {candidate['name']:<55} : {status}")
+    return useful
+
+
+def select_indexes(conn, workload, useful, baseline, target_ms, repeat):
+    """
+    Sélection gloutonne (meilleur gain par Mo d'abord) jusqu'à respecter l'objectif,
+    puis élagage des index devenus inutiles. Heuristique : le plus petit jeu trouvé,
+    pas un optimum garanti.
+    """
+    chosen = []
+    current = dict(baseline)
+    remaining = sorted(
+        useful, key=lambda c: c["gain_ms"] / max(c["size_mb"] or 0.0, 0.01), reverse=True
+    )
+
+    # Plusieurs passes : un candidat refusé peut devenir utile une fois un autre ajouté
+    added = True
+    while added:
+        added = False
+        for candidate in remaining:
+            excess = over_target(current, target_ms)
+            if excess == 0:
+                break
+            if candidate in chosen:
+                continue
+            slow = {name for name, ms in current.items() if ms > target_ms}
+            if not set(candidate["used_by"]) & slow:
+                continue
+            add_index(conn, candidate)
+            latencies = run_workload(conn, workload, repeat)
+            if over_target(latencies, target_ms) < excess * (1 - MIN_GAIN):
+                chosen.append(candidate)
+                current = latencies
+                added = True
+            else:
+                drop_index(conn, candidate)
+
+    # Un index préfixe d'un autre index retenu sur la même table est redondant
+    for candidate in list(chosen):
+        columns = candidate["columns"]
+        if any(
+            other is not candidate
+            and other["table"] == candidate["table"]
+            and other["columns"][: len(columns)] == columns
+            for other in chosen
+        ):
+            drop_index(conn, candidate)
+            chosen.remove(candidate)
+    current = run_workload(conn, workload, repeat)
+
+    # Élagage : un index ajouté tôt peut être rendu inutile par un suivant.
+    # Référence fixe : les petites pertes tolérées ne se cumulent pas d'un retrait à l'autre.
+    reference = over_target(current, target_ms)
+    for candidate in reversed(list(chosen)):
+        drop_index(conn, candidate)
+        latencies = run_workload(conn, workload, repeat)
+        if over_target(latencies, target_ms) <= reference * (1 + MIN_GAIN):
+            chosen.remove(candidate)
+            current = latencies
+        else:
+            add_index(conn, candidate)
+
+    return chosen, current
+
+
+def measure_hand_written(conn, workload, repeat):
+    """Jeu d'index actuel de benchmark.INDEXES, pour comparaison"""
+    for sql in INDEXES:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+    conn.commit()
+    latencies = run_workload(conn, workload, repeat)
+    names = [index_name(sql) for sql in INDEXES]
+    sizes = {name: index_size_mb(conn, name) for name in names}
+    for name in names:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+    return latencies, sizes
+
+
+def advise(db_path=DB_PATH, target_ms=TARGET_MS, repeat=REPEAT, output=None):
+    if not os.path.exists(db_path):
+        print(f"❌ Base introuvable : {db_path}")
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print("📋 Copie de travail de la base (sans index secondaires)...")
+        conn, dropped = make_scratch_copy(db_path, os.path.join(tmp_dir, "advisor.db"))
+        if dropped:
+            print(f"   Index retirés de la copie : {', '.join(dropped)}")
+
+        workload = capture_workload(conn)
+        print("\n--- 🔍 PLANS D'EXÉCUTION (sans index) ---")
+        for query in workload:
+            query["aliases"] = table_aliases(conn, query["sql"])
+            issues = plan_issues(
+                query_plan(conn, query["sql"], query["params"]), query["aliases"]
+            )
+            print(f"   {query['name']}")
+            for issue in issues or ["aucun parcours complet"]:
+                print(f"      - {issue}")
+
+        print("\n--- ⏱️  MESURE DE RÉFÉRENCE ---")
+        baseline = run_workload(conn, workload, repeat)
+        for name, ms in baseline.items():
+            print(f"   👉 {name:<25} : {ms:.2f} ms")
+
+        hand_latencies, hand_sizes = measure_hand_written(conn, workload, repeat)
+
+        candidates = propose_candidates(conn, workload)
+        print(f"\n--- 🧪 TEST DE {len(candidates)} CANDIDATS ---")
+        useful = evaluate_candidates(conn, workload, candidates, baseline, repeat)
+
+        print(f"\n--- 🎯 SÉLECTION (objectif {target_ms:.0f} ms par requête) ---")
+        chosen, final = select_indexes(conn, workload, useful, baseline, target_ms, repeat)
+        conn.close()
+
+    print("\n" + "=" * 85)
+    print(
+        f"{'REQUÊTE':<25} | {'SANS INDEX (ms)':>15} | {'INDEXES (ms)':>13} | {'CONSEILLÉ (ms)':>14}"
+    )
+    print("-" * 85)
+    for name, ms in baseline.items():
+        flag = "" if final[name] <= target_ms else "  ⚠️ hors objectif"
+        print(
+            f"{name:<25} | {ms:15.2f} | {hand_latencies[name]:13.2f} | {final[name]:14.2f}{flag}"
+        )
+    print("=" * 85)
+
+    chosen_size = sum(c["size_mb"] or 0.0 for c in chosen)
+    hand_size = sum(size or 0.0 for size in hand_sizes.values())
+    print(f"\n📦 INDEX CONSEILLÉS ({len(chosen)}, {chosen_size:.2f} Mo) :")
+    for candidate in chosen:
+        size = candidate["size_mb"]
+        size_str = f"{size:.2f} Mo" if size is not None else "taille inconnue"
+        print(f"   {create_sql(candidate)}  -- {size_str}, {', '.join(candidate['used_by'])}")
+    print(f"\n   Pour comparaison, benchmark.INDEXES : {len(INDEXES)} index, {hand_size:.2f} Mo")
+
+    report = {
+        "target_ms": target_ms,
+        "baseline_ms": baseline,
+        "hand_written": {"latency_ms": hand_latencies, "size_mb": hand_sizes},
+        "advised": {
+            "latency_ms": final,
+            "indexes": [
+                {
+                    "sql": create_sql(c),
+                    "size_mb": c["size_mb"],
+                    "used_by": c["used_by"],
+                }
+                for c in chosen
+            ],
+            "size_mb": chosen_size,
+        },
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRapport écrit dans {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conseiller d'index pour Q1-Q9")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument(
+        "--target-ms", type=float, default=TARGET_MS, help="Objectif de latence par requête"
+    )
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Exécutions par mesure")
+    parser.add_argument("--output", help="Rapport JSON")
+    args = parser.parse_args()
+
+    advise(args.db_path, args.target_ms, args.repeat, args.output)
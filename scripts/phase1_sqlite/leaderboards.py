@@ -0,0 +1,409 @@
+# Classements matérialisés : les meilleurs films (note puis votes) par genre et
+# décennie, par genre, par décennie et tous films confondus.
+# Q7, l'accueil et le tri "Meilleures notes" du catalogue lisent quelques lignes
+# d'un classement au lieu de trier toutes les notes. Après l'import, les
+# classements sont maintenus film par film (update_leaderboards) : seuls les
+# classements du film modifié sont touchés, et un classement tronqué n'est
+# recalculé que s'il passe sous LEADERBOARD_SIZE entrées.
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.imdb_ids import schema_ddl, to_int, to_text, uses_int_ids
+
+LEADERBOARD_TABLE = "leaderboards"
+# Classements dont des films éligibles ont été écartés (plus de LEADERBOARD_CAPACITY)
+TRUNCATED_TABLE = "leaderboards_truncated"
+LEADERBOARD_COLLECTION = "leaderboards"
+
+# Entrées garanties par classement (accueil : 6, Q7 : 3, catalogue : 5 pages de 20)
+LEADERBOARD_SIZE = 100
+# Entrées conservées : la marge absorbe les films qui sortent du classement
+# sans recalcul complet
+LEADERBOARD_CAPACITY = 2 * LEADERBOARD_SIZE
+
+# Un classement par seuil de votes (num_votes > seuil) : 0 pour l'accueil et le
+# catalogue, 1000 pour Q7 (même filtre que query_top_3_per_genre)
+VOTE_THRESHOLDS = (0, 1000)
+
+# Valeurs des classements "tous genres" / "toutes décennies"
+ALL_GENRES = "*"
+ALL_DECADES = 0
+
+# Tables dont une modification déplace des films dans les classements
+LEADERBOARD_SOURCES = {"ratings", "genres", "movies"}
+# Au-delà de ce nombre de films modifiés, un recalcul complet est plus rapide
+INCREMENTAL_LIMIT = 10_000
+
+_ORDER = "average_rating DESC, num_votes DESC, movie_id DESC"
+
+
+def has_leaderboards(conn):
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (LEADERBOARD_TABLE,)
+        ).fetchone()
+        is not None
+    )
+
+
+def decade_of(year):
+    return None if year is None else (year // 10) * 10
+
+
+def board_keys(genres, year):
+    """Classements (genre, décennie) où figure un film"""
+    decade = decade_of(year)
+    keys = []
+    for genre in [ALL_GENRES, *genres]:
+        keys.append((genre, ALL_DECADES))
+        if decade is not None:
+            keys.append((genre, decade))
+    return keys
+
+
+def _board_source(genre, decade):
+    """Requête des films éligibles d'un classement, dans l'ordre du classement"""
+    joins, where = "", ["r.num_votes > ?"]
+    params = []
+    if genre != ALL_GENRES:
+        joins += " JOIN genres g ON g.movie_id = r.movie_id"
+        where.append("g.genre = ?")
+        params.append(genre)
+    if decade != ALL_DECADES:
+        joins += " JOIN movies m ON m.movie_id = r.movie_id"
+        where.append("m.year BETWEEN ? AND ?")
+        params += [decade, decade + 9]
+    sql = f"""
+        SELECT r.movie_id, r.average_rating, r.num_votes
+        FROM ratings r{joins}
+        WHERE {" AND ".join(where)} AND r.average_rating IS NOT NULL
+        ORDER BY r.{_ORDER.replace(", ", ", r.")}
+        LIMIT ?
+    """
+    return sql, params
+
+
+def build_leaderboards(conn):
+    """(Re)calcule tous les classements (fin d'import)"""
+    int_ids = uses_int_ids(conn)
+    with conn:
+        for table in (LEADERBOARD_TABLE, TRUNCATED_TABLE):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        # Clé primaire dans l'ordre du classement : lecture d'un top N = N lignes du B-tree
+        conn.execute(
+            schema_ddl(
+                f"""
+                CREATE TABLE {LEADERBOARD_TABLE} (
+                    min_votes INTEGER NOT NULL,
+                    genre TEXT NOT NULL,
+                    decade INTEGER NOT NULL,
+                    average_rating REAL NOT NULL,
+                    num_votes INTEGER NOT NULL,
+                    movie_id TEXT NOT NULL,
+                    PRIMARY KEY (min_votes, genre, decade, average_rating, num_votes, movie_id)
+                ) WITHOUT ROWID
+                """,
+                int_ids,
+            )
+        )
+        conn.execute(
+            f"CREATE INDEX idx_{LEADERBOARD_TABLE}_movie ON {LEADERBOARD_TABLE}(movie_id)"
+        )
+        for min_votes in VOTE_THRESHOLDS:
+            conn.execute(
+                f"""
+                INSERT INTO {LEADERBOARD_TABLE}
+                WITH eligible AS (
+                    SELECT r.movie_id, r.average_rating, r.num_votes, (m.year / 10) * 10 AS decade
+                    FROM ratings r
+                    JOIN movies m ON m.movie_id = r.movie_id
+                    WHERE r.num_votes > :min_votes AND r.average_rating IS NOT NULL
+                ),
+                keyed AS (
+                    SELECT g.genre, {ALL_DECADES} AS decade, e.movie_id, e.average_rating, e.num_votes
+                    FROM eligible e JOIN genres g ON g.movie_id = e.movie_id
+                    UNION ALL
+                    SELECT g.genre, e.decade, e.movie_id, e.average_rating, e.num_votes
+                    FROM eligible e JOIN genres g ON g.movie_id = e.movie_id
+                    WHERE e.decade IS NOT NULL
+                    UNION ALL
+                    SELECT '{ALL_GENRES}', {ALL_DECADES}, movie_id, average_rating, num_votes
+                    FROM eligible
+                    UNION ALL
+                    SELECT '{ALL_GENRES}', decade, movie_id, average_rating, num_votes
+                    FROM eligible WHERE decade IS NOT NULL
+                ),
+                ranked AS (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY genre, decade ORDER BY {_ORDER}) AS rn
+                    FROM keyed
+                )
+                SELECT :min_votes, genre, decade, average_rating, num_votes, movie_id
+                FROM ranked
+                WHERE rn <= :capacity
+                """,
+                {"min_votes": min_votes, "capacity": LEADERBOARD_CAPACITY},
+            )
+        # Classements pleins : d'autres films éligibles n'y figurent peut-être pas
+        conn.execute(
+            f"""
+            CREATE TABLE {TRUNCATED_TABLE} (
+                min_votes INTEGER NOT NULL,
+                genre TEXT NOT NULL,
+                decade INTEGER NOT NULL,
+                PRIMARY KEY (min_votes, genre, decade)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            f"""
+            INSERT INTO {TRUNCATED_TABLE}
+            SELECT min_votes, genre, decade FROM {LEADERBOARD_TABLE}
+            GROUP BY min_votes, genre, decade
+            HAVING COUNT(*) >= ?
+            """,
+            (LEADERBOARD_CAPACITY,),
+        )
+    return conn.execute(f"SELECT COUNT(*) FROM {LEADERBOARD_TABLE}").fetchone()[0]
+
+
+def _board_size(conn, board):
+    return conn.execute(
+        f"SELECT COUNT(*) FROM {LEADERBOARD_TABLE} WHERE min_votes = ? AND genre = ? AND decade = ?",
+        board,
+    ).fetchone()[0]
+
+
+def _refill_board(conn, board):
+    """Recalcule un classement depuis les tables sources"""
+    min_votes, genre, decade = board
+    sql, params = _board_source(genre, decade)
+    rows = conn.execute(sql, [min_votes, *params, LEADERBOARD_CAPACITY]).fetchall()
+    conn.execute(
+        f"DELETE FROM {LEADERBOARD_TABLE} WHERE min_votes = ? AND genre = ? AND decade = ?",
+        board,
+    )
+    conn.executemany(
+        f"INSERT INTO {LEADERBOARD_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+        [(*board, rating, votes, movie_id) for movie_id, rating, votes in rows],
+    )
+    conn.execute(
+        f"DELETE FROM {TRUNCATED_TABLE} WHERE min_votes = ? AND genre = ? AND decade = ?", board
+    )
+    if len(rows) >= LEADERBOARD_CAPACITY:
+        conn.execute(f"INSERT INTO {TRUNCATED_TABLE} VALUES (?, ?, ?)", board)
+
+
+def update_leaderboards(conn, movie_ids):
+    """
+    Répercute dans les classements la note, les votes, l'année ou les genres
+    actuels de `movie_ids` (après modification de ratings, movies ou genres).
+    Chaque classement reste le top exact de ses films éligibles : dans un
+    classement tronqué, un film n'entre que s'il dépasse le dernier, et seul un
+    classement tronqué retombé sous LEADERBOARD_SIZE entrées est recalculé depuis
+    les tables sources. Retourne le nombre de classements recalculés.
+    """
+    truncated = {tuple(row) for row in conn.execute(f"SELECT * FROM {TRUNCATED_TABLE}")}
+    touched = set()
+    with conn:
+        for movie_id in movie_ids:
+            # Classements où le film figurait : il en sort, une place se libère
+            touched.update(
+                tuple(row)
+                for row in conn.execute(
+                    f"SELECT min_votes, genre, decade FROM {LEADERBOARD_TABLE} WHERE movie_id = ?",
+                    (movie_id,),
+                )
+            )
+            conn.execute(f"DELETE FROM {LEADERBOARD_TABLE} WHERE movie_id = ?", (movie_id,))
+
+            row = conn.execute(
+                """
+                SELECT r.average_rating, r.num_votes, m.year
+                FROM ratings r JOIN movies m ON m.movie_id = r.movie_id
+                WHERE r.movie_id = ?
+                """,
+                (movie_id,),
+            ).fetchone()
+            if row is None or row[0] is None or row[1] is None:
+                continue
+            rating, votes, year = row
+            genres = [g for (g,) in conn.execute(
+                "SELECT genre FROM genres WHERE movie_id = ?", (movie_id,)
+            )]
+
+            for genre, decade in board_keys(genres, year):
+                for min_votes in VOTE_THRESHOLDS:
+                    if votes <= min_votes:
+                        continue
+                    board = (min_votes, genre, decade)
+                    touched.add(board)
+                    if board in truncated:
+                        last = conn.execute(
+                            f"""
+                            SELECT average_rating, num_votes, movie_id FROM {LEADERBOARD_TABLE}
+                            WHERE min_votes = ? AND genre = ? AND decade = ?
+                            ORDER BY average_rating, num_votes, movie_id
+                            LIMIT 1
+                            """,
+                            board,
+                        ).fetchone()
+                        # Derrière le dernier : des films non conservés le précèdent peut-être
+                        if last is not None and (rating, votes, movie_id) < tuple(last):
+                            continue
+                    conn.execute(
+                        f"INSERT INTO {LEADERBOARD_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+                        (*board, rating, votes, movie_id),
+                    )
+
+        refilled = 0
+        for board in touched:
+            size = _board_size(conn, board)
+            if board in truncated and size < LEADERBOARD_SIZE:
+                _refill_board(conn, board)
+                refilled += 1
+            elif size > LEADERBOARD_CAPACITY:
+                conn.execute(
+                    f"""
+                    DELETE FROM {LEADERBOARD_TABLE}
+                    WHERE (min_votes, genre, decade, average_rating, num_votes, movie_id) IN (
+                        SELECT min_votes, genre, decade, average_rating, num_votes, movie_id
+                        FROM {LEADERBOARD_TABLE}
+                        WHERE min_votes = ? AND genre = ? AND decade = ?
+                        ORDER BY average_rating, num_votes, movie_id
+                        LIMIT ?
+                    )
+                    """,
+                    (*board, size - LEADERBOARD_CAPACITY),
+                )
+                conn.execute(f"INSERT OR IGNORE INTO {TRUNCATED_TABLE} VALUES (?, ?, ?)", board)
+    return refilled
+
+
+def top_per_genre(conn, min_votes, top=3):
+    """
+    Q7 depuis les classements par genre (toutes décennies) : (genre, rang, titre, note),
+    ou None si aucun classement n'existe pour ce seuil de votes.
+    """
+    if min_votes not in VOTE_THRESHOLDS or not has_leaderboards(conn):
+        return None
+    return conn.execute(
+        f"""
+        WITH ranked AS (
+            SELECT l.genre, m.title, l.average_rating,
+                   RANK() OVER (
+                       PARTITION BY l.genre
+                       ORDER BY l.average_rating DESC, l.num_votes DESC, m.title, m.movie_id
+                   ) AS rank
+            FROM {LEADERBOARD_TABLE} l JOIN movies m ON m.movie_id = l.movie_id
+            WHERE l.min_votes = ? AND l.decade = ? AND l.genre != ?
+        )
+        SELECT genre, rank, title, average_rating
+        FROM ranked
+        WHERE rank <= ?
+        ORDER BY genre ASC, rank ASC
+        """,
+        (min_votes, ALL_DECADES, ALL_GENRES, top),
+    ).fetchall()
+
+
+# --- MongoDB ---
+
+
+def export_leaderboards(conn, db):
+    """
+    Copie les classements SQLite (titres inclus) dans la collection leaderboards,
+    lue par q7_rank_genre_struct. Copie faite à la migration, pas maintenue ensuite.
+    """
+    collection = db[LEADERBOARD_COLLECTION]
+    collection.drop()
+    if not has_leaderboards(conn):
+        return 0
+    documents = [
+        {
+            "min_votes": min_votes,
+            "genre": genre,
+            "decade": decade,
+            "movie_id": to_text(movie_id, "tt"),
+            "title": title,
+            "rating": rating,
+            "votes": votes,
+        }
+        for min_votes, genre, decade, movie_id, title, rating, votes in conn.execute(
+            f"""
+            SELECT l.min_votes, l.genre, l.decade, l.movie_id, m.title,
+                   l.average_rating, l.num_votes
+            FROM {LEADERBOARD_TABLE} l JOIN movies m ON m.movie_id = l.movie_id
+            """
+        )
+    ]
+    if documents:
+        collection.insert_many(documents)
+    collection.create_index(
+        [("min_votes", 1), ("genre", 1), ("decade", 1), ("rating", -1), ("votes", -1)]
+    )
+    return len(documents)
+
+
+def top_per_genre_mongo(db, min_votes, top=3):
+    """
+    Q7 depuis la collection leaderboards : [{genre, title, rating, rank}] ou None
+    si aucun classement n'existe pour ce seuil (pipeline $setWindowFields à la place).
+    """
+    if min_votes not in VOTE_THRESHOLDS:
+        return None
+    entries = list(
+        db[LEADERBOARD_COLLECTION]
+        .find(
+            {"min_votes": min_votes, "decade": ALL_DECADES, "genre": {"$ne": ALL_GENRES}},
+            {"_id": 0, "genre": 1, "title": 1, "rating": 1, "votes": 1, "movie_id": 1},
+        )
+        .sort([("genre", 1), ("rating", -1), ("votes", -1), ("title", 1), ("movie_id", 1)])
+    )
+    if not entries:
+        return None
+    # Ordre total (note, votes, titre, identifiant), comme top_per_genre : le rang
+    # est la position dans le genre
+    results, genre, rank = [], None, 0
+    for entry in entries:
+        rank = rank + 1 if entry["genre"] == genre else 1
+        genre = entry["genre"]
+        if rank <= top:
+            results.append(
+                {"genre": genre, "title": entry["title"], "rating": entry["rating"], "rank": rank}
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classements par genre et décennie")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument(
+        "--update", nargs="+", metavar="MOVIE_ID",
+        help="Met à jour les classements de ces films (sans tout recalculer)",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db_path)
+    start = time.perf_counter()
+    if args.update and not has_leaderboards(conn):
+        print("❌ Classements absents : lancez d'abord leaderboards.py sans --update.")
+        sys.exit(1)
+    if args.update:
+        ids = [to_int(i) for i in args.update] if uses_int_ids(conn) else args.update
+        refilled = update_leaderboards(conn, ids)
+        print(f"✅ {len(ids)} film(s) reclassé(s), {refilled} classement(s) recalculé(s).")
+    else:
+        print(f"✅ {LEADERBOARD_TABLE} : {build_leaderboards(conn)} lignes.")
+    print(f"Terminé en {time.perf_counter() - start:.2f} s.")
+    conn.close()
@@ -0,0 +1,352 @@
+# Résolution des noms de personnes : saisie utilisateur -> person_id classés.
+# Remplace les LIKE '%...%' (SQLite) et les $regex non ancrées (MongoDB) de Q1, Q4
+# et Q6, qui parcouraient toute la table persons à chaque appel. Deux index :
+# - préfixes normalisés (minuscules, sans accents) de chaque début de mot du nom,
+#   interrogés par intervalle sur un B-tree ("pitt" trouve "Brad Pitt") ;
+# - trigrammes pour les sous-chaînes en milieu de mot ("rad pi").
+# Toutes les personnes trouvées sont rendues, comme avec l'ancien LIKE : un nom
+# trop courant ou trop court pour les index repasse par un parcours des noms.
+# Les trois moteurs (SQLite, MongoDB flat et structuré) résolvent d'abord le nom,
+# puis filtrent par person_id.
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.imdb_ids import schema_ddl, uses_int_ids
+
+NAMES_TABLE = "person_names"
+KEYS_TABLE = "person_name_keys"
+TRIGRAM_INDEX = "person_name_trigrams"
+NAME_COLLECTION = "person_names"
+
+# Candidats lus par index (préfixes, trigrammes). Un index qui en rend autant ne
+# les a pas tous rendus ("a" en trouverait des millions) : on parcourt alors tous
+# les noms normalisés
+MAX_MATCHES = 100
+
+# Borne haute des intervalles de préfixe : supérieure à tout caractère d'un nom
+PREFIX_END = "\U0010ffff"
+
+BATCH_SIZE = 10_000
+
+# Rang d'une correspondance : nom exact, début du nom, début d'un mot, sous-chaîne
+EXACT, NAME_PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+
+def normalize_name(text):
+    """'  Amélie  POULAIN-Jr. ' -> 'amelie poulain jr' (clé de comparaison des noms)"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SEPARATOR_RE.sub(" ", stripped.casefold()).strip()
+
+
+def name_keys(norm):
+    """Suffixes commençant à chaque mot : 'brad pitt' -> ['brad pitt', 'pitt']"""
+    words = norm.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def trigrams(norm):
+    return sorted({norm[i:i + 3] for i in range(len(norm) - 2)})
+
+
+def match_tier(key, norm):
+    if norm == key:
+        return EXACT
+    if norm.startswith(key):
+        return NAME_PREFIX
+    if f" {key}" in f" {norm}":
+        return WORD_PREFIX
+    return SUBSTRING
+
+
+def rank_matches(key, candidates, limit=None):
+    """
+    (person_id, nom normalisé, popularité) -> person_id classés : d'abord par rang
+    de correspondance, puis par nombre de participations (les plus connus en tête).
+    """
+    best = {}
+    for person_id, norm, popularity in candidates:
+        best[person_id] = (match_tier(key, norm), -(popularity or 0), str(person_id))
+    ranked = sorted(best, key=best.get)
+    return ranked[:limit]
+
+
+def _has_table(conn, name):
+    return (
+        conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+        is not None
+    )
+
+
+# --- SQLite ---
+
+
+def has_name_index(conn):
+    """Vrai si l'index des noms a été construit sur cette base"""
+    return _has_table(conn, NAMES_TABLE)
+
+
+def build_name_index(conn):
+    """(Re)construit person_names, person_name_keys et l'index trigramme (FTS5)"""
+    int_ids = uses_int_ids(conn)
+    with conn:
+        for table in (TRIGRAM_INDEX, KEYS_TABLE, NAMES_TABLE):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        # popularity : nombre de lignes de principals (départage des homonymes)
+        conn.execute(
+            schema_ddl(
+                f"""
+                CREATE TABLE {NAMES_TABLE} (
+                    person_id TEXT PRIMARY KEY,
+                    norm TEXT NOT NULL,
+                    popularity INTEGER NOT NULL
+                )
+                """,
+                int_ids,
+            )
+        )
+        conn.execute(
+            schema_ddl(
+                f"""
+                CREATE TABLE {KEYS_TABLE} (
+                    name_key TEXT NOT NULL,
+                    person_id TEXT NOT NULL,
+                    PRIMARY KEY (name_key, person_id)
+                ) WITHOUT ROWID
+                """,
+                int_ids,
+            )
+        )
+
+        rows = conn.execute(
+            """
+            SELECT pe.person_id, pe.name, COALESCE(c.n, 0)
+            FROM persons pe
+            LEFT JOIN (
+                SELECT person_id, COUNT(*) AS n FROM principals GROUP BY person_id
+            ) c ON c.person_id = pe.person_id
+            WHERE pe.name IS NOT NULL
+            """
+        )
+        while True:
+            batch = rows.fetchmany(BATCH_SIZE)
+            if not batch:
+                break
+            names, keys = [], []
+            for person_id, name, popularity in batch:
+                norm = normalize_name(name)
+                if not norm:
+                    continue
+                names.append((person_id, norm, popularity))
+                keys.extend((key, person_id) for key in name_keys(norm))
+            conn.executemany(f"INSERT INTO {NAMES_TABLE} VALUES (?, ?, ?)", names)
+            conn.executemany(f"INSERT OR IGNORE INTO {KEYS_TABLE} VALUES (?, ?)", keys)
+        conn.execute(f"CREATE INDEX idx_{NAMES_TABLE}_norm ON {NAMES_TABLE}(norm)")
+
+        # Index externe : les noms normalisés ne sont stockés qu'une fois (person_names)
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE {TRIGRAM_INDEX} USING fts5(
+                norm, content = '{NAMES_TABLE}', content_rowid = 'rowid',
+                tokenize = 'trigram'
+            )
+            """
+        )
+        conn.execute(f"INSERT INTO {TRIGRAM_INDEX} ({TRIGRAM_INDEX}) VALUES ('rebuild')")
+
+    return {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in (NAMES_TABLE, KEYS_TABLE)
+    }
+
+
+def resolve_person_ids(conn, name, limit=None):
+    """
+    person_id de toutes les personnes dont le nom contient `name` (sans tenir compte
+    de la casse ni des accents), classés par pertinence puis popularité ; `limit`
+    ne garde que les premiers.
+    Les index suffisent tant qu'ils rendent moins de MAX_MATCHES candidats. Au-delà
+    (nom courant), ou sous 3 caractères (pas de trigramme : "ü" en milieu de mot),
+    tous les noms normalisés sont parcourus, au coût de l'ancien LIKE '%...%'.
+    Sans index (base antérieure à name_resolver.py) : LIKE sur persons.
+    """
+    key = normalize_name(name)
+    if not key:
+        return []
+    if not has_name_index(conn):
+        rows = conn.execute(
+            "SELECT person_id FROM persons WHERE name LIKE ? LIMIT ?",
+            (f"%{name}%", -1 if limit is None else limit),
+        )
+        return [row[0] for row in rows]
+
+    candidates = conn.execute(
+        f"SELECT person_id, norm, popularity FROM {NAMES_TABLE} WHERE norm = ?", (key,)
+    ).fetchall()
+    prefixes = conn.execute(
+        f"""
+        SELECT n.person_id, n.norm, n.popularity
+        FROM {KEYS_TABLE} k
+        JOIN {NAMES_TABLE} n ON n.person_id = k.person_id
+        WHERE k.name_key >= ? AND k.name_key < ?
+        LIMIT ?
+        """,
+        (key, key + PREFIX_END, MAX_MATCHES),
+    ).fetchall()
+    candidates += prefixes
+
+    # Le tokenizer trigram ne trouve rien sous 3 caractères
+    complete = len(prefixes) < MAX_MATCHES and len(key) >= 3
+    if complete:
+        substrings = conn.execute(
+            f"""
+            SELECT n.person_id, n.norm, n.popularity
+            FROM {TRIGRAM_INDEX} t
+            JOIN {NAMES_TABLE} n ON n.rowid = t.rowid
+            WHERE {TRIGRAM_INDEX} MATCH ?
+            LIMIT ?
+            """,
+            (f'"{key}"', MAX_MATCHES),
+        ).fetchall()
+        candidates += substrings
+        complete = len(substrings) < MAX_MATCHES
+    if not complete:
+        candidates = conn.execute(
+            f"SELECT person_id, norm, popularity FROM {NAMES_TABLE} WHERE instr(norm, ?) > 0",
+            (key,),
+        ).fetchall()
+    return rank_matches(key, candidates, limit)
+
+
+# --- MongoDB ---
+
+
+def build_name_collection(db):
+    """
+    (Re)construit la collection person_names : nom normalisé, préfixes des mots et
+    trigrammes dans des tableaux indexés (index multiclé), popularité.
+    """
+    popularity = {
+        doc["_id"]: doc["n"]
+        for doc in db.principals.aggregate(
+            [{"$group": {"_id": "$person_id", "n": {"$sum": 1}}}], allowDiskUse=True
+        )
+    }
+    collection = db[NAME_COLLECTION]
+    collection.drop()
+
+    batch = []
+    for person in db.persons.find({"name": {"$ne": None}}, {"_id": 0, "person_id": 1, "name": 1}):
+        norm = normalize_name(person["name"])
+        if not norm:
+            continue
+        batch.append(
+            {
+                "_id": person["person_id"],
+                "norm": norm,
+                "keys": name_keys(norm),
+                "trigrams": trigrams(norm),
+                "popularity": popularity.get(person["person_id"], 0),
+            }
+        )
+        if len(batch) >= BATCH_SIZE:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+    collection.create_index("norm")
+    collection.create_index("keys")
+    collection.create_index("trigrams")
+    return collection.count_documents({})
+
+
+def resolve_person_ids_mongo(db, name, limit=None):
+    """Équivalent MongoDB de resolve_person_ids (collection person_names)"""
+    key = normalize_name(name)
+    if not key:
+        return []
+    collection = db[NAME_COLLECTION]
+    projection = {"norm": 1, "popularity": 1}
+
+    docs = list(collection.find({"norm": key}, projection))
+    # Regex ancrée sans option : MongoDB la traduit en intervalle sur l'index keys
+    prefixes = list(
+        collection.find({"keys": {"$regex": f"^{re.escape(key)}"}}, projection).limit(
+            MAX_MATCHES
+        )
+    )
+    docs += prefixes
+    complete = len(prefixes) < MAX_MATCHES and len(key) >= 3
+    if complete:
+        # $all sur les trigrammes (index), puis vérification de la sous-chaîne exacte
+        substrings = list(
+            collection.find(
+                {"trigrams": {"$all": trigrams(key)}, "norm": {"$regex": re.escape(key)}},
+                projection,
+            ).limit(MAX_MATCHES)
+        )
+        docs += substrings
+        complete = len(substrings) < MAX_MATCHES
+    if not complete:
+        # Regex non ancrée : parcours de tout l'index norm
+        docs = list(collection.find({"norm": {"$regex": re.escape(key)}}, projection))
+
+    if not docs and NAME_COLLECTION not in db.list_collection_names():
+        # Collection pas encore construite : recherche historique sur persons
+        persons = db.persons.find(
+            {"name": {"$regex": re.escape(name), "$options": "i"}}, {"person_id": 1}
+        ).limit(limit or 0)
+        return [p["person_id"] for p in persons]
+    return rank_matches(
+        key, [(doc["_id"], doc["norm"], doc.get("popularity")) for doc in docs], limit
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index de résolution des noms de personnes")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--mongo-uri", help="Construit aussi la collection MongoDB")
+    parser.add_argument("--resolve", help="Teste la résolution d'un nom (sans reconstruire)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db_path)
+    db = None
+    if args.mongo_uri:
+        import pymongo
+
+        from scripts.phase2_mongodb.queries_mongo import DB_NAME
+
+        db = pymongo.MongoClient(args.mongo_uri)[DB_NAME]
+
+    if args.resolve:
+        start = time.perf_counter()
+        ids = resolve_person_ids(conn, args.resolve, 10)
+        print(f"SQLite ({(time.perf_counter() - start) * 1000:.2f} ms) : {ids}")
+        if db is not None:
+            start = time.perf_counter()
+            ids = resolve_person_ids_mongo(db, args.resolve, 10)
+            print(f"MongoDB ({(time.perf_counter() - start) * 1000:.2f} ms) : {ids}")
+    else:
+        start = time.perf_counter()
+        for table, count in build_name_index(conn).items():
+            print(f"✅ {table} : {count} lignes.")
+        if db is not None:
+            print(f"✅ MongoDB {NAME_COLLECTION} : {build_name_collection(db)} documents.")
+        print(f"Index construit en {time.perf_counter() - start:.2f} s.")
+    conn.close()
@@ -1,54 +1,122 @@
-import sqlite3
+import json
 import os
+import sys
 
 # Configuration du chemin vers la DB
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+sys.path.append(BASE_DIR)
 
+from scripts.phase1_sqlite.connection_pool import get_connection
+from scripts.phase1_sqlite.imdb_ids import to_int, uses_int_ids
+from scripts.phase1_sqlite.leaderboards import top_per_genre
+from scripts.phase1_sqlite.name_resolver import MAX_MATCHES, resolve_person_ids
+from scripts.phase1_sqlite.summaries import has_person_careers
 
-def get_db_connection():
+
+def id_placeholders(ids):
+    return ", ".join("?" * len(ids))
+
+
+def id_list(ids):
+    """
+    Liste SQL `(?, ?, ...)` et ses paramètres. Les noms très courants se résolvent en
+    milliers d'identifiants : au-delà de MAX_MATCHES, un seul paramètre JSON
+    (json_each), sans la limite du nombre de paramètres de SQLite.
+    """
+    if len(ids) <= MAX_MATCHES:
+        return f"({id_placeholders(ids)})", list(ids)
+    return "(SELECT value FROM json_each(?))", [json.dumps(ids)]
+
+
+def get_db_connection(tuning="tuned"):
+    """Connexion en lecture seule du thread courant, réutilisée d'un appel à l'autre"""
     if not os.path.exists(DB_PATH):
         raise FileNotFoundError(f"La base {DB_PATH} est introuvable.")
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_connection(DB_PATH, tuning)
+
+
+# =============================================================================
+# EXÉCUTION : liste complète (query_*) ou flux par paquets (query_*_stream)
+# =============================================================================
+# Lignes lues par fetchmany dans les variantes *_stream
+STREAM_BATCH_SIZE = 1000
+
+
+def paginate(sql, params=(), limit=None, offset=0):
+    """LIMIT / OFFSET ajoutés à la requête, donc appliqués par SQLite (LIMIT -1 : tout)"""
+    return f"{sql}\n    LIMIT ? OFFSET ?", (*params, -1 if limit is None else limit, offset)
+
+
+def stream_rows(cursor, batch_size=STREAM_BATCH_SIZE):
+    """Lignes d'un curseur par paquets de `batch_size` : mémoire constante"""
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def fetch(conn, statement, limit=None, offset=0):
+    """Lignes de `statement` = (sql, paramètres) en une liste ; [] si None (nom inconnu)"""
+    if statement is None:
+        return []
+    return conn.execute(*paginate(*statement, limit, offset)).fetchall()
+
+
+def stream(conn, statement, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Générateur sur les lignes de `statement`, lues par fetchmany"""
+    if statement is None:
+        return iter(())
+    return stream_rows(conn.execute(*paginate(*statement, limit, offset)), batch_size)
 
 
 # =============================================================================
 # REQUÊTE 1 : Filmographie d'un acteur
 # =============================================================================
-def query_actor_filmography(conn, actor_name: str) -> list:
-    """
-    Q1: Dans quels films a joué un acteur donné ?
-    Retourne : Titre, Année, Personnage
-    """
-    sql = """
+def _actor_filmography_sql(conn, actor_name):
+    # Résolution du nom via l'index des noms (name_resolver.py), puis filtre par id
+    person_ids = resolve_person_ids(conn, actor_name)
+    if not person_ids:
+        return None
+    ids_sql, params = id_list(person_ids)
+    sql = f"""
     SELECT 
         m.title, 
         m.year, 
         c.character_name
     FROM movies m
     JOIN principals p ON m.movie_id = p.movie_id
-    JOIN persons pe ON p.person_id = pe.person_id
-    LEFT JOIN characters c ON (m.movie_id = c.movie_id AND pe.person_id = c.person_id)
-    WHERE pe.name LIKE ? 
+    LEFT JOIN characters c ON (m.movie_id = c.movie_id AND p.person_id = c.person_id)
+    WHERE p.person_id IN {ids_sql}
       AND (p.category = 'actor' OR p.category = 'actress')
     ORDER BY m.year DESC
-    LIMIT 20;
     """
-    return conn.execute(sql, (f"%{actor_name}%",)).fetchall()
+    return sql, params
+
+
+def query_actor_filmography(conn, actor_name: str) -> list:
+    """
+    Q1: Dans quels films a joué un acteur donné ?
+    Retourne : Titre, Année, Personnage
+    """
+    return fetch(conn, _actor_filmography_sql(conn, actor_name), limit=20)
+
+
+def query_actor_filmography_stream(
+    conn, actor_name: str, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q1 en flux : toute la filmographie par défaut"""
+    return stream(conn, _actor_filmography_sql(conn, actor_name), limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 2 : Top N films d'un genre
 # =============================================================================
-def query_top_movies_by_genre(
-    conn, genre: str, year_start: int, year_end: int, n: int
-) -> list:
-    """
-    Q2: Les N meilleurs films d'un genre selon la note moyenne.
-    Retourne : Titre, Année, Note
-    """
+def _top_movies_by_genre_sql(genre, year_start, year_end):
     sql = """
     SELECT 
         m.title, 
@@ -60,20 +128,33 @@ def query_top_movies_by_genre(
     WHERE g.genre = ? 
       AND m.year BETWEEN ? AND ?
     ORDER BY r.average_rating DESC, r.num_votes DESC
-    LIMIT ?;
     """
-    return conn.execute(sql, (genre, year_start, year_end, n)).fetchall()
+    return sql, (genre, year_start, year_end)
+
+
+def query_top_movies_by_genre(
+    conn, genre: str, year_start: int, year_end: int, n: int
+) -> list:
+    """
+    Q2: Les N meilleurs films d'un genre selon la note moyenne.
+    Retourne : Titre, Année, Note
+    """
+    return fetch(conn, _top_movies_by_genre_sql(genre, year_start, year_end), limit=n)
+
+
+def query_top_movies_by_genre_stream(
+    conn, genre: str, year_start: int, year_end: int, limit=None, offset=0,
+    batch_size=STREAM_BATCH_SIZE,
+):
+    """Q2 en flux : tous les films du genre sur la période, du mieux noté au moins bien noté"""
+    statement = _top_movies_by_genre_sql(genre, year_start, year_end)
+    return stream(conn, statement, limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 3 : Acteurs multi-rôles
 # =============================================================================
-def query_multi_role_actors(conn) -> list:
-    """
-    Q3: Acteurs ayant joué plusieurs personnages dans un même film.
-    Retourne : Nom Acteur, Titre Film, Nombre de rôles
-    """
-    sql = """
+_MULTI_ROLE_ACTORS_SQL = """
     SELECT 
         pe.name, 
         m.title, 
@@ -84,47 +165,70 @@ def query_multi_role_actors(conn) -> list:
     GROUP BY pe.person_id, m.movie_id
     HAVING role_count > 1
     ORDER BY role_count DESC
-    LIMIT 20;
     """
-    return conn.execute(sql).fetchall()
+
+
+def query_multi_role_actors(conn) -> list:
+    """
+    Q3: Acteurs ayant joué plusieurs personnages dans un même film.
+    Retourne : Nom Acteur, Titre Film, Nombre de rôles
+    """
+    return fetch(conn, (_MULTI_ROLE_ACTORS_SQL, ()), limit=20)
+
+
+def query_multi_role_actors_stream(conn, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q3 en flux : tous les couples (acteur, film) à plusieurs rôles"""
+    return stream(conn, (_MULTI_ROLE_ACTORS_SQL, ()), limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 4 : Collaborations
 # =============================================================================
-def query_director_collaborations(conn, actor_name: str) -> list:
-    """
-    Q4: Réalisateurs ayant travaillé avec un acteur spécifique.
-    Retourne : Nom Réalisateur, Nombre de films ensemble
-    """
-    sql = """
+def _director_collaborations_sql(conn, actor_name):
+    person_ids = resolve_person_ids(conn, actor_name)
+    if not person_ids:
+        return None
+    ids_sql, params = id_list(person_ids)
+    sql = f"""
     SELECT
         pe_director.name as director_name,
         COUNT(DISTINCT m.movie_id) as movie_count
+    -- CROSS JOIN : la jointure part des films des acteurs trouvés. Partir des
+    -- réalisateurs croiserait chacun avec toute la liste d'identifiants (nom courant)
     FROM principals p_actor
-    JOIN persons pe_actor ON p_actor.person_id = pe_actor.person_id
-    JOIN movies m ON p_actor.movie_id = m.movie_id
-    JOIN principals p_director ON m.movie_id = p_director.movie_id
+    CROSS JOIN movies m ON p_actor.movie_id = m.movie_id
+    CROSS JOIN principals p_director ON m.movie_id = p_director.movie_id
     JOIN persons pe_director ON p_director.person_id = pe_director.person_id
-    WHERE pe_actor.name LIKE ? 
+    WHERE p_actor.person_id IN {ids_sql}
       AND p_actor.category IN ('actor', 'actress')
       AND p_director.category = 'director'
     GROUP BY pe_director.person_id
-    ORDER BY movie_count DESC
-    LIMIT 10;
+    -- Départage par nom puis identifiant : même ordre que les versions MongoDB
+    ORDER BY movie_count DESC, director_name, pe_director.person_id
+    """
+    return sql, params
+
+
+def query_director_collaborations(conn, actor_name: str) -> list:
+    """
+    Q4: Réalisateurs ayant travaillé avec un acteur spécifique.
+    Retourne : Nom Réalisateur, Nombre de films ensemble
     """
-    return conn.execute(sql, (f"%{actor_name}%",)).fetchall()
+    return fetch(conn, _director_collaborations_sql(conn, actor_name), limit=10)
+
+
+def query_director_collaborations_stream(
+    conn, actor_name: str, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q4 en flux : tous les réalisateurs de l'acteur"""
+    statement = _director_collaborations_sql(conn, actor_name)
+    return stream(conn, statement, limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 5 : Genres populaires
 # =============================================================================
-def query_popular_genres(conn) -> list:
-    """
-    Q5: Genres notés > 7.0 (avec +50 films).
-    Retourne : Genre, Note Moyenne
-    """
-    sql = """
+_POPULAR_GENRES_SQL = """
     SELECT 
         g.genre, 
         ROUND(AVG(r.average_rating), 2) as avg_rating
@@ -132,29 +236,54 @@ def query_popular_genres(conn) -> list:
     JOIN ratings r ON g.movie_id = r.movie_id
     GROUP BY g.genre
     HAVING avg_rating > 7.0 AND COUNT(g.movie_id) > 50
-    ORDER BY avg_rating DESC;
+    ORDER BY avg_rating DESC
     """
-    return conn.execute(sql).fetchall()
+
+
+def query_popular_genres(conn) -> list:
+    """
+    Q5: Genres notés > 7.0 (avec +50 films).
+    Retourne : Genre, Note Moyenne
+    """
+    return fetch(conn, (_POPULAR_GENRES_SQL, ()))
+
+
+def query_popular_genres_stream(conn, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q5 en flux"""
+    return stream(conn, (_POPULAR_GENRES_SQL, ()), limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 6 : Évolution de carrière
 # =============================================================================
-def query_actor_career_stats(conn, actor_name: str) -> list:
-    """
-    Q6: Statut par décennie pour un acteur.
-    Retourne : Décennie, Nombre de films, Note Moyenne
-    """
-    sql = """
+def _actor_career_stats_sql(conn, actor_name):
+    person_ids = resolve_person_ids(conn, actor_name)
+    if not person_ids:
+        return None
+    ids_sql, params = id_list(person_ids)
+    if has_person_careers(conn):
+        # Décennies précalculées (summaries.py) : quelques lignes par personne
+        sql = f"""
+        SELECT
+            decade,
+            SUM(movie_count) as num_movies,
+            ROUND(SUM(rating_sum) / SUM(rated_count), 2) as avg_rating
+        FROM person_career_decades
+        WHERE person_id IN {ids_sql}
+        GROUP BY decade
+        ORDER BY decade
+        """
+        return sql, params
+
+    sql = f"""
     WITH ActorMovies AS (
         SELECT 
             m.year, 
             r.average_rating
         FROM movies m
         JOIN principals p ON m.movie_id = p.movie_id
-        JOIN persons pe ON p.person_id = pe.person_id
         LEFT JOIN ratings r ON m.movie_id = r.movie_id
-        WHERE pe.name LIKE ? 
+        WHERE p.person_id IN {ids_sql}
           AND m.year IS NOT NULL
     )
     SELECT 
@@ -163,62 +292,211 @@ def query_actor_career_stats(conn, actor_name: str) -> list:
         ROUND(AVG(average_rating), 2) as avg_rating
     FROM ActorMovies
     GROUP BY decade
-    ORDER BY decade;
+    ORDER BY decade
     """
-    return conn.execute(sql, (f"%{actor_name}%",)).fetchall()
+    return sql, params
+
+
+def query_actor_career_stats(conn, actor_name: str) -> list:
+    """
+    Q6: Statut par décennie pour un acteur.
+    Retourne : Décennie, Nombre de films, Note Moyenne
+    """
+    return fetch(conn, _actor_career_stats_sql(conn, actor_name))
+
+
+def query_actor_career_stats_stream(
+    conn, actor_name: str, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q6 en flux"""
+    return stream(conn, _actor_career_stats_sql(conn, actor_name), limit, offset, batch_size)
 
 
 # =============================================================================
-# REQUÊTE 7 : Classement par genre
+# REQUÊTES 1 ET 6 GROUPÉES : plusieurs personnes en une passe
 # =============================================================================
-def query_top_3_per_genre(conn) -> list:
+def load_batch_people(conn, people, by_id=False):
     """
-    Q7: Pour chaque genre, les 3 meilleurs films avec leur rang.
-    Utilise RANK() OVER (PARTITION BY ...)
-    Retourne : Genre, Rang, Titre, Note
+    Remplit temp.batch_people (clé demandée, person_id) : chaque nom est résolu
+    par l'index des noms, les identifiants sont pris tels quels.
+    Les requêtes groupées joignent cette table au lieu d'une boucle d'appels.
     """
+    int_ids = uses_int_ids(conn)
+    conn.execute("DROP TABLE IF EXISTS temp.batch_people")
+    conn.execute(
+        """
+        CREATE TEMP TABLE batch_people (
+            person_key NOT NULL,
+            person_id NOT NULL,
+            PRIMARY KEY (person_key, person_id)
+        ) WITHOUT ROWID
+        """
+    )
+    rows = []
+    for key in dict.fromkeys(people):
+        if by_id:
+            rows.append((key, to_int(key) if int_ids else key))
+        else:
+            rows.extend((key, person_id) for person_id in resolve_person_ids(conn, key))
+    conn.executemany("INSERT OR IGNORE INTO temp.batch_people VALUES (?, ?)", rows)
+
+
+def query_actor_filmography_batch(conn, people, by_id=False, limit: int = 20) -> dict:
+    """
+    Q1 pour une liste de noms (ou de person_id avec by_id=True) :
+    {nom ou id demandé: [Titre, Année, Personnage]}, une seule jointure pour tous.
+    """
+    load_batch_people(conn, people, by_id)
     sql = """
+    WITH Credits AS (
+        SELECT
+            b.person_key,
+            m.title,
+            m.year,
+            c.character_name,
+            ROW_NUMBER() OVER (
+                PARTITION BY b.person_key ORDER BY m.year DESC
+            ) as rn
+        FROM temp.batch_people b
+        JOIN principals p ON p.person_id = b.person_id
+        JOIN movies m ON m.movie_id = p.movie_id
+        LEFT JOIN characters c ON (m.movie_id = c.movie_id AND p.person_id = c.person_id)
+        WHERE p.category = 'actor' OR p.category = 'actress'
+    )
+    SELECT person_key, title, year, character_name
+    FROM Credits
+    WHERE rn <= ?
+    ORDER BY person_key, rn;
+    """
+    results = {key: [] for key in dict.fromkeys(people)}
+    for row in conn.execute(sql, (limit,)):
+        results[row[0]].append(row)
+    conn.execute("DROP TABLE temp.batch_people")
+    return results
+
+
+def query_actor_career_stats_batch(conn, people, by_id=False) -> dict:
+    """
+    Q6 pour une liste de noms (ou de person_id avec by_id=True) :
+    {nom ou id demandé: [Décennie, Nombre de films, Note Moyenne]}.
+    """
+    load_batch_people(conn, people, by_id)
+    if has_person_careers(conn):
+        sql = """
+        SELECT
+            b.person_key,
+            d.decade,
+            SUM(d.movie_count) as num_movies,
+            ROUND(SUM(d.rating_sum) / SUM(d.rated_count), 2) as avg_rating
+        FROM temp.batch_people b
+        JOIN person_career_decades d ON d.person_id = b.person_id
+        GROUP BY b.person_key, d.decade
+        ORDER BY b.person_key, d.decade;
+        """
+    else:
+        sql = """
+        SELECT
+            b.person_key,
+            (m.year / 10) * 10 as decade,
+            COUNT(*) as num_movies,
+            ROUND(AVG(r.average_rating), 2) as avg_rating
+        FROM temp.batch_people b
+        JOIN principals p ON p.person_id = b.person_id
+        JOIN movies m ON m.movie_id = p.movie_id
+        LEFT JOIN ratings r ON m.movie_id = r.movie_id
+        WHERE m.year IS NOT NULL
+        GROUP BY b.person_key, decade
+        ORDER BY b.person_key, decade;
+        """
+    results = {key: [] for key in dict.fromkeys(people)}
+    for row in conn.execute(sql):
+        results[row[0]].append(row)
+    conn.execute("DROP TABLE temp.batch_people")
+    return results
+
+
+# =============================================================================
+# REQUÊTE 7 : Classement par genre
+# =============================================================================
+_TOP_3_PER_GENRE_SQL = """
     WITH RankedMovies AS (
         SELECT 
             g.genre,
             m.title,
             r.average_rating,
-            -- RANK() attribue un rang, réinitialisé à chaque changement de genre
+            -- RANK() attribue un rang, réinitialisé à chaque changement de genre.
+            -- Départage par titre puis identifiant, comme les versions MongoDB :
+            -- trois films par genre, les mêmes sur chaque moteur
             RANK() OVER (
                 PARTITION BY g.genre 
-                ORDER BY r.average_rating DESC, r.num_votes DESC
+                ORDER BY r.average_rating DESC, r.num_votes DESC, m.title, m.movie_id
             ) as rank
         FROM genres g
         JOIN movies m ON g.movie_id = m.movie_id
         JOIN ratings r ON m.movie_id = r.movie_id
-        WHERE r.num_votes > 1000 
+        WHERE r.num_votes > ? 
     )
     SELECT genre, rank, title, average_rating
     FROM RankedMovies
     WHERE rank <= 3
-    ORDER BY genre ASC, rank ASC;
+    ORDER BY genre ASC, rank ASC
+    """
+
+
+def query_top_3_per_genre(conn, min_votes: int = 1000) -> list:
     """
-    return conn.execute(sql).fetchall()
+    Q7: Pour chaque genre, les 3 meilleurs films avec leur rang.
+    Utilise RANK() OVER (PARTITION BY ...)
+    Retourne : Genre, Rang, Titre, Note
+    """
+    # Classements par genre maintenus à l'import (leaderboards.py) : quelques
+    # lignes par genre au lieu d'une fenêtre sur toutes les notes
+    rows = top_per_genre(conn, min_votes)
+    if rows is not None:
+        return rows
+    return fetch(conn, (_TOP_3_PER_GENRE_SQL, (min_votes,)))
+
+
+def query_top_3_per_genre_stream(
+    conn, min_votes: int = 1000, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q7 en flux (les classements précalculés tiennent déjà en quelques lignes par genre)"""
+    rows = top_per_genre(conn, min_votes)
+    if rows is not None:
+        return iter(rows[offset : None if limit is None else offset + limit])
+    return stream(conn, (_TOP_3_PER_GENRE_SQL, (min_votes,)), limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 8 : Carrière propulsée
 # =============================================================================
-def query_breakthrough_actors(conn) -> list:
-    """
-    Q8: Personnes ayant percé grâce à un film (Premier succès >200k votes après des films <200k).
-    Utilise ROW_NUMBER() pour ne garder que le 1er succès par acteur.
-    """
+def _breakthrough_actors_sql(conn):
+    if has_person_careers(conn):
+        # Premier succès et films précédents précalculés (summaries.py)
+        sql = """
+        SELECT
+            pe.name,
+            m.title as breakthrough_movie,
+            pc.first_hit_year as breakthrough_year
+        FROM person_careers pc
+        JOIN persons pe ON pc.person_id = pe.person_id
+        JOIN movies m ON pc.first_hit_movie_id = m.movie_id
+        WHERE pc.first_hit_year IS NOT NULL
+        ORDER BY pc.first_hit_year, pe.name, pc.person_id
+        """
+        return sql, ()
+
     sql = """
     WITH Candidates AS (
         SELECT 
+            pe.person_id,
             pe.name,
             m_break.title as breakthrough_movie,
             m_break.year as breakthrough_year,
             -- On numérote les succès par ordre chronologique pour chaque acteur
             ROW_NUMBER() OVER (
                 PARTITION BY pe.person_id 
-                ORDER BY m_break.year ASC
+                ORDER BY m_break.year ASC, m_break.movie_id
             ) as rn
         FROM principals p
         JOIN persons pe ON p.person_id = pe.person_id
@@ -242,19 +520,41 @@ def query_breakthrough_actors(conn) -> list:
     SELECT name, breakthrough_movie, breakthrough_year
     FROM Candidates
     WHERE rn = 1 -- On ne garde que le tout premier succès
-    LIMIT 10;
+    -- Même ordre que la version précalculée
+    ORDER BY breakthrough_year, name, person_id
+    """
+    return sql, ()
+
+
+def query_breakthrough_actors(conn) -> list:
+    """
+    Q8: Personnes ayant percé grâce à un film (Premier succès >200k votes après des films <200k).
+    Utilise ROW_NUMBER() pour ne garder que le 1er succès par acteur.
     """
-    return conn.execute(sql).fetchall()
+    return fetch(conn, _breakthrough_actors_sql(conn), limit=10)
+
+
+def query_breakthrough_actors_stream(conn, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q8 en flux : toutes les percées"""
+    return stream(conn, _breakthrough_actors_sql(conn), limit, offset, batch_size)
 
 
 # =============================================================================
 # REQUÊTE 9 : Requête libre (Longévité)
 # =============================================================================
-def query_longest_careers(conn) -> list:
-    """
-    Q9: Acteurs avec la plus grande longévité.
-    Retourne : Nom, Durée de carrière (ans)
-    """
+def _longest_careers_sql(conn):
+    if has_person_careers(conn):
+        sql = """
+        SELECT
+            pe.name,
+            pc.career_span
+        FROM person_careers pc
+        JOIN persons pe ON pc.person_id = pe.person_id
+        WHERE pc.career_span > 0 AND pc.film_count > 10
+        ORDER BY pc.career_span DESC, pe.name, pc.person_id
+        """
+        return sql, ()
+
     sql = """
     SELECT 
         pe.name,
@@ -266,10 +566,23 @@ def query_longest_careers(conn) -> list:
       AND m.year IS NOT NULL
     GROUP BY pe.person_id
     HAVING career_span > 0 AND COUNT(m.movie_id) > 10
-    ORDER BY career_span DESC
-    LIMIT 15;
+    -- Égalités départagées comme la version précalculée
+    ORDER BY career_span DESC, pe.name, pe.person_id
+    """
+    return sql, ()
+
+
+def query_longest_careers(conn) -> list:
     """
-    return conn.execute(sql).fetchall()
+    Q9: Acteurs avec la plus grande longévité.
+    Retourne : Nom, Durée de carrière (ans)
+    """
+    return fetch(conn, _longest_careers_sql(conn), limit=15)
+
+
+def query_longest_careers_stream(conn, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q9 en flux : toutes les carrières de plus de 10 films"""
+    return stream(conn, _longest_careers_sql(conn), limit, offset, batch_size)
 
 
 if __name__ == "__main__":
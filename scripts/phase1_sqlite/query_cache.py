@@ -0,0 +1,276 @@
+# Cache des résultats des requêtes Q1-Q9 (SQLite, MongoDB flat et structuré).
+# Clé : (nom de la requête, paramètres normalisés, version des données). La version
+# change à la fin de chaque import (refresh_summaries) ou migration MongoDB : les
+# anciens résultats ne sont plus jamais relus et sortent du LRU d'eux-mêmes.
+# Les fonctions de queries.py / queries_*.py restent inchangées (benchmarks) :
+# CachedQueries les enveloppe à la demande.
+import argparse
+import copy
+import functools
+import inspect
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.name_resolver import normalize_name
+from scripts.phase1_sqlite.summaries import DATASET_VERSION, dataset_version
+
+# Nombre de résultats gardés
+MAX_ENTRIES = 1024
+# Borne mémoire : lignes (ou documents) gardées au total, tous résultats confondus.
+# Un résultat *_batch peut à lui seul compter des milliers de lignes.
+MAX_ROWS = 200_000
+
+# Paramètres résolus par name_resolver : "tom  HANKS" et "Tom Hanks" donnent le même résultat.
+# Les autres chaînes entrent telles quelles dans la clé (" Action" ne renvoie rien en SQL).
+NAME_PARAMS = {"actor_name"}
+
+# Collection MongoDB qui porte la version des données
+META_COLLECTION = "dataset_meta"
+
+
+def result_weight(result):
+    """Poids d'un résultat : nombre de lignes (somme des listes pour un dict *_batch)"""
+    if isinstance(result, dict):
+        return sum(result_weight(rows) for rows in result.values())
+    if isinstance(result, (list, tuple)):
+        return max(len(result), 1)
+    return 1
+
+
+class QueryCache:
+    """
+    LRU de résultats, borné à `max_entries` résultats et `max_rows` lignes au total
+    (result_weight), avec durée de vie optionnelle (`ttl` en secondes). Un résultat
+    plus lourd que `max_rows` n'est pas gardé.
+    Partageable entre threads (vues Django, benchmarks concurrents).
+    """
+
+    def __init__(
+        self, max_entries=MAX_ENTRIES, ttl=None, clock=time.monotonic, max_rows=MAX_ROWS
+    ):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._clock = clock
+        # clé -> (expiration, résultat, poids)
+        self._entries = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """(True, résultat) si la clé est présente et non expirée, sinon (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self._weight -= entry[2]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key, value):
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        weight = result_weight(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._weight -= previous[2]
+            if weight > self.max_rows:
+                return
+            self._entries[key] = (expires, value, weight)
+            self._weight += weight
+            while len(self._entries) > self.max_entries or self._weight > self.max_rows:
+                _, evicted = self._entries.popitem(last=False)
+                self._weight -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "rows": self._weight,
+                "max_rows": self.max_rows,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+
+def normalize_value(name, value):
+    # Listes de noms ou d'ids des requêtes groupées (*_batch) : le résultat est indexé
+    # par la valeur demandée, qui reste donc telle quelle
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_value(None, v) for v in value)
+    if isinstance(value, str):
+        return normalize_name(value) if name in NAME_PARAMS else value
+    # 2000.0 et 2000 : même requête
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def normalize_params(func, args, kwargs):
+    """
+    Paramètres d'un appel sous forme canonique : valeurs par défaut appliquées,
+    passage positionnel ou nommé indifférent. Le premier paramètre (connexion ou
+    base) est exclu, il est représenté par la version des données.
+    """
+    bound = inspect.signature(func).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    items = list(bound.arguments.items())[1:]
+    return tuple((name, normalize_value(name, value)) for name, value in items)
+
+
+def sqlite_version(conn):
+    """(fichier de la base, version des données)"""
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return path, dataset_version(conn)
+
+
+def mongo_version(db):
+    """(nom de la base, version des données)"""
+    doc = db[META_COLLECTION].find_one({"_id": DATASET_VERSION})
+    return db.name, doc["value"] if doc else None
+
+
+def bump_mongo_version(db):
+    """Nouvelle version des données MongoDB (fin de migrate_flat / migrate_structured)"""
+    previous = mongo_version(db)[1] or 0
+    version = max(time.time_ns() // 1_000_000, previous + 1)
+    db[META_COLLECTION].replace_one({"_id": DATASET_VERSION}, {"value": version}, upsert=True)
+    return version
+
+
+def cached(func, cache, version_of):
+    """
+    `func(conn_or_db, ...)` dont les résultats sont gardés dans `cache`.
+    Le résultat est rendu dans une nouvelle liste (ou un nouveau dict pour les
+    requêtes groupées), mais les lignes (sqlite3.Row, documents) sont partagées
+    entre appels : ne pas les modifier.
+    """
+
+    @functools.wraps(func)
+    def wrapper(source, *args, **kwargs):
+        key = (func.__name__, normalize_params(func, args, kwargs), version_of(source))
+        hit, result = cache.get(key)
+        if not hit:
+            result = func(source, *args, **kwargs)
+            # Erreurs rendues comme résultat (ex. q7 sur MongoDB < 5.0) : pas gardées
+            first = result[0] if isinstance(result, list) and result else None
+            if not (isinstance(first, dict) and "error" in first):
+                cache.put(key, result)
+        return copy.copy(result)
+
+    return wrapper
+
+
+class CachedQueries:
+    """
+    Vue d'un module de requêtes dont les fonctions Q1-Q9 passent par le cache :
+    CachedQueries(queries, sqlite_version).query_top_3_per_genre(conn, 1000).
+    Utilisable à la place du module dans build_tasks / flat_tasks / structured_tasks.
+    """
+
+    def __init__(self, module, version_of, cache=None):
+        self.module = module
+        self.version_of = version_of
+        self.cache = cache if cache is not None else QueryCache()
+        self._wrapped = {}
+
+    def __getattr__(self, name):
+        func = getattr(self.module, name)
+        is_query = name.startswith("query_") or name.endswith("_struct")
+        # Variantes en flux (*_stream) : des générateurs, qui ne se gardent pas
+        if not callable(func) or not is_query or name.endswith("_stream"):
+            return func
+        if name not in self._wrapped:
+            self._wrapped[name] = cached(func, self.cache, self.version_of)
+        return self._wrapped[name]
+
+
+def print_stats(label, stats):
+    rate = "-" if stats["hit_rate"] is None else f"{stats['hit_rate']:.0%}"
+    print(
+        f"{label:<12} : {stats['hits']} hits, {stats['misses']} misses ({rate}), "
+        f"{stats['evictions']} évictions, {stats['expirations']} expirations, "
+        f"{stats['size']}/{stats['max_entries']} entrées, {stats['rows']}/{stats['max_rows']} lignes"
+    )
+
+
+if __name__ == "__main__":
+    from scripts.phase1_sqlite import queries
+    from scripts.phase1_sqlite.benchmark import DB_PATH, QUERY_PARAMS, build_tasks
+
+    parser = argparse.ArgumentParser(description="Démonstration du cache de résultats Q1-Q9")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--mongo-uri", help="Ajoute MongoDB structuré")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes de Q1-Q9")
+    parser.add_argument("--ttl", type=float, help="Durée de vie des résultats (s)")
+    parser.add_argument(
+        "--max-rows", type=int, default=MAX_ROWS, help="Lignes gardées au total, tous résultats"
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db_path)
+    conn.row_factory = sqlite3.Row
+    engines = [
+        (
+            "SQLite",
+            CachedQueries(queries, sqlite_version, QueryCache(ttl=args.ttl, max_rows=args.max_rows)),
+            lambda module: build_tasks(conn, module=module),
+        )
+    ]
+    if args.mongo_uri:
+        import pymongo
+
+        from scripts.phase2_mongodb import queries_structured as structured
+        from scripts.phase2_mongodb.benchmark_engines import structured_tasks
+
+        db = pymongo.MongoClient(args.mongo_uri)[structured.DB_NAME]
+        engines.append(
+            (
+                "Structuré",
+                CachedQueries(structured, mongo_version, QueryCache(ttl=args.ttl, max_rows=args.max_rows)),
+                lambda module: structured_tasks(db, QUERY_PARAMS, module),
+            )
+        )
+
+    for label, cached_queries, make_tasks in engines:
+        print(f"\n--- {label} ---")
+        for round_number in range(1, args.rounds + 1):
+            start = time.perf_counter()
+            for _, func in make_tasks(cached_queries):
+                func()
+            print(f"Passe {round_number} : {(time.perf_counter() - start) * 1000:.2f} ms")
+        print_stats(label, cached_queries.cache.stats())
+    conn.close()
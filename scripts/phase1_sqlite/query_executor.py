@@ -0,0 +1,259 @@
+# Exécution concurrente de requêtes Q1-Q9 (tableaux de bord) : un pool de threads,
+# chaque thread lit SQLite sur sa propre connexion en lecture seule (connection_pool.py)
+# et MongoDB par le MongoClient partagé (son pool de connexions interne). Chaque
+# requête a son délai maximal, compté depuis sa soumission ; les résultats sont rendus dans l'ordre où ils arrivent,
+# et la latence totale tend vers celle de la requête la plus lente.
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite import queries
+from scripts.phase1_sqlite.connection_pool import get_pool
+
+SQLITE = "sqlite"
+MONGO = "mongo"
+
+MAX_WORKERS = 8
+# Délai par requête (s), attente dans la file comprise
+TIMEOUT = 5.0
+# Instructions de la machine virtuelle SQLite entre deux vérifications du délai
+PROGRESS_STEPS = 10_000
+# Marge laissée à une requête interrompue pour rendre la main avant d'être abandonnée
+GRACE = 0.5
+
+
+def sqlite_query(name, func, *args, **kwargs):
+    """Invocation `func(conn, *args, **kwargs)` sur la connexion SQLite du thread"""
+    return {"name": name, "engine": SQLITE, "func": func, "args": args, "kwargs": kwargs}
+
+
+def mongo_query(name, func, *args, **kwargs):
+    """Invocation `func(db, *args, **kwargs)` sur la base MongoDB partagée"""
+    return {"name": name, "engine": MONGO, "func": func, "args": args, "kwargs": kwargs}
+
+
+def is_timeout(exc):
+    # SQLite : interrompue par le progress handler ; pymongo : pymongo.timeout() dépassé ;
+    # TimeoutError : délai écoulé avant qu'un thread ne prenne la requête
+    if isinstance(exc, TimeoutError):
+        return True
+    if isinstance(exc, sqlite3.OperationalError):
+        return str(exc) == "interrupted"
+    return bool(getattr(exc, "timeout", False))
+
+
+class QueryExecutor:
+    """
+    with QueryExecutor(db_path, mongo_db) as executor:
+        for result in executor.run([sqlite_query("Q5", queries.query_popular_genres), ...]):
+            ...
+    Chaque résultat : {name, engine, status ("ok", "timeout", "error"), result, error, ms}.
+    """
+
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        mongo_db=None,
+        max_workers=MAX_WORKERS,
+        timeout=TIMEOUT,
+        tuning="tuned",
+    ):
+        self.db_path = db_path
+        self.mongo_db = mongo_db
+        self.timeout = timeout
+        self._connections = get_pool(tuning)
+        self._threads = ThreadPoolExecutor(max_workers, thread_name_prefix="query")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Les requêtes abandonnées finissent en arrière-plan, sans être attendues
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def _call(self, invocation, submitted, started):
+        func, args, kwargs = invocation["func"], invocation["args"], invocation["kwargs"]
+        started.append(time.monotonic())
+        deadline = submitted + self.timeout
+        if started[0] >= deadline:
+            raise TimeoutError("délai dépassé dans la file d'attente")
+        if invocation["engine"] == SQLITE:
+            conn = self._connections.get(self.db_path)
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+            try:
+                return func(conn, *args, **kwargs)
+            finally:
+                conn.set_progress_handler(None, 0)
+
+        import pymongo
+
+        # Délai appliqué à toutes les commandes envoyées par la requête
+        with pymongo.timeout(deadline - started[0]):
+            return func(self.mongo_db, *args, **kwargs)
+
+    def _result(self, invocation, started, status, result=None, error=None):
+        # Durée d'exécution ; 0 pour une requête jamais commencée
+        elapsed = time.monotonic() - started[0] if started else 0.0
+        return {
+            "name": invocation["name"],
+            "engine": invocation["engine"],
+            "status": status,
+            "result": result,
+            "error": error,
+            "ms": elapsed * 1000,
+        }
+
+    def run(self, invocations):
+        """Générateur : un résultat par invocation, dans l'ordre de fin d'exécution"""
+        pending = {}
+        for invocation in invocations:
+            # Échéance comptée depuis la soumission : une requête restée dans la file
+            # derrière des requêtes lentes est rendue en timeout comme les autres.
+            # started : heure de début, remplie par le thread qui exécute la requête
+            submitted = time.monotonic()
+            started = []
+            future = self._threads.submit(self._call, invocation, submitted, started)
+            pending[future] = (invocation, submitted + self.timeout + GRACE, started)
+
+        while pending:
+            # Attente jusqu'à la prochaine échéance
+            now = time.monotonic()
+            wait_s = max(min(d for _, d, _ in pending.values()) - now, 0)
+            done, _ = wait(pending, timeout=wait_s, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                invocation, _, started = pending.pop(future)
+                try:
+                    yield self._result(invocation, started, "ok", result=future.result())
+                except Exception as exc:
+                    status = "timeout" if is_timeout(exc) else "error"
+                    yield self._result(invocation, started, status, error=str(exc))
+
+            # Requête toujours en file après son échéance : annulée. Toujours en cours
+            # (calcul Python, MongoDB sans délai côté serveur) : rendue en timeout,
+            # son thread termine seul
+            now = time.monotonic()
+            for future, (invocation, deadline, started) in list(pending.items()):
+                if now > deadline:
+                    del pending[future]
+                    error = (
+                        "délai dépassé (abandonnée)"
+                        if not future.cancel()
+                        else "délai dépassé dans la file d'attente"
+                    )
+                    yield self._result(invocation, started, "timeout", error=error)
+
+    async def arun(self, invocations):
+        """Variante asyncio (vues async) : mêmes résultats, sans bloquer la boucle"""
+        loop = asyncio.get_running_loop()
+        results = self.run(invocations)
+        while True:
+            result = await loop.run_in_executor(None, next, results, None)
+            if result is None:
+                return
+            yield result
+
+
+def suite_invocations(p, mongo=False):
+    """Q1-Q9 avec les paramètres de benchmark.py (SQLite, et MongoDB structuré)"""
+    invocations = [
+        sqlite_query("Q1 - Filmographie", queries.query_actor_filmography, p["actor_q1"]),
+        sqlite_query(
+            "Q2 - Top N films",
+            queries.query_top_movies_by_genre,
+            p["genre"], p["year_start"], p["year_end"], p["top_n"],
+        ),
+        sqlite_query("Q3 - Multi-rôles", queries.query_multi_role_actors),
+        sqlite_query(
+            "Q4 - Collaborations", queries.query_director_collaborations, p["actor_q4"]
+        ),
+        sqlite_query("Q5 - Genres Pop.", queries.query_popular_genres),
+        sqlite_query("Q6 - Carrière", queries.query_actor_career_stats, p["actor_q6"]),
+        sqlite_query("Q7 - Classement Genre", queries.query_top_3_per_genre, p["min_votes_q7"]),
+        sqlite_query("Q8 - Percée", queries.query_breakthrough_actors),
+        sqlite_query("Q9 - Longévité", queries.query_longest_careers),
+    ]
+    if mongo:
+        from scripts.phase2_mongodb import queries_structured as st
+
+        invocations += [
+            mongo_query("Q1 - Filmographie", st.q1_filmography_struct, p["actor_q1"]),
+            mongo_query(
+                "Q2 - Top N films",
+                st.q2_top_movies_struct,
+                p["genre"], p["year_start"], p["year_end"], p["top_n"], min_votes=0,
+            ),
+            mongo_query("Q3 - Multi-rôles", st.q3_multi_roles_struct),
+            mongo_query("Q4 - Collaborations", st.q4_collaborations_struct, p["actor_q4"]),
+            mongo_query("Q5 - Genres Pop.", st.q5_popular_genres_struct),
+            mongo_query("Q6 - Carrière", st.q6_career_struct, p["actor_q6"]),
+            mongo_query("Q7 - Classement Genre", st.q7_rank_genre_struct, p["min_votes_q7"]),
+            mongo_query("Q8 - Percée", st.q8_breakout_struct),
+            mongo_query("Q9 - Longévité", st.q9_complex_struct),
+        ]
+    return invocations
+
+
+if __name__ == "__main__":
+    from scripts.phase1_sqlite.benchmark import QUERY_PARAMS
+
+    parser = argparse.ArgumentParser(description="Q1-Q9 en séquence puis en parallèle")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--mongo-uri", help="Ajoute Q1-Q9 sur MongoDB structuré")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Délai par requête (s)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    mongo_db = None
+    if args.mongo_uri:
+        import pymongo
+
+        from scripts.phase2_mongodb.queries_structured import DB_NAME
+
+        # Un seul client pour tous les threads : son pool ouvre une connexion par thread actif
+        mongo_db = pymongo.MongoClient(args.mongo_uri, maxPoolSize=args.workers)[DB_NAME]
+    invocations = suite_invocations(QUERY_PARAMS, mongo=mongo_db is not None)
+
+    with QueryExecutor(args.db_path, mongo_db, 1, args.timeout) as executor:
+        # Connexions et caches chauds pour les deux mesures
+        list(executor.run(invocations))
+        start = time.perf_counter()
+        sequential = list(executor.run(invocations))
+        sequential_ms = (time.perf_counter() - start) * 1000
+
+    print(f"--- ⏱️  {len(invocations)} REQUÊTES, {args.workers} THREADS ---")
+    with QueryExecutor(args.db_path, mongo_db, args.workers, args.timeout) as executor:
+        list(executor.run(invocations))
+        start = time.perf_counter()
+        for result in executor.run(invocations):
+            at_ms = (time.perf_counter() - start) * 1000
+            detail = (
+                f"{len(result['result'])} lignes"
+                if result["status"] == "ok"
+                else f"❌ {result['status']} : {result['error'][:40]}"
+            )
+            print(
+                f"   👉 {at_ms:8.2f} ms | {result['engine']:<6} | {result['name']:<25} "
+                f": {result['ms']:8.2f} ms | {detail}"
+            )
+        concurrent_ms = (time.perf_counter() - start) * 1000
+
+    slowest = max(result["ms"] for result in sequential)
+    print(f"\nEn séquence        : {sequential_ms:.2f} ms")
+    print(f"En parallèle       : {concurrent_ms:.2f} ms")
+    print(f"Requête la plus lente (seule) : {slowest:.2f} ms")
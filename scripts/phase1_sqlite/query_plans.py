@@ -0,0 +1,312 @@
+# Capture des plans d'exécution de Q1-Q9 et détection des changements de plan.
+# SQLite : EXPLAIN QUERY PLAN de chaque requête. MongoDB : résumé de
+# explain("executionStats") de chaque opération (étapes du plan gagnant,
+# clés et documents examinés). Les benchmarks stockent ces plans dans leur JSON ;
+# le mode diff signale les plans modifiés et les sauts de documents examinés.
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.benchmark import DB_PATH, QUERY_PARAMS, build_tasks
+from scripts.phase1_sqlite.index_advisor import (
+    capture_workload,
+    plan_issues,
+    query_plan,
+    table_aliases,
+)
+
+# Saut signalé : documents (ou clés) examinés multipliés par plus de 2...
+EXAMINED_JUMP = 2.0
+# ... et en hausse d'au moins 1 000 (évite le bruit sur les petites valeurs)
+EXAMINED_MIN_DELTA = 1000
+
+
+# --- SQLite ---
+
+
+def sqlite_plans(conn, tasks_factory=build_tasks):
+    """
+    {requête: {sql, plan, issues}} : plan = lignes de EXPLAIN QUERY PLAN,
+    issues = parcours complets / B-trees temporaires relevés dans ce plan.
+    """
+    plans = {}
+    for query in capture_workload(conn, tasks_factory):
+        details = query_plan(conn, query["sql"], query["params"])
+        plans[query["name"]] = {
+            "sql": " ".join(query["sql"].split()),
+            "plan": details,
+            "issues": plan_issues(details, table_aliases(conn, query["sql"])),
+        }
+    return plans
+
+
+# --- MongoDB ---
+
+
+class _RecordingCollection:
+    """Collection qui note les opérations de lecture pour pouvoir les expliquer"""
+
+    def __init__(self, recorder, collection):
+        self._recorder = recorder
+        self._collection = collection
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        self._recorder.operations.append(
+            ("command", {"aggregate": self._collection.name, "pipeline": pipeline, "cursor": {}})
+        )
+        return self._collection.aggregate(pipeline, *args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        # Le curseur garde filtre, projection, tri et limite : explain() les reprend
+        cursor = self._collection.find(*args, **kwargs)
+        self._recorder.operations.append(("cursor", cursor))
+        return cursor
+
+    def find_one(self, filter=None, *args, **kwargs):
+        self._recorder.operations.append(
+            ("cursor", self._collection.find(filter, *args, **kwargs).limit(-1))
+        )
+        return self._collection.find_one(filter, *args, **kwargs)
+
+    def distinct(self, key, filter=None, **kwargs):
+        self._recorder.operations.append(
+            ("command", {"distinct": self._collection.name, "key": key, "query": filter or {}})
+        )
+        return self._collection.distinct(key, filter, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class _RecordingDatabase:
+    def __init__(self, db):
+        self._db = db
+        self.operations = []
+
+    def __getitem__(self, name):
+        return _RecordingCollection(self, self._db[name])
+
+    def __getattr__(self, name):
+        # db.persons -> collection enregistrée ; db.list_collection_names -> méthode
+        value = getattr(self._db, name)
+        return self[name] if hasattr(value, "find") else value
+
+
+def _plan_stages(plan):
+    """Étapes du plan gagnant, de la racine aux feuilles : 'LIMIT > FETCH > IXSCAN(year_1)'"""
+    # Moteur SBE (MongoDB 7+) : le plan classique est sous "queryPlan"
+    plan = plan.get("queryPlan", plan)
+    label = plan.get("stage", "?")
+    if plan.get("indexName"):
+        label += f"({plan['indexName']})"
+    if "inputStage" in plan:
+        return f"{label} > {_plan_stages(plan['inputStage'])}"
+    if plan.get("inputStages"):
+        return f"{label} > [{', '.join(_plan_stages(p) for p in plan['inputStages'])}]"
+    return label
+
+
+def explain_summary(explain):
+    """Résumé d'une sortie explain("executionStats") de find, distinct ou aggregate"""
+    summary = {"plan": [], "keys_examined": 0, "docs_examined": 0, "n_returned": None}
+
+    def add_planner(doc):
+        planner = doc.get("queryPlanner", {})
+        if "winningPlan" in planner:
+            summary["plan"].append(_plan_stages(planner["winningPlan"]))
+        stats = doc.get("executionStats", {})
+        summary["keys_examined"] += stats.get("totalKeysExamined", 0)
+        summary["docs_examined"] += stats.get("totalDocsExamined", 0)
+        if "nReturned" in stats:
+            summary["n_returned"] = stats["nReturned"]
+
+    if "shards" in explain:
+        for shard in explain["shards"].values():
+            shard_summary = explain_summary(shard)
+            summary["plan"].append(shard_summary["plan"])
+            summary["keys_examined"] += shard_summary["keys_examined"]
+            summary["docs_examined"] += shard_summary["docs_examined"]
+    elif "stages" in explain:
+        # Pipeline non entièrement délégué au moteur de requêtes : $cursor puis étapes
+        for stage in explain["stages"]:
+            name = next(iter(stage))
+            if name == "$cursor":
+                add_planner(stage["$cursor"])
+                continue
+            label = name
+            if stage.get("indexesUsed"):
+                label += f"({', '.join(stage['indexesUsed'])})"
+            if stage.get("collectionScans"):
+                label += f"[COLLSCAN x{stage['collectionScans']}]"
+            summary["plan"].append(label)
+            summary["keys_examined"] += stage.get("totalKeysExamined", 0)
+            summary["docs_examined"] += stage.get("totalDocsExamined", 0)
+    else:
+        add_planner(explain)
+
+    summary["plan"] = " | ".join(summary["plan"])
+    return summary
+
+
+def explain_operation(db, operation):
+    kind, value = operation
+    if kind == "cursor":
+        # Sans verbosité explicite, le serveur renvoie allPlansExecution (inclut executionStats)
+        return explain_summary(value.explain())
+    return explain_summary(db.command({"explain": value, "verbosity": "executionStats"}))
+
+
+def mongo_plans(db, tasks_factory, params=QUERY_PARAMS):
+    """
+    {requête: {plan, keys_examined, docs_examined, operations}} pour les tâches
+    `tasks_factory(db, params)` (flat_tasks / structured_tasks de benchmark_engines).
+    """
+    recorder = _RecordingDatabase(db)
+    plans = {}
+    for name, func in tasks_factory(recorder, params):
+        start = len(recorder.operations)
+        try:
+            func()
+            operations = [explain_operation(db, op) for op in recorder.operations[start:]]
+        except Exception as e:
+            plans[name] = {"error": str(e)}
+            continue
+        plans[name] = {
+            "plan": " ; ".join(op["plan"] for op in operations),
+            "keys_examined": sum(op["keys_examined"] for op in operations),
+            "docs_examined": sum(op["docs_examined"] for op in operations),
+            "operations": operations,
+        }
+    return plans
+
+
+# --- Comparaison ---
+
+
+def _jumped(before, after, jump, min_delta):
+    return after - before >= min_delta and after > before * jump
+
+
+def diff_plans(baseline, current, jump=EXAMINED_JUMP, min_delta=EXAMINED_MIN_DELTA):
+    """
+    Compare deux captures {moteur: {requête: plan}}. Retourne la liste des écarts :
+    plan modifié (régression si un parcours complet, un B-tree temporaire ou un
+    COLLSCAN apparaît), saut du nombre de clés ou de documents examinés.
+    """
+    findings = []
+    for engine, queries in current.items():
+        for name, after in queries.items():
+            before = baseline.get(engine, {}).get(name)
+            if before is None or "error" in before or "error" in after:
+                continue
+
+            def flag(kind, old, new):
+                findings.append(
+                    {"engine": engine, "query": name, "kind": kind, "before": old, "after": new}
+                )
+
+            if engine == "sqlite":
+                if after["plan"] != before["plan"]:
+                    new_issues = [i for i in after["issues"] if i not in before["issues"]]
+                    flag(
+                        "régression de plan" if new_issues else "plan modifié",
+                        before["plan"],
+                        after["plan"],
+                    )
+                continue
+
+            if after["plan"] != before["plan"]:
+                collscan = "COLLSCAN" in after["plan"] and "COLLSCAN" not in before["plan"]
+                flag(
+                    "régression de plan" if collscan else "plan modifié",
+                    before["plan"],
+                    after["plan"],
+                )
+            for key in ("docs_examined", "keys_examined"):
+                if _jumped(before[key], after[key], jump, min_delta):
+                    flag(key, before[key], after[key])
+    return findings
+
+
+def print_diff(findings):
+    print("\n" + "=" * 85)
+    print("PLANS D'EXÉCUTION")
+    print("-" * 85)
+    if not findings:
+        print("✅ Aucun changement de plan ni saut de documents examinés.")
+    for f in findings:
+        print(f"❌ [{f['engine']}] {f['query']} : {f['kind']}")
+        if isinstance(f["before"], list):
+            print("   avant : " + "\n           ".join(f["before"]))
+            print("   après : " + "\n           ".join(f["after"]))
+        else:
+            print(f"   avant : {f['before']}")
+            print(f"   après : {f['after']}")
+    print("=" * 85)
+
+
+def load_plans(path):
+    """Plans d'un fichier de résultats (bench_harness, benchmark_engines ou capture)"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("plans", {})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plans d'exécution de Q1-Q9")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    capture_parser = sub.add_parser("capture", help="Capture les plans dans un JSON")
+    capture_parser.add_argument("--db-path", default=DB_PATH)
+    capture_parser.add_argument(
+        "--mongo-uri", help="Ajoute les plans MongoDB (flat et structuré) de cette instance"
+    )
+    capture_parser.add_argument("--output", required=True)
+
+    diff_parser = sub.add_parser(
+        "diff", help="Compare deux captures (code retour 1 si un écart est trouvé)"
+    )
+    diff_parser.add_argument("baseline")
+    diff_parser.add_argument("current")
+    diff_parser.add_argument("--jump", type=float, default=EXAMINED_JUMP)
+    diff_parser.add_argument("--min-delta", type=int, default=EXAMINED_MIN_DELTA)
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        if not os.path.exists(args.db_path):
+            print(f"❌ Base introuvable : {args.db_path}")
+            sys.exit(1)
+        conn = sqlite3.connect(args.db_path)
+        conn.row_factory = sqlite3.Row
+        plans = {"sqlite": sqlite_plans(conn)}
+        conn.close()
+        if args.mongo_uri:
+            import pymongo
+
+            from scripts.phase2_mongodb.benchmark_engines import flat_tasks, structured_tasks
+            from scripts.phase2_mongodb.queries_mongo import DB_NAME
+
+            db = pymongo.MongoClient(args.mongo_uri)[DB_NAME]
+            plans["flat"] = mongo_plans(db, flat_tasks)
+            plans["structured"] = mongo_plans(db, structured_tasks)
+        for engine, queries in plans.items():
+            for name, data in queries.items():
+                if engine == "sqlite":
+                    detail = f"{len(data['issues'])} point(s) faible(s)"
+                else:
+                    detail = data.get("error", data.get("plan"))
+                print(f"[{engine}] {name:<25} : {detail}")
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"plans": plans}, f, indent=2, ensure_ascii=False)
+        print(f"\nPlans écrits dans {args.output}")
+    else:
+        findings = diff_plans(
+            load_plans(args.baseline), load_plans(args.current), args.jump, args.min_delta
+        )
+        print_diff(findings)
+        if findings:
+            sys.exit(1)
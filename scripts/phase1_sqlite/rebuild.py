@@ -0,0 +1,215 @@
+# Reconstruction complète de imdb.db sans interruption du site :
+# la nouvelle base est construite à côté, dans un fichier versionné
+# (imdb.<date>.db), puis data/imdb.db devient atomiquement un lien vers elle.
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.create_schema import DB_PATH, create_schema
+from scripts.phase1_sqlite.import_data import CHUNK_SIZE, CSV_DIR, IMPORT_MODES, import_data
+from scripts.phase1_sqlite.import_imdb_dumps import DUMPS_DIR, import_dumps
+
+# Tables gérées par Django (sessions, comptes, migrations) à conserver d'une base à l'autre
+DJANGO_TABLE_PREFIXES = ("django_", "auth_")
+
+# Tables qui ne peuvent pas être vides dans une base mise en service
+REQUIRED_TABLES = ("movies", "persons", "principals", "ratings")
+
+
+def copy_django_tables(conn, live_path):
+    """
+    Recopie les tables Django (schéma, index et contenu) depuis la base en service.
+    Appelée juste avant swap_in : seules les écritures faites entre cette copie
+    et le remplacement (sessions, comptes) sont perdues.
+    """
+    if not os.path.exists(live_path):
+        return 0
+
+    conn.execute("ATTACH DATABASE ? AS live", (live_path,))
+    objects = conn.execute(
+        "SELECT type, name, tbl_name, sql FROM live.sqlite_master "
+        "WHERE sql IS NOT NULL AND type IN ('table', 'index') ORDER BY type DESC"
+    ).fetchall()
+
+    copied = 0
+    for obj_type, name, tbl_name, sql in objects:
+        if not tbl_name.startswith(DJANGO_TABLE_PREFIXES):
+            continue
+        conn.execute(sql)
+        if obj_type == "table":
+            conn.execute(f"INSERT INTO main.{name} SELECT * FROM live.{name}")
+            copied += 1
+
+    # Compteurs AUTOINCREMENT des tables Django
+    has_sequence = conn.execute(
+        "SELECT 1 FROM live.sqlite_master WHERE name = 'sqlite_sequence'"
+    ).fetchone()
+    if has_sequence and copied:
+        django_seq = "name LIKE 'django\\_%' ESCAPE '\\' OR name LIKE 'auth\\_%' ESCAPE '\\'"
+        # La recopie des lignes a déjà créé des compteurs : on les remplace par ceux d'origine
+        conn.execute(f"DELETE FROM main.sqlite_sequence WHERE {django_seq}")
+        conn.execute(
+            "INSERT INTO main.sqlite_sequence (name, seq) "
+            f"SELECT name, seq FROM live.sqlite_sequence WHERE {django_seq}"
+        )
+    conn.commit()
+    conn.execute("DETACH DATABASE live")
+    return copied
+
+
+def empty_tables(db_path):
+    """Tables de REQUIRED_TABLES sans aucune ligne dans la base construite"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return [
+            table
+            for table in REQUIRED_TABLES
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+        ]
+    finally:
+        conn.close()
+
+
+def versioned_path(live_path):
+    """data/imdb.db -> data/imdb.<date>[-n].db : fichier libre pour la nouvelle base"""
+    root, ext = os.path.splitext(live_path)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path, n = f"{root}.{stamp}{ext}", 1
+    # Deux reconstructions dans la même seconde : la version en service est à garder
+    while os.path.lexists(path):
+        path, n = f"{root}.{stamp}-{n}{ext}", n + 1
+    return path
+
+
+def optimize(db_path):
+    """
+    Statistiques du planificateur et compactage, sur la base temporaire uniquement.
+    La base passe en journal WAL (réglage stocké dans le fichier) : un import
+    incrémental ne bloque plus les lecteurs du site.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE")
+    # finalize_fast_load a déjà compacté la base : pas de second VACUUM complet inutile
+    if conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+        conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+
+
+def swap_in(new_path, live_path):
+    """
+    Fait pointer `live_path` sur `new_path` : un lien symbolique, remplacé par
+    os.replace (atomique). SQLite suit le lien et nomme ses fichiers -wal, -shm et
+    -journal d'après le fichier versionné : une connexion restée ouverte sur
+    l'ancienne version n'écrit jamais dans les fichiers de la nouvelle. Les
+    connexions déjà ouvertes lisent l'ancienne version jusqu'à leur fermeture
+    (le pool et Django rouvrent quand l'inode change) ; les nouvelles ouvrent
+    directement la nouvelle base. L'ancienne version est ensuite supprimée.
+    """
+    previous = os.path.realpath(live_path) if os.path.islink(live_path) else None
+    link_path = f"{live_path}.link-{os.getpid()}"
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    try:
+        os.symlink(os.path.basename(new_path), link_path)
+    except (OSError, NotImplementedError):
+        # Pas de liens symboliques (Windows sans droits) : remplacement du fichier,
+        # sans WAL pour ne laisser aucun journal nommé d'après data/imdb.db
+        conn = sqlite3.connect(new_path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+        os.replace(new_path, live_path)
+        return
+
+    os.replace(link_path, live_path)
+    if previous and previous != os.path.realpath(new_path) and os.path.exists(previous):
+        # Les connexions encore ouvertes gardent leur descripteur sur le fichier supprimé
+        os.remove(previous)
+
+
+def rebuild(
+    source="csv",
+    mode="stream",
+    fast_load=True,
+    chunksize=CHUNK_SIZE,
+    db_path=DB_PATH,
+    int_ids=False,
+    csv_dir=CSV_DIR,
+    dumps_dir=DUMPS_DIR,
+):
+    tmp_path = versioned_path(db_path)
+    start_global = time.time()
+
+    print(f"🔨 Construction dans la nouvelle base : {tmp_path}")
+    create_schema(fast_load=fast_load, db_path=tmp_path, int_ids=int_ids)
+    if not os.path.exists(tmp_path):
+        return
+
+    try:
+        if source == "dumps":
+            problems = import_dumps(dumps_dir, batch_size=chunksize, db_path=tmp_path)
+        else:
+            problems = import_data(
+                mode=mode, chunksize=chunksize, db_path=tmp_path, csv_dir=csv_dir
+            )
+
+        # Base incomplète : la base en service est conservée
+        problems += [f"table {table} vide" for table in empty_tables(tmp_path)]
+        if problems:
+            os.remove(tmp_path)
+            print(f"\n❌ Import incomplet, {db_path} n'est pas remplacée :")
+            for problem in problems:
+                print(f"   - {problem}")
+            return
+
+        print("\nANALYZE / VACUUM de la nouvelle base...")
+        optimize(tmp_path)
+
+        # Sessions et comptes au plus près du remplacement
+        conn = sqlite3.connect(tmp_path)
+        copied = copy_django_tables(conn, db_path)
+        conn.close()
+        print(f"{copied} tables Django recopiées depuis la base en service.")
+
+        swap_in(tmp_path, db_path)
+    except PermissionError:
+        # Windows : un fichier ouvert ne peut pas être remplacé
+        print(f"❌ Impossible de remplacer {db_path}. Nouvelle base conservée : {tmp_path}")
+        return
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f"\n✅ Nouvelle base en service : {db_path} ({time.time() - start_global:.2f} s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruction atomique de imdb.db")
+    parser.add_argument("--source", choices=("csv", "dumps"), default="csv")
+    parser.add_argument("--mode", choices=IMPORT_MODES, default="stream")
+    parser.add_argument(
+        "--no-fast-load", action="store_true", help="Import direct dans les tables avec clés"
+    )
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--int-ids", action="store_true", help="Identifiants en INTEGER")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--csv-dir", default=CSV_DIR)
+    parser.add_argument("--dumps-dir", default=DUMPS_DIR)
+    args = parser.parse_args()
+
+    rebuild(
+        source=args.source,
+        mode=args.mode,
+        fast_load=not args.no_fast_load,
+        chunksize=args.chunksize,
+        db_path=args.db_path,
+        int_ids=args.int_ids,
+        csv_dir=args.csv_dir,
+        dumps_dir=args.dumps_dir,
+    )
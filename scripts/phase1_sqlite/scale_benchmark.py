@@ -0,0 +1,194 @@
+# Benchmark de passage à l'échelle : pour chaque facteur (1x, 10x, 100x...), génère
+# les données synthétiques, crée le schéma, importe, puis mesure Q1-Q9.
+# Chaque étape tourne dans son propre processus : durée et pic mémoire (RSS) par étape.
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.generate_data import SEED, SYNTH_DIR
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MONGO_SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts", "phase2_mongodb")
+
+SCALES = (1, 10, 100)
+ITERATIONS = 5
+
+
+def run_stage(cmd):
+    """
+    Lance une étape et retourne (durée en s, pic RSS en Mo ou None).
+    os.wait4 donne l'usage mémoire du seul processus enfant (Unix) ;
+    ailleurs seule la durée est mesurée.
+    """
+    start = time.perf_counter()
+    # stderr dans un fichier : un tube plein bloquerait l'enfant pendant os.wait4
+    with tempfile.TemporaryFile(mode="w+") as errors:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=errors, text=True)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss est en Ko sous Linux, en octets sous macOS
+            divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+            peak = usage.ru_maxrss / divisor
+        else:
+            proc.wait()
+            peak = None
+        duration = time.perf_counter() - start
+        if proc.returncode != 0:
+            errors.seek(0)
+            raise RuntimeError(f"Échec de {os.path.basename(cmd[1])} :\n{errors.read()}")
+    return duration, peak
+
+
+def table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    counts = {
+        name: conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        for name in ("movies", "persons", "principals")
+    }
+    conn.close()
+    return counts
+
+
+def run_scale(scale, seed=SEED, iterations=ITERATIONS, mongo=False, keep=False):
+    """Exécute toutes les étapes du pipeline pour un facteur d'échelle"""
+    scale_dir = os.path.join(SYNTH_DIR, f"x{scale:g}")
+    csv_dir = os.path.join(scale_dir, "csv")
+    db_path = os.path.join(scale_dir, "imdb.db")
+    python = sys.executable
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queries_json = os.path.join(tmp, "queries.json")
+        mongo_json = os.path.join(tmp, "mongo.json")
+        stages = [
+            ("generate", [python, os.path.join(SCRIPTS_DIR, "generate_data.py"),
+                          "--scale", str(scale), "--seed", str(seed), "--output-dir", csv_dir]),
+            ("schema", [python, os.path.join(SCRIPTS_DIR, "create_schema.py"),
+                        "--fast-load", "--db-path", db_path]),
+            ("import", [python, os.path.join(SCRIPTS_DIR, "import_data.py"),
+                        "--db-path", db_path, "--csv-dir", csv_dir]),
+            ("queries", [python, os.path.join(SCRIPTS_DIR, "bench_harness.py"), "run",
+                         "--db-path", db_path, "--iterations", str(iterations),
+                         "--cold-runs", "0", "--output", queries_json]),
+        ]
+        if mongo:
+            # Chargement des collections (plate et structurée) dans mongomock + Q1-Q9
+            stages.append(
+                ("mongo", [python, os.path.join(MONGO_SCRIPTS_DIR, "benchmark_engines.py"),
+                           "--db-path", db_path, "--mock", "--iterations", str(iterations),
+                           "--output", mongo_json])
+            )
+
+        result = {"scale": scale, "seed": seed, "stages": {}}
+        for stage, cmd in stages:
+            print(f"   ⏱️  x{scale:g} - {stage}...", flush=True)
+            duration, peak = run_stage(cmd)
+            result["stages"][stage] = {"seconds": duration, "peak_rss_mb": peak}
+
+        result["rows"] = table_counts(db_path)
+        result["db_size_mb"] = os.path.getsize(db_path) / (1024 * 1024)
+        with open(queries_json, encoding="utf-8") as f:
+            result["queries"] = {
+                name: data["warm"]["p50"] for name, data in json.load(f)["queries"].items()
+            }
+        if mongo:
+            with open(mongo_json, encoding="utf-8") as f:
+                result["mongo_queries"] = {
+                    name: {
+                        engine: entry[engine]["stats"]["p50"]
+                        for engine in ("flat", "structured")
+                        if entry[engine].get("stats")
+                    }
+                    for name, entry in json.load(f)["queries"].items()
+                }
+
+    if not keep:
+        os.remove(db_path)
+    return result
+
+
+def print_report(results):
+    stages = list(results[0]["stages"])
+    width = 22 + 20 * len(results)
+    print("\n" + "=" * width)
+    print(f"{'ÉTAPE':<20}" + "".join(f" | {'x' + format(r['scale'], 'g'):>17}" for r in results))
+    print("-" * width)
+    print(f"{'films':<20}" + "".join(f" | {r['rows']['movies']:>17,}" for r in results))
+    print(f"{'base (Mo)':<20}" + "".join(f" | {r['db_size_mb']:>17.1f}" for r in results))
+    for stage in stages:
+        cells = []
+        for r in results:
+            data = r["stages"][stage]
+            peak = f"{data['peak_rss_mb']:.0f} Mo" if data["peak_rss_mb"] is not None else "-"
+            cells.append(f"{data['seconds']:.1f} s / {peak}")
+        print(f"{stage:<20}" + "".join(f" | {cell:>17}" for cell in cells))
+    print("-" * width)
+    for name in results[0]["queries"]:
+        print(f"{name:<20}" + "".join(f" | {r['queries'][name]:>14.2f} ms" for r in results))
+    print("=" * width)
+
+
+def plot_results(results, path):
+    """Durée et mémoire de chaque étape, latence de chaque requête, en fonction du nombre de films"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    movies = [r["rows"]["movies"] for r in results]
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    for stage in results[0]["stages"]:
+        axes[0].plot(movies, [r["stages"][stage]["seconds"] for r in results], "o-", label=stage)
+        peaks = [r["stages"][stage]["peak_rss_mb"] for r in results]
+        if None not in peaks:
+            axes[1].plot(movies, peaks, "o-", label=stage)
+    for name in results[0]["queries"]:
+        axes[2].plot(movies, [r["queries"][name] for r in results], "o-", label=name)
+
+    titles = ("Durée par étape (s)", "Pic mémoire par étape (Mo)", "Latence Q1-Q9 (p50, ms)")
+    for ax, title in zip(axes, titles):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("Films")
+        ax.set_title(title)
+        ax.legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"Graphique écrit dans {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline à plusieurs échelles")
+    parser.add_argument(
+        "--scales", type=float, nargs="+", default=list(SCALES), help="Facteurs d'échelle"
+    )
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument(
+        "--mongo", action="store_true", help="Ajoute l'étape MongoDB (mongomock)"
+    )
+    parser.add_argument("--keep", action="store_true", help="Conserve les bases générées")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--plot", help="Image PNG des courbes (matplotlib)")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        print(f"📈 Échelle x{scale:g}")
+        results.append(run_scale(scale, args.seed, args.iterations, args.mongo, args.keep))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {args.output}")
+    if args.plot:
+        plot_results(results, args.plot)
@@ -0,0 +1,178 @@
+# Index plein texte (FTS5) des titres et des noms.
+# Remplace les LIKE '%...%' (qui ne peuvent utiliser aucun index) pour la recherche
+# du site. Les noms de Q1, Q4 et Q6 sont résolus par name_resolver.py.
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+
+MOVIE_INDEX = "movies_fts"
+PERSON_INDEX = "persons_fts"
+
+# remove_diacritics 2 : "amelie" trouve "Amélie" (et inversement), y compris les
+# lettres à plusieurs diacritiques
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Poids bm25 par colonne de movies_fts (movie_id, title, original_title, akas) :
+# le titre principal compte plus qu'un titre alternatif
+MOVIE_WEIGHTS = (0.0, 10.0, 5.0, 1.0)
+
+# Séparateur des titres alternatifs concaténés dans la colonne akas
+AKAS_SEPARATOR = " | "
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def has_search_index(conn):
+    """Vrai si l'index a été construit sur cette base"""
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (PERSON_INDEX,)
+        ).fetchone()
+        is not None
+    )
+
+
+def match_query(text, phrase=False):
+    """
+    Saisie utilisateur -> expression MATCH FTS5 (None si aucun mot).
+    Chaque mot est mis entre guillemets : les opérateurs FTS5 (AND, NEAR, -, *)
+    tapés par l'utilisateur restent du texte.
+    - par défaut : tous les mots, dans n'importe quel ordre, en préfixe ("amel pou")
+    - phrase=True : les mots dans l'ordre, le dernier en préfixe (comme LIKE '%Brad Pitt%')
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    if phrase:
+        return '"' + " ".join(tokens) + '" *'
+    return " ".join(f'"{token}" *' for token in tokens)
+
+
+def build_search_index(conn):
+    """(Re)construit les deux tables FTS5 à partir de movies, titles et persons"""
+    for index in (MOVIE_INDEX, PERSON_INDEX):
+        conn.execute(f"DROP TABLE IF EXISTS {index}")
+
+    # Une ligne par film : bm25 classe le film, pas chacun de ses titres
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE {MOVIE_INDEX} USING fts5(
+            movie_id UNINDEXED, title, original_title, akas,
+            tokenize = '{TOKENIZER}'
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO {MOVIE_INDEX} (movie_id, title, original_title, akas)
+        WITH akas AS (
+            -- Un seul parcours de titles (pas d'index sur titles.movie_id),
+            -- au lieu d'une sous-requête corrélée par film
+            SELECT movie_id, group_concat(title, '{AKAS_SEPARATOR}') AS akas
+            FROM (
+                SELECT DISTINCT t.movie_id, t.title
+                FROM titles t
+                JOIN movies m ON m.movie_id = t.movie_id
+                WHERE t.title IS NOT m.title
+                  AND t.title IS NOT m.original_title
+            )
+            GROUP BY movie_id
+        )
+        SELECT
+            m.movie_id,
+            m.title,
+            NULLIF(m.original_title, m.title),
+            a.akas
+        FROM movies m
+        LEFT JOIN akas a ON a.movie_id = m.movie_id
+        """
+    )
+
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE {PERSON_INDEX} USING fts5(
+            person_id UNINDEXED, name,
+            tokenize = '{TOKENIZER}'
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO {PERSON_INDEX} (person_id, name)
+        SELECT person_id, name FROM persons WHERE name IS NOT NULL
+        """
+    )
+
+    # Fusion des segments : index compact pour les lectures
+    for index in (MOVIE_INDEX, PERSON_INDEX):
+        conn.execute(f"INSERT INTO {index} ({index}) VALUES ('optimize')")
+    conn.commit()
+
+    return {
+        index: conn.execute(f"SELECT COUNT(*) FROM {index}").fetchone()[0]
+        for index in (MOVIE_INDEX, PERSON_INDEX)
+    }
+
+
+def search_movies(conn, text, limit=10):
+    """Identifiants des films correspondant à `text`, du plus pertinent au moins pertinent"""
+    query = match_query(text)
+    if query is None:
+        return []
+    weights = ", ".join(str(w) for w in MOVIE_WEIGHTS)
+    rows = conn.execute(
+        f"""
+        SELECT movie_id FROM {MOVIE_INDEX}
+        WHERE {MOVIE_INDEX} MATCH ?
+        ORDER BY bm25({MOVIE_INDEX}, {weights})
+        LIMIT ?
+        """,
+        (query, limit),
+    )
+    return [row[0] for row in rows]
+
+
+def search_persons(conn, text, limit=10):
+    """Identifiants des personnes correspondant à `text`, classés par bm25"""
+    query = match_query(text)
+    if query is None:
+        return []
+    rows = conn.execute(
+        f"""
+        SELECT person_id FROM {PERSON_INDEX}
+        WHERE {PERSON_INDEX} MATCH ?
+        ORDER BY rank
+        LIMIT ?
+        """,
+        (query, limit),
+    )
+    return [row[0] for row in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index plein texte des titres et des noms")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--search", help="Teste une recherche après construction")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db_path)
+    if args.search:
+        print(f"Films : {search_movies(conn, args.search)}")
+        print(f"Personnes : {search_persons(conn, args.search)}")
+    else:
+        start = time.perf_counter()
+        counts = build_search_index(conn)
+        for index, count in counts.items():
+            print(f"✅ {index} : {count} entrées.")
+        print(f"Index construit en {time.perf_counter() - start:.2f} s.")
+    conn.close()
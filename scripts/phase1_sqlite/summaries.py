@@ -0,0 +1,286 @@
+# Tables de synthèse matérialisées pour les pages Accueil et Statistiques, et
+# carrières par personne (Q6, Q8, Q9 et page Personne).
+# Les agrégats (COUNT, GROUP BY sur principals...) sont calculés une fois après
+# l'import au lieu d'être refaits à chaque requête HTTP.
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.imdb_ids import schema_ddl, uses_int_ids
+
+# Nombre d'acteurs conservés dans le classement (la page Statistiques en affiche 10)
+TOP_ACTORS_LIMIT = 50
+
+# Q8 : un film "succès" dépasse ce nombre de votes
+BREAKTHROUGH_VOTES = 200_000
+
+# Ligne de summary_counts qui identifie l'état des données (cache de query_cache.py)
+DATASET_VERSION = "dataset_version"
+
+SUMMARY_TABLES = [
+    (
+        "summary_counts",
+        """
+        CREATE TABLE IF NOT EXISTS summary_counts (
+            name TEXT PRIMARY KEY,
+            value INTEGER
+        )
+        """,
+        # refreshed_at : horodatage Unix du dernier calcul
+        """
+        SELECT 'movies', COUNT(*) FROM movies
+        UNION ALL SELECT 'persons', COUNT(*) FROM persons
+        UNION ALL SELECT 'directors', COUNT(DISTINCT person_id) FROM directors
+        UNION ALL SELECT 'ratings', COUNT(*) FROM ratings
+        UNION ALL SELECT 'refreshed_at', CAST(strftime('%s', 'now') AS INTEGER)
+        """,
+    ),
+    (
+        "summary_genres",
+        """
+        CREATE TABLE IF NOT EXISTS summary_genres (
+            genre TEXT PRIMARY KEY,
+            movie_count INTEGER,
+            avg_rating REAL
+        )
+        """,
+        """
+        SELECT g.genre, COUNT(*), ROUND(AVG(r.average_rating), 2)
+        FROM genres g
+        LEFT JOIN ratings r ON g.movie_id = r.movie_id
+        GROUP BY g.genre
+        """,
+    ),
+    (
+        "summary_decades",
+        """
+        CREATE TABLE IF NOT EXISTS summary_decades (
+            decade INTEGER PRIMARY KEY,
+            movie_count INTEGER
+        )
+        """,
+        """
+        SELECT (year / 10) * 10 AS decade, COUNT(*)
+        FROM movies
+        WHERE year IS NOT NULL
+        GROUP BY decade
+        """,
+    ),
+    (
+        "summary_rating_histogram",
+        """
+        CREATE TABLE IF NOT EXISTS summary_rating_histogram (
+            bucket INTEGER PRIMARY KEY,
+            movie_count INTEGER
+        )
+        """,
+        # Tranches entières 0..10 (une note de 7.8 compte dans la tranche 7)
+        """
+        SELECT CAST(average_rating AS INTEGER) AS bucket, COUNT(*)
+        FROM ratings
+        WHERE average_rating IS NOT NULL
+        GROUP BY bucket
+        """,
+    ),
+    (
+        "summary_top_actors",
+        """
+        CREATE TABLE IF NOT EXISTS summary_top_actors (
+            rank INTEGER PRIMARY KEY,
+            person_id TEXT,
+            name TEXT,
+            movie_count INTEGER
+        )
+        """,
+        f"""
+        SELECT
+            ROW_NUMBER() OVER (ORDER BY t.movie_count DESC, pe.name),
+            t.person_id, pe.name, t.movie_count
+        FROM (
+            SELECT person_id, COUNT(DISTINCT movie_id) AS movie_count
+            FROM principals
+            WHERE category IN ('actor', 'actress')
+            GROUP BY person_id
+            ORDER BY movie_count DESC
+            LIMIT {TOP_ACTORS_LIMIT}
+        ) t
+        JOIN persons pe ON pe.person_id = t.person_id
+        """,
+    ),
+    (
+        # Carrière d'acteur (crédits actor / actress de films datés) : Q8, Q9.
+        # first_hit_* : percée de Q8, premier film à plus de BREAKTHROUGH_VOTES votes
+        # précédé d'au moins 3 films (tous métiers) moins votés ;
+        # films_before_hit : nombre de ces films moins votés sortis avant lui
+        "person_careers",
+        """
+        CREATE TABLE IF NOT EXISTS person_careers (
+            person_id TEXT PRIMARY KEY,
+            first_year INTEGER,
+            last_year INTEGER,
+            career_span INTEGER,
+            film_count INTEGER,
+            first_hit_movie_id TEXT,
+            first_hit_year INTEGER,
+            films_before_hit INTEGER
+        )
+        """,
+        f"""
+        WITH acting AS (
+            SELECT p.person_id, m.movie_id, m.year, r.num_votes
+            FROM principals p
+            JOIN movies m ON m.movie_id = p.movie_id
+            LEFT JOIN ratings r ON r.movie_id = m.movie_id
+            WHERE p.category IN ('actor', 'actress')
+              AND m.year IS NOT NULL
+        ),
+        spans AS (
+            SELECT person_id, MIN(year) AS first_year, MAX(year) AS last_year,
+                   COUNT(*) AS film_count
+            FROM acting
+            GROUP BY person_id
+        ),
+        -- Films datés moins votés que le seuil, tous métiers, une ligne par film
+        low_films AS (
+            SELECT DISTINCT p.person_id, p.movie_id, m.year
+            FROM principals p
+            JOIN movies m ON m.movie_id = p.movie_id
+            JOIN ratings r ON r.movie_id = m.movie_id
+            WHERE r.num_votes < {BREAKTHROUGH_VOTES}
+              AND m.year IS NOT NULL
+        ),
+        -- Une jointure groupée par succès plutôt qu'un sous-select corrélé : principals
+        -- est lue une fois, même sans index sur principals(person_id).
+        -- Comme Q8 : les succès sans 3 films avant sont écartés avant de
+        -- retenir le premier (un succès précoce ne masque pas une percée plus tardive)
+        hits AS (
+            SELECT a.person_id, a.movie_id, a.year, COUNT(*) AS films_before
+            FROM (
+                SELECT DISTINCT person_id, movie_id, year
+                FROM acting
+                WHERE num_votes > {BREAKTHROUGH_VOTES}
+            ) a
+            JOIN low_films lf ON lf.person_id = a.person_id AND lf.year < a.year
+            GROUP BY a.person_id, a.movie_id, a.year
+            HAVING COUNT(*) >= 3
+        ),
+        breakthroughs AS (
+            SELECT person_id, movie_id, year, films_before,
+                   ROW_NUMBER() OVER (PARTITION BY person_id ORDER BY year, movie_id) AS rn
+            FROM hits
+        )
+        SELECT
+            s.person_id, s.first_year, s.last_year, s.last_year - s.first_year,
+            s.film_count, b.movie_id, b.year, b.films_before
+        FROM spans s
+        LEFT JOIN breakthroughs b ON b.person_id = s.person_id AND b.rn = 1
+        """,
+    ),
+    (
+        # Films et notes par décennie, tous métiers (Q6). Somme et nombre de notes
+        # plutôt que la moyenne : plusieurs personnes se combinent exactement
+        "person_career_decades",
+        """
+        CREATE TABLE IF NOT EXISTS person_career_decades (
+            person_id TEXT,
+            decade INTEGER,
+            movie_count INTEGER,
+            rated_count INTEGER,
+            rating_sum REAL,
+            PRIMARY KEY (person_id, decade)
+        ) WITHOUT ROWID
+        """,
+        """
+        SELECT p.person_id, (m.year / 10) * 10 AS decade, COUNT(*),
+               COUNT(r.average_rating), SUM(r.average_rating)
+        FROM principals p
+        JOIN movies m ON m.movie_id = p.movie_id
+        LEFT JOIN ratings r ON r.movie_id = m.movie_id
+        WHERE m.year IS NOT NULL
+        GROUP BY p.person_id, decade
+        """,
+    ),
+]
+
+# Q9 (career_span > 0) et Q8 (first_hit_year non NULL) ne lisent par ces index que
+# les carrières retenues, déjà dans l'ordre de la première clé de tri. Le départage
+# par nom et person_id passe encore par un B-tree temporaire ("RIGHT PART OF
+# ORDER BY") : LIMIT ne coupe pas la lecture de l'index
+SUMMARY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_person_careers_span "
+    "ON person_careers(career_span, film_count)",
+    "CREATE INDEX IF NOT EXISTS idx_person_careers_hit "
+    "ON person_careers(first_hit_year, films_before_hit)",
+]
+
+
+def has_person_careers(conn):
+    """Vrai si les carrières ont été calculées sur cette base (refresh_summaries)"""
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'person_careers'"
+        ).fetchone()
+        is not None
+    )
+
+
+def dataset_version(conn):
+    """Version des données (None si les synthèses n'ont jamais été calculées)"""
+    try:
+        row = conn.execute(
+            "SELECT value FROM summary_counts WHERE name = ?", (DATASET_VERSION,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def refresh_summaries(conn):
+    """
+    Recalcule toutes les tables de synthèse dans une seule transaction :
+    un lecteur voit soit l'ancien état complet, soit le nouveau.
+    Dernière étape de chaque import : change aussi la version des données.
+    """
+    # person_id suit le type du schéma (TEXT, ou INTEGER avec --int-ids)
+    int_ids = uses_int_ids(conn)
+    for _, ddl, _ in SUMMARY_TABLES:
+        conn.execute(schema_ddl(ddl, int_ids))
+    for ddl in SUMMARY_INDEXES:
+        conn.execute(ddl)
+    conn.commit()
+
+    # Horodatage en ms, croissant même après une reconstruction complète de la base
+    version = max(time.time_ns() // 1_000_000, (dataset_version(conn) or 0) + 1)
+    counts = {}
+    with conn:
+        for table_name, _, select_sql in SUMMARY_TABLES:
+            conn.execute(f"DELETE FROM {table_name}")
+            conn.execute(f"INSERT INTO {table_name} {select_sql}")
+            counts[table_name] = conn.execute(
+                f"SELECT COUNT(*) FROM {table_name}"
+            ).fetchone()[0]
+        conn.execute("INSERT INTO summary_counts VALUES (?, ?)", (DATASET_VERSION, version))
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rafraîchit les tables de synthèse")
+    parser.add_argument("--db-path", default=DB_PATH)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Erreur : Base {args.db_path} introuvable.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db_path)
+    start = time.perf_counter()
+    for table_name, count in refresh_summaries(conn).items():
+        print(f"✅ {table_name} : {count} lignes.")
+    conn.close()
+    print(f"Synthèses rafraîchies en {time.perf_counter() - start:.2f} s.")
@@ -0,0 +1,402 @@
+# Benchmark unifié Q1-Q9 : SQLite, MongoDB "flat" et MongoDB structuré.
+# Mêmes paramètres pour les trois moteurs (benchmark.QUERY_PARAMS), vérification
+# que les résultats concordent, tableau comparatif et export JSON.
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pymongo
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.bench_harness import ITERATIONS, WARMUP, measure, summarize
+from scripts.phase1_sqlite.benchmark import DB_PATH, QUERY_PARAMS, build_tasks
+from scripts.phase1_sqlite.imdb_ids import textualize_row, uses_int_ids
+from scripts.phase1_sqlite.leaderboards import export_leaderboards
+from scripts.phase1_sqlite.name_resolver import build_name_collection
+from scripts.phase1_sqlite.query_plans import mongo_plans, sqlite_plans
+from scripts.phase2_mongodb import queries_mongo as flat
+from scripts.phase2_mongodb import queries_structured as structured
+from scripts.phase2_mongodb.migrate_flat import TABLES, create_indexes
+
+ENGINES = ("sqlite", "flat", "structured")
+
+# Précision de comparaison des moyennes (AVG SQL arrondi à 2 décimales)
+DECIMALS = 2
+
+
+def flat_tasks(db, p, module=flat):
+    return [
+        ("Q1 - Filmographie", lambda: module.query_q1_filmography(db, p["actor_q1"])),
+        (
+            "Q2 - Top N films",
+            lambda: module.query_q2_top_movies(
+                db, p["genre"], p["year_start"], p["year_end"], p["top_n"]
+            ),
+        ),
+        ("Q3 - Multi-rôles", lambda: module.query_q3_multi_roles(db)),
+        ("Q4 - Collaborations", lambda: module.query_q4_collaborations(db, p["actor_q4"])),
+        ("Q5 - Genres Pop.", lambda: module.query_q5_popular_genres(db)),
+        ("Q6 - Carrière", lambda: module.query_q6_career(db, p["actor_q6"])),
+        ("Q7 - Classement Genre", lambda: module.query_q7_top3_genre(db, p["min_votes_q7"])),
+        ("Q8 - Percée", lambda: module.query_q8_breakthrough(db)),
+        ("Q9 - Longévité", lambda: module.query_q9_longevity(db)),
+    ]
+
+
+def structured_tasks(db, p, module=structured):
+    return [
+        (
+            "Q1 - Filmographie",
+            lambda: module.q1_filmography_struct(db, p["actor_q1"]),
+        ),
+        (
+            "Q2 - Top N films",
+            # SQLite et flat ne filtrent pas sur les votes : seuil neutre
+            lambda: module.q2_top_movies_struct(
+                db, p["genre"], p["year_start"], p["year_end"], p["top_n"], min_votes=0
+            ),
+        ),
+        ("Q3 - Multi-rôles", lambda: module.q3_multi_roles_struct(db)),
+        (
+            "Q4 - Collaborations",
+            lambda: module.q4_collaborations_struct(db, p["actor_q4"]),
+        ),
+        ("Q5 - Genres Pop.", lambda: module.q5_popular_genres_struct(db)),
+        ("Q6 - Carrière", lambda: module.q6_career_struct(db, p["actor_q6"])),
+        (
+            "Q7 - Classement Genre",
+            lambda: module.q7_rank_genre_struct(db, p["min_votes_q7"]),
+        ),
+        ("Q8 - Percée", lambda: module.q8_breakout_struct(db)),
+        ("Q9 - Longévité", lambda: module.q9_complex_struct(db)),
+    ]
+
+
+# --- Forme canonique des résultats, pour comparer les moteurs entre eux ---
+
+
+def _avg(value):
+    return None if value is None else round(value, DECIMALS)
+
+
+def _decade(value):
+    return None if value is None else int(value)
+
+
+# Par requête et par moteur : résultat brut -> liste de tuples comparables.
+# None : requête différente par conception, non comparable.
+CANONICAL = {
+    "Q1 - Filmographie": {
+        "sqlite": lambda rows: {(r["title"], r["year"]) for r in rows},
+        "flat": lambda docs: {(d.get("title"), d.get("year")) for d in docs},
+        "structured": lambda docs: {(d.get("title"), d.get("year")) for d in docs},
+    },
+    "Q2 - Top N films": {
+        "sqlite": lambda rows: [(r["title"], r["year"]) for r in rows],
+        "flat": lambda docs: [(d.get("title"), d.get("year")) for d in docs],
+        "structured": lambda docs: [(d.get("title"), d.get("year")) for d in docs],
+    },
+    "Q3 - Multi-rôles": {
+        "sqlite": lambda rows: [(r["name"], r["role_count"]) for r in rows],
+        "flat": lambda docs: [(d.get("actor"), d["count"]) for d in docs],
+        # Q3 structurée compte les entrées répétées du cast (crédits), pas les
+        # personnages : autre question
+        "structured": None,
+    },
+    "Q4 - Collaborations": {
+        "sqlite": lambda rows: [(r["director_name"], r["movie_count"]) for r in rows],
+        "flat": lambda docs: [(d["name"], d["count"]) for d in docs],
+        "structured": lambda docs: [(d["name"], d["count"]) for d in docs],
+    },
+    "Q5 - Genres Pop.": {
+        "sqlite": lambda rows: [(r["genre"], _avg(r["avg_rating"])) for r in rows],
+        "flat": lambda docs: [(d["_id"], _avg(d["avg_rating"])) for d in docs],
+        "structured": lambda docs: [(d["_id"], _avg(d["avg_rating"])) for d in docs],
+    },
+    "Q6 - Carrière": {
+        "sqlite": lambda rows: [
+            (r["decade"], r["num_movies"], _avg(r["avg_rating"])) for r in rows
+        ],
+        "flat": lambda docs: [
+            (_decade(d["_id"]), d["count"], _avg(d["avg_rating"])) for d in docs
+        ],
+        "structured": lambda docs: [
+            (_decade(d["_id"]), d["count"], _avg(d["avg_rating"])) for d in docs
+        ],
+    },
+    "Q7 - Classement Genre": {
+        "sqlite": lambda rows: [
+            (r["genre"], r["title"], _avg(r["average_rating"])) for r in rows
+        ],
+        "flat": lambda docs: [
+            (d["genre"], film.get("title"), _avg(film.get("rating")))
+            for d in docs
+            for film in d["top3"]
+        ],
+        "structured": lambda docs: [
+            (d.get("genre"), d.get("title"), _avg(d.get("rating"))) for d in docs
+        ],
+    },
+    "Q8 - Percée": {
+        "sqlite": lambda rows: {r["name"] for r in rows},
+        "flat": lambda docs: {d.get("name") for d in docs},
+        "structured": lambda docs: {d.get("name") for d in docs},
+    },
+    "Q9 - Longévité": {
+        "sqlite": lambda rows: [(r["name"], r["career_span"]) for r in rows],
+        "flat": lambda docs: [(d.get("name"), d["span"]) for d in docs],
+        # Q9 structurée = "films longs bien notés avec un titre FR" : autre question
+        "structured": None,
+    },
+}
+
+
+def canonical(name, engine, result):
+    to_canonical = CANONICAL[name][engine]
+    if to_canonical is None:
+        return None
+    values = to_canonical(result)
+    # Les égalités de tri (LIMIT) peuvent ordonner différemment : on compare des multisets
+    return sorted(values, key=repr)
+
+
+def verify(reference, other):
+    """'ok', 'différent (x/y)' ou None (non comparable / erreur)"""
+    if reference is None or other is None:
+        return None
+    if reference == other:
+        return "ok"
+    common = len(set(map(repr, reference)) & set(map(repr, other)))
+    return f"différent ({common}/{max(len(reference), len(other))} communs)"
+
+
+# --- Base MongoDB embarquée (mongomock), chargée depuis SQLite ---
+
+
+def load_flat_collections(db, conn):
+    """Même contenu que migrate_flat.py, une collection par table"""
+    int_ids = uses_int_ids(conn)
+    for table in TABLES:
+        documents = [dict(row) for row in conn.execute(f"SELECT * FROM {table}")]
+        if int_ids:
+            documents = [textualize_row(doc) for doc in documents]
+        if documents:
+            db[table].insert_many(documents)
+    create_indexes(db)
+    build_name_collection(db)
+    export_leaderboards(conn, db)
+
+
+def load_structured_collection(db):
+    """
+    Construit movies_complete avec la même forme de document que migrate_structured.py,
+    en Python : mongomock ne gère pas les $lookup à sous-pipeline du script de migration.
+    """
+
+    def by_movie(collection):
+        grouped = {}
+        for doc in db[collection].find({}, {"_id": 0}):
+            grouped.setdefault(doc["movie_id"], []).append(doc)
+        return grouped
+
+    names = {d["person_id"]: d.get("name") for d in db.persons.find({}, {"_id": 0})}
+    ratings = {d["movie_id"]: d for d in db.ratings.find({}, {"_id": 0})}
+    genres, titles = by_movie("genres"), by_movie("titles")
+    directors, writers = by_movie("directors"), by_movie("writers")
+    principals, characters = by_movie("principals"), by_movie("characters")
+
+    def crew(rows):
+        return [
+            {"person_id": r["person_id"], "name": names[r["person_id"]]}
+            for r in rows
+            if r["person_id"] in names
+        ]
+
+    documents = []
+    for movie in db.movies.find({}, {"_id": 0}):
+        mid = movie["movie_id"]
+        rating = ratings.get(mid, {})
+        cast = []
+        for p in sorted(principals.get(mid, []), key=lambda r: r.get("ordering") or 0):
+            if p.get("category") not in ("actor", "actress") or p["person_id"] not in names:
+                continue
+            cast.append(
+                {
+                    "person_id": p["person_id"],
+                    "name": names[p["person_id"]],
+                    "ordering": p.get("ordering"),
+                    "characters": [
+                        c["character_name"]
+                        for c in characters.get(mid, [])
+                        if c["person_id"] == p["person_id"]
+                    ],
+                }
+            )
+        documents.append(
+            {
+                "_id": mid,
+                "title": movie.get("title"),
+                "original_title": movie.get("original_title"),
+                "year": movie.get("year"),
+                "runtime": movie.get("runtime"),
+                "genres": [g["genre"] for g in genres.get(mid, [])],
+                "rating": {
+                    "average": rating.get("average_rating"),
+                    "votes": rating.get("num_votes"),
+                },
+                "directors": crew(directors.get(mid, [])),
+                "writers": crew(writers.get(mid, [])),
+                "cast": cast,
+                "titles": [
+                    {"region": t.get("region"), "title": t.get("title")}
+                    for t in titles.get(mid, [])
+                ],
+            }
+        )
+    if documents:
+        db[structured.COLLECTION].insert_many(documents)
+    db[structured.COLLECTION].create_index("cast.person_id")
+    db[structured.COLLECTION].create_index("genres")
+
+
+def open_mongo(uri, mock, conn):
+    """Base MongoDB réelle, ou base mongomock en mémoire remplie depuis SQLite"""
+    if not mock:
+        return pymongo.MongoClient(uri)[flat.DB_NAME]
+
+    try:
+        import mongomock
+    except ImportError:
+        print("❌ Mode --mock : installez mongomock (pip install mongomock).")
+        sys.exit(1)
+
+    print("📦 Chargement de la base MongoDB embarquée (mongomock) depuis SQLite...")
+    start = time.perf_counter()
+    db = mongomock.MongoClient()[flat.DB_NAME]
+    load_flat_collections(db, conn)
+    load_structured_collection(db)
+    print(f"   Chargée en {time.perf_counter() - start:.2f} s.")
+    return db
+
+
+# --- Exécution ---
+
+
+def run_engine(engine, tasks, warmup, iterations):
+    print(f"\n--- ⏱️  {engine.upper()} ---")
+    results = {}
+    for name, func in tasks:
+        try:
+            result = func()
+            stats = summarize(measure(func, warmup, iterations))
+            results[name] = {"stats": stats, "rows": len(result), "result": result}
+            print(f"   👉 {name:<25} : p50 {stats['p50']:10.2f} ms ({len(result)} rés.)")
+        except Exception as e:
+            results[name] = {"error": str(e)}
+            print(f"   👉 {name:<25} : ERREUR {str(e)[:50]}")
+    return results
+
+
+def run_suite(db_path=DB_PATH, mongo_uri=flat.MONGO_URI, mock=False,
+              warmup=WARMUP, iterations=ITERATIONS, output=None):
+    if not os.path.exists(db_path):
+        print(f"❌ Base introuvable : {db_path}")
+        return None
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    db = open_mongo(mongo_uri, mock, conn)
+
+    raw = {
+        "sqlite": run_engine("sqlite", build_tasks(conn), warmup, iterations),
+        "flat": run_engine("flat", flat_tasks(db, QUERY_PARAMS), warmup, iterations),
+        "structured": run_engine(
+            "structured", structured_tasks(db, QUERY_PARAMS), warmup, iterations
+        ),
+    }
+    # Plans d'exécution (query_plans.py diff pour comparer deux exécutions)
+    plans = {"sqlite": sqlite_plans(conn)}
+    if mock:
+        print("\n(plans MongoDB non capturés : mongomock n'implémente pas explain)")
+    else:
+        plans["flat"] = mongo_plans(db, flat_tasks, QUERY_PARAMS)
+        plans["structured"] = mongo_plans(db, structured_tasks, QUERY_PARAMS)
+    conn.close()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "db_path": os.path.abspath(db_path),
+            "mongo": "mongomock" if mock else mongo_uri,
+            "warmup": warmup,
+            "iterations": iterations,
+        },
+        "params": QUERY_PARAMS,
+        "queries": {},
+        "plans": plans,
+    }
+
+    print("\n" + "=" * 124)
+    print(
+        f"{'REQUÊTE':<22} | {'SQLITE (ms)':>11} | {'FLAT (ms)':>10} | {'STRUCT. (ms)':>12} | "
+        f"{'VÉRIF. FLAT':<29} | {'VÉRIF. STRUCT.':<29}"
+    )
+    print("-" * 124)
+    for name, _ in build_tasks(None):
+        entry = {}
+        canon = {}
+        for engine in ENGINES:
+            data = raw[engine][name]
+            entry[engine] = {k: v for k, v in data.items() if k != "result"}
+            canon[engine] = (
+                canonical(name, engine, data["result"]) if "result" in data else None
+            )
+        entry["verification"] = {
+            engine: verify(canon["sqlite"], canon[engine]) for engine in ("flat", "structured")
+        }
+        report["queries"][name] = entry
+
+        def cell(engine):
+            stats = entry[engine].get("stats")
+            return f"{stats['p50']:.2f}" if stats else "ERREUR"
+
+        def check(engine):
+            status = entry["verification"][engine]
+            if status is None:
+                return "—"
+            return "✅ identique" if status == "ok" else f"❌ {status}"
+
+        print(
+            f"{name:<22} | {cell('sqlite'):>11} | {cell('flat'):>10} | "
+            f"{cell('structured'):>12} | {check('flat'):<29} | {check('structured'):<29}"
+        )
+    print("=" * 124)
+    print("Vérification : résultats comparés à SQLite (— : requête différente ou en erreur).")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Q1-Q9 SQLite / Mongo flat / structuré")
+    parser.add_argument("--db-path", default=DB_PATH)
+    parser.add_argument("--mongo-uri", default=flat.MONGO_URI)
+    parser.add_argument(
+        "--mock", action="store_true", help="MongoDB embarqué (mongomock) chargé depuis SQLite"
+    )
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    run_suite(
+        args.db_path, args.mongo_uri, args.mock, args.warmup, args.iterations, args.output
+    )
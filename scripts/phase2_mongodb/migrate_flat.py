@@ -1,6 +1,7 @@
 import sqlite3
 import pymongo
 import os
+import sys
 import time
 
 # --- CONFIGURATION ---
@@ -10,6 +11,14 @@ SQLITE_DB = os.path.join(BASE_DIR, 'data', 'imdb.db')
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "imdb_flat"
 
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.imdb_ids import textualize_row, uses_int_ids
+from scripts.phase1_sqlite.leaderboards import export_leaderboards
+from scripts.phase1_sqlite.name_resolver import build_name_collection
+from scripts.phase1_sqlite.query_cache import bump_mongo_version
+from scripts.phase1_sqlite.summaries import refresh_summaries
+
 # Liste des tables a migrer
 TABLES = [
     "movies", "persons", "ratings", "genres", 
@@ -18,7 +27,7 @@ TABLES = [
 ]
 
 def clean_orphans(conn, table_name, fk_col, parent_table, parent_pk):
-    """Fonction utilitaire pour supprimer les orphelins SQLite"""
+    """Fonction utilitaire pour supprimer les orphelins SQLite (renvoie leur nombre)"""
     cursor = conn.cursor()
     
     # On verifie s'il y a des orphelins
@@ -37,22 +46,31 @@ def clean_orphans(conn, table_name, fk_col, parent_table, parent_pk):
         """
         cursor.execute(query_delete)
         conn.commit()
+    return count
 
 def repair_sqlite_database(conn):
     """Lance toutes les verifications d'integrite sur SQLite"""
     print("Verification et reparation de la base SQLite...")
     
+    removed = 0
+
     # 1. Nettoyage des tables liees aux Personnes
-    clean_orphans(conn, "writers", "person_id", "persons", "person_id")
-    clean_orphans(conn, "directors", "person_id", "persons", "person_id")
-    clean_orphans(conn, "principals", "person_id", "persons", "person_id")
-    clean_orphans(conn, "characters", "person_id", "persons", "person_id")
+    removed += clean_orphans(conn, "writers", "person_id", "persons", "person_id")
+    removed += clean_orphans(conn, "directors", "person_id", "persons", "person_id")
+    removed += clean_orphans(conn, "principals", "person_id", "persons", "person_id")
+    removed += clean_orphans(conn, "characters", "person_id", "persons", "person_id")
     
     # 2. Nettoyage des tables liees aux Films
-    clean_orphans(conn, "ratings", "movie_id", "movies", "movie_id")
-    clean_orphans(conn, "titles", "movie_id", "movies", "movie_id")
-    clean_orphans(conn, "genres", "movie_id", "movies", "movie_id")
+    removed += clean_orphans(conn, "ratings", "movie_id", "movies", "movie_id")
+    removed += clean_orphans(conn, "titles", "movie_id", "movies", "movie_id")
+    removed += clean_orphans(conn, "genres", "movie_id", "movies", "movie_id")
     
+    # Les tables de synthese et la version des donnees (cle du QueryCache)
+    # doivent suivre les suppressions, sinon le cache sert d'anciens resultats
+    if removed:
+        print("Recalcul des tables de synthese...")
+        refresh_summaries(conn)
+
     print("Base SQLite verifiee et integre.\n")
 
 def create_indexes(db):
@@ -88,6 +106,7 @@ def migrate_flat():
     # --- ETAPE DE REPARATION ---
     repair_sqlite_database(conn_sql)
     # ---------------------------
+    int_ids = uses_int_ids(conn_sql)
 
     # 2. Connexion MongoDB
     print(f"Connexion a MongoDB : {MONGO_URI}")
@@ -116,6 +135,9 @@ def migrate_flat():
             continue
 
         documents = [dict(row) for row in rows]
+        # Base SQLite en --int-ids : MongoDB et le site gardent les identifiants texte
+        if int_ids:
+            documents = [textualize_row(doc) for doc in documents]
         
         if documents:
             db[table].insert_many(documents)
@@ -124,6 +146,15 @@ def migrate_flat():
     # 4. Creation des index
     create_indexes(db)
 
+    # 5. Index de resolution des noms (Q1, Q4, Q6 des deux modeles)
+    print(f"Index des noms : {build_name_collection(db)} personnes.")
+
+    # 6. Classements par genre et decennie (Q7 structure)
+    print(f"Classements : {export_leaderboards(conn_sql, db)} entrees.")
+
+    # 7. Nouvelle version des donnees : les resultats en cache (query_cache.py) sont perimes
+    print(f"Version des donnees : {bump_mongo_version(db)}")
+
     conn_sql.close()
     client.close()
     print(f"\nMIGRATION TERMINEE en {time.time() - start_global:.2f} secondes.")
@@ -1,6 +1,14 @@
+import os
+import sys
+
 import pymongo
 import time
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.query_cache import bump_mongo_version
+
 # Configuration
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "imdb_flat"
@@ -189,6 +197,11 @@ def migrate_structured():
         # Index pour la recherche
         print("Creation de l'index sur le titre...")
         db[TARGET_COLL].create_index("title")
+        # Q1, Q4, Q6 : noms résolus en person_id (name_resolver.py)
+        db[TARGET_COLL].create_index("cast.person_id")
+
+        # Resultats en cache (query_cache.py) calcules sur l'ancienne collection : perimes
+        print(f"Version des donnees : {bump_mongo_version(db)}")
 
     except Exception as e:
         print(f"Erreur : {e}")
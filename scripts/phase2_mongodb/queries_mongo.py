@@ -1,17 +1,54 @@
 import pymongo
 import time
 import os
+import sys
 
 # --- CONFIGURATION ---
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "imdb_flat"
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.name_resolver import resolve_person_ids_mongo
+
+
+# Documents par lot (aller-retour serveur) dans les variantes *_stream
+STREAM_BATCH_SIZE = 1000
+
 
 def get_db():
     client = pymongo.MongoClient(MONGO_URI)
     return client[DB_NAME]
 
 
+def page_stages(limit=None, offset=0):
+    """$skip / $limit à placer dans le pipeline, là où la requête coupe ses résultats"""
+    stages = [{"$skip": offset}] if offset else []
+    if limit is not None:
+        stages.append({"$limit": limit})
+    return stages
+
+
+def stream_cursor(cursor):
+    """Documents d'un curseur, lus lot par lot ; curseur fermé en fin de lecture"""
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def stream_aggregate(collection, pipeline, batch_size=STREAM_BATCH_SIZE):
+    """
+    Générateur sur les résultats du pipeline (None : aucun résultat, ex. nom inconnu).
+    allowDiskUse : un export sans limite peut trier plus de 100 Mo côté serveur.
+    """
+    if pipeline is None:
+        return iter(())
+    cursor = collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
+    return stream_cursor(cursor)
+
+
 def measure_time(func, *args):
     start = time.time()
     try:
@@ -55,16 +92,14 @@ def fix_indexes():
 # =============================================================================
 # Q1 : Filmographie
 # =============================================================================
-def query_q1_filmography(db, actor_name):
-    # Optimisation : On trouve d'abord l'ID, puis on fait le pipeline
-    # C'est ce que fait ton collègue, c'est bien plus rapide.
-    person = db.persons.find_one({"name": {"$regex": actor_name, "$options": "i"}})
-    if not person:
-        return []
-    pid = person["person_id"]
+def _q1_pipeline(db, actor_name, page):
+    # Optimisation : On trouve d'abord les IDs (index des noms), puis on fait le pipeline
+    pids = resolve_person_ids_mongo(db, actor_name)
+    if not pids:
+        return None
 
     pipeline = [
-        {"$match": {"person_id": pid, "category": {"$in": ["actor", "actress"]}}},
+        {"$match": {"person_id": {"$in": pids}, "category": {"$in": ["actor", "actress"]}}},
         {
             "$lookup": {
                 "from": "movies",
@@ -75,21 +110,13 @@ def query_q1_filmography(db, actor_name):
         },
         {"$unwind": "$m"},
         {
-            "$lookup": {  # On ajoute le personnage
+            # On ajoute le personnage : personnages du film (index movie_id), puis ceux
+            # de la personne. Jointure simple plutôt qu'un $lookup à `let`, que
+            # mongomock (benchmark_engines.py --mock) n'exécute pas
+            "$lookup": {
                 "from": "characters",
-                "let": {"mid": "$movie_id", "pid": "$person_id"},
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    {"$eq": ["$movie_id", "$$mid"]},
-                                    {"$eq": ["$person_id", "$$pid"]},
-                                ]
-                            }
-                        }
-                    }
-                ],
+                "localField": "movie_id",
+                "foreignField": "movie_id",
                 "as": "char",
             }
         },
@@ -97,20 +124,51 @@ def query_q1_filmography(db, actor_name):
             "$project": {
                 "title": "$m.title",
                 "year": "$m.year",
-                "character": {"$arrayElemAt": ["$char.character_name", 0]},
+                "character": {
+                    "$arrayElemAt": [
+                        {
+                            "$map": {
+                                "input": {
+                                    "$filter": {
+                                        "input": "$char",
+                                        "as": "c",
+                                        "cond": {"$eq": ["$$c.person_id", "$person_id"]},
+                                    }
+                                },
+                                "as": "c",
+                                "in": "$$c.character_name",
+                            }
+                        },
+                        0,
+                    ]
+                },
             }
         },
         {"$sort": {"year": -1}},
-        {"$limit": 20},
+        *page,
     ]
+    return pipeline
+
+
+def query_q1_filmography(db, actor_name):
+    pipeline = _q1_pipeline(db, actor_name, page_stages(20))
+    if pipeline is None:
+        return []
     return list(db.principals.aggregate(pipeline))
 
 
+def query_q1_filmography_stream(
+    db, actor_name, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    pipeline = _q1_pipeline(db, actor_name, page_stages(limit, offset))
+    return stream_aggregate(db.principals, pipeline, batch_size)
+
+
 # =============================================================================
 # Q2 : Top N Films par Genre
 # =============================================================================
-def query_q2_top_movies(db, genre, year_start, year_end, n):
-    pipeline = [
+def _q2_pipeline(genre, year_start, year_end, page):
+    return [
         {"$match": {"genre": genre}},
         {
             "$lookup": {
@@ -132,7 +190,7 @@ def query_q2_top_movies(db, genre, year_start, year_end, n):
         },
         {"$unwind": "$r"},
         {"$sort": {"r.average_rating": -1, "r.num_votes": -1}},
-        {"$limit": n},
+        *page,
         {
             "$project": {
                 "title": "$m.title",
@@ -141,14 +199,25 @@ def query_q2_top_movies(db, genre, year_start, year_end, n):
             }
         },
     ]
+
+
+def query_q2_top_movies(db, genre, year_start, year_end, n):
+    pipeline = _q2_pipeline(genre, year_start, year_end, page_stages(n))
     return list(db.genres.aggregate(pipeline))
 
 
+def query_q2_top_movies_stream(
+    db, genre, year_start, year_end, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    pipeline = _q2_pipeline(genre, year_start, year_end, page_stages(limit, offset))
+    return stream_aggregate(db.genres, pipeline, batch_size)
+
+
 # =============================================================================
 # Q3 : Acteurs Multi-Rôles
 # =============================================================================
-def query_q3_multi_roles(db):
-    pipeline = [
+def _q3_pipeline(page):
+    return [
         {
             "$group": {
                 "_id": {"pid": "$person_id", "mid": "$movie_id"},
@@ -180,23 +249,29 @@ def query_q3_multi_roles(db):
             }
         },
         {"$sort": {"count": -1}},
-        {"$limit": 20},
+        *page,
     ]
-    return list(db.characters.aggregate(pipeline))
+
+
+def query_q3_multi_roles(db):
+    return list(db.characters.aggregate(_q3_pipeline(page_stages(20))))
+
+
+def query_q3_multi_roles_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    return stream_aggregate(db.characters, _q3_pipeline(page_stages(limit, offset)), batch_size)
 
 
 # =============================================================================
 # Q4 : Collaborations
 # =============================================================================
-def query_q4_collaborations(db, actor_name):
-    person = db.persons.find_one({"name": {"$regex": actor_name, "$options": "i"}})
-    if not person:
-        return []
-    pid = person["person_id"]
+def _q4_pipeline(db, actor_name, page):
+    pids = resolve_person_ids_mongo(db, actor_name)
+    if not pids:
+        return None
 
     # On récupère d'abord les films de l'acteur (Optimisation style collègue)
     actor_movies = db.principals.distinct(
-        "movie_id", {"person_id": pid, "category": {"$in": ["actor", "actress"]}}
+        "movie_id", {"person_id": {"$in": pids}, "category": {"$in": ["actor", "actress"]}}
     )
 
     pipeline = [
@@ -212,19 +287,40 @@ def query_q4_collaborations(db, actor_name):
             }
         },
         {"$unwind": "$dir"},
-        {"$group": {"_id": "$dir.name", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10},
+        # Un groupe par réalisateur (homonymes distincts), départagé par nom comme en SQL
+        {
+            "$group": {
+                "_id": "$dir.person_id",
+                "name": {"$first": "$dir.name"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"count": -1, "name": 1, "_id": 1}},
+        *page,
     ]
+    return pipeline
+
+
+def query_q4_collaborations(db, actor_name):
+    pipeline = _q4_pipeline(db, actor_name, page_stages(10))
+    if pipeline is None:
+        return []
     # On cherche dans directors, pas principals (plus rapide car table plus petite)
     return list(db.directors.aggregate(pipeline))
 
 
+def query_q4_collaborations_stream(
+    db, actor_name, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    pipeline = _q4_pipeline(db, actor_name, page_stages(limit, offset))
+    return stream_aggregate(db.directors, pipeline, batch_size)
+
+
 # =============================================================================
 # Q5 : Genres Populaires
 # =============================================================================
-def query_q5_popular_genres(db):
-    pipeline = [
+def _q5_pipeline(page):
+    return [
         {
             "$lookup": {
                 "from": "ratings",
@@ -243,21 +339,28 @@ def query_q5_popular_genres(db):
         },
         {"$match": {"avg_rating": {"$gt": 7.0}, "count": {"$gt": 50}}},
         {"$sort": {"avg_rating": -1}},
+        *page,
     ]
-    return list(db.genres.aggregate(pipeline))
+
+
+def query_q5_popular_genres(db):
+    return list(db.genres.aggregate(_q5_pipeline([])))
+
+
+def query_q5_popular_genres_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    return stream_aggregate(db.genres, _q5_pipeline(page_stages(limit, offset)), batch_size)
 
 
 # =============================================================================
 # Q6 : Carrière
 # =============================================================================
-def query_q6_career(db, actor_name):
-    person = db.persons.find_one({"name": {"$regex": actor_name, "$options": "i"}})
-    if not person:
-        return []
-    pid = person["person_id"]
+def _q6_pipeline(db, actor_name, page):
+    pids = resolve_person_ids_mongo(db, actor_name)
+    if not pids:
+        return None
 
     pipeline = [
-        {"$match": {"person_id": pid}},
+        {"$match": {"person_id": {"$in": pids}}},
         {
             "$lookup": {
                 "from": "movies",
@@ -291,15 +394,28 @@ def query_q6_career(db, actor_name):
             }
         },
         {"$sort": {"_id": 1}},
+        *page,
     ]
+    return pipeline
+
+
+def query_q6_career(db, actor_name):
+    pipeline = _q6_pipeline(db, actor_name, [])
+    if pipeline is None:
+        return []
     return list(db.principals.aggregate(pipeline))
 
 
+def query_q6_career_stream(db, actor_name, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    pipeline = _q6_pipeline(db, actor_name, page_stages(limit, offset))
+    return stream_aggregate(db.principals, pipeline, batch_size)
+
+
 # =============================================================================
 # Q7 : Classement par Genre (Méthode Compatible Collègue)
 # =============================================================================
-def query_q7_top3_genre(db):
-    pipeline = [
+def _q7_pipeline(min_votes, page):
+    return [
         # 1. Joindre Movies et Ratings
         {
             "$lookup": {
@@ -310,7 +426,7 @@ def query_q7_top3_genre(db):
             }
         },
         {"$unwind": "$r"},
-        {"$match": {"r.num_votes": {"$gt": 1000}}},  # Filtre qualité
+        {"$match": {"r.num_votes": {"$gt": min_votes}}},  # Filtre qualité
         {
             "$lookup": {
                 "from": "movies",
@@ -320,8 +436,16 @@ def query_q7_top3_genre(db):
             }
         },
         {"$unwind": "$m"},
-        # 2. Trier
-        {"$sort": {"genre": 1, "r.average_rating": -1}},
+        # 2. Trier (départage par votes, titre puis identifiant, comme en SQL)
+        {
+            "$sort": {
+                "genre": 1,
+                "r.average_rating": -1,
+                "r.num_votes": -1,
+                "m.title": 1,
+                "movie_id": 1,
+            }
+        },
         # 3. Grouper et Pousser dans une liste
         {
             "$group": {
@@ -334,18 +458,28 @@ def query_q7_top3_genre(db):
         # 4. Garder les 3 premiers (Slice)
         {"$project": {"genre": "$_id", "top3": {"$slice": ["$films", 3]}}},
         {"$sort": {"genre": 1}},
+        *page,
     ]
-    return list(db.genres.aggregate(pipeline))
+
+
+def query_q7_top3_genre(db, min_votes=1000):
+    return list(db.genres.aggregate(_q7_pipeline(min_votes, [])))
+
+
+def query_q7_top3_genre_stream(
+    db, min_votes=1000, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    pipeline = _q7_pipeline(min_votes, page_stages(limit, offset))
+    return stream_aggregate(db.genres, pipeline, batch_size)
 
 
 # =============================================================================
 # Q8 : Percée
 # =============================================================================
-def query_q8_breakthrough(db):
+def _q8_pipeline(page):
     # Version simplifiée pour Mongo Flat : on cherche les acteurs qui ont un film > 200k votes
     # et on vérifie s'ils en ont des petits avant.
-    # C'est très lourd en Mongo Flat, on limite le scan.
-    pipeline = [
+    return [
         {"$match": {"num_votes": {"$gt": 200000}}},  # Films succès
         {
             "$lookup": {
@@ -358,7 +492,7 @@ def query_q8_breakthrough(db):
         {"$unwind": "$cast"},
         {"$match": {"cast.category": {"$in": ["actor", "actress"]}}},
         {"$group": {"_id": "$cast.person_id", "hit_movie_id": {"$first": "$movie_id"}}},
-        {"$limit": 50},  # On limite pour le test sinon c'est trop long
+        *page,
         {
             "$lookup": {
                 "from": "persons",
@@ -374,14 +508,22 @@ def query_q8_breakthrough(db):
             }
         },
     ]
-    return list(db.ratings.aggregate(pipeline))
+
+
+def query_q8_breakthrough(db):
+    # C'est très lourd en Mongo Flat, on limite le scan (sinon c'est trop long pour le test)
+    return list(db.ratings.aggregate(_q8_pipeline(page_stages(50))))
+
+
+def query_q8_breakthrough_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    return stream_aggregate(db.ratings, _q8_pipeline(page_stages(limit, offset)), batch_size)
 
 
 # =============================================================================
 # Q9 : Longévité
 # =============================================================================
-def query_q9_longevity(db):
-    pipeline = [
+def _q9_pipeline(page):
+    return [
         {"$match": {"category": {"$in": ["actor", "actress"]}}},
         {
             "$lookup": {
@@ -403,7 +545,7 @@ def query_q9_longevity(db):
         {"$project": {"span": {"$subtract": ["$max", "$min"]}, "count": 1}},
         {"$match": {"span": {"$gt": 0}, "count": {"$gt": 10}}},
         {"$sort": {"span": -1}},
-        {"$limit": 15},
+        *page,
         {
             "$lookup": {
                 "from": "persons",
@@ -414,7 +556,14 @@ def query_q9_longevity(db):
         },
         {"$project": {"name": {"$arrayElemAt": ["$p.name", 0]}, "span": 1}},
     ]
-    return list(db.principals.aggregate(pipeline))
+
+
+def query_q9_longevity(db):
+    return list(db.principals.aggregate(_q9_pipeline(page_stages(15))))
+
+
+def query_q9_longevity_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    return stream_aggregate(db.principals, _q9_pipeline(page_stages(limit, offset)), batch_size)
 
 
 if __name__ == "__main__":
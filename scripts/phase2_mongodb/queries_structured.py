@@ -1,7 +1,23 @@
+import os
+import sys
+
 import pymongo
 from pymongo import MongoClient
 import time
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.leaderboards import top_per_genre_mongo
+from scripts.phase1_sqlite.name_resolver import resolve_person_ids_mongo
+from scripts.phase1_sqlite.summaries import BREAKTHROUGH_VOTES
+from scripts.phase2_mongodb.queries_mongo import (
+    STREAM_BATCH_SIZE,
+    page_stages,
+    stream_aggregate,
+    stream_cursor,
+)
+
 # Configuration (Doit être la même que migrate_flat.py)
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "imdb_flat"
@@ -16,10 +32,11 @@ def get_db():
 # --- REQUÊTES OPTIMISÉES (NoSQL style) ---
 
 
-def q1_filmography_struct(db, actor_name):
-    """Q1: Filmographie"""
-    pipeline = [
-        {"$match": {"cast.name": {"$regex": actor_name, "$options": "i"}}},
+def _q1_pipeline(db, actor_name, page):
+    # Noms résolus une fois (collection person_names), puis index cast.person_id
+    pids = resolve_person_ids_mongo(db, actor_name)
+    return [
+        {"$match": {"cast.person_id": {"$in": pids}}},
         {
             "$project": {
                 "title": 1,
@@ -29,39 +46,61 @@ def q1_filmography_struct(db, actor_name):
                     "$filter": {
                         "input": "$cast",
                         "as": "c",
-                        "cond": {
-                            "$regexMatch": {
-                                "input": "$$c.name",
-                                "regex": actor_name,
-                                "options": "i",
-                            }
-                        },
+                        "cond": {"$in": ["$$c.person_id", pids]},
                     }
                 },
             }
         },
         {"$sort": {"year": -1}},
-        {"$limit": 20},
+        *page,
     ]
-    return list(db[COLLECTION].aggregate(pipeline))
 
 
-def q2_top_movies_struct(db, genre, year_min, year_max, limit=5):
-    """Q2: Top N films"""
+def q1_filmography_struct(db, actor_name):
+    """Q1: Filmographie"""
+    return list(db[COLLECTION].aggregate(_q1_pipeline(db, actor_name, page_stages(20))))
+
+
+def q1_filmography_struct_stream(
+    db, actor_name, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q1 en flux : toute la filmographie par défaut"""
+    pipeline = _q1_pipeline(db, actor_name, page_stages(limit, offset))
+    return stream_aggregate(db[COLLECTION], pipeline, batch_size)
+
+
+def _q2_cursor(db, genre, year_min, year_max, min_votes):
     query = {
         "genres": genre,
         "year": {"$gte": year_min, "$lte": year_max},
-        "rating.votes": {"$gt": 1000},
+        "rating.votes": {"$gt": min_votes},
     }
     projection = {"title": 1, "year": 1, "rating": 1, "_id": 0}
-    return list(
-        db[COLLECTION].find(query, projection).sort("rating.average", -1).limit(limit)
+    # Départage par nombre de votes, comme la version SQL
+    return (
+        db[COLLECTION]
+        .find(query, projection)
+        .sort([("rating.average", -1), ("rating.votes", -1)])
     )
 
 
-def q3_multi_roles_struct(db):
-    """Q3: Acteurs multi-rôles"""
-    pipeline = [
+def q2_top_movies_struct(db, genre, year_min, year_max, limit=5, *, min_votes=1000):
+    """Q2: Top N films"""
+    return list(_q2_cursor(db, genre, year_min, year_max, min_votes).limit(limit))
+
+
+def q2_top_movies_struct_stream(
+    db, genre, year_min, year_max, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE,
+    *, min_votes=1000,
+):
+    """Q2 en flux : tous les films du genre sur la période"""
+    cursor = _q2_cursor(db, genre, year_min, year_max, min_votes).skip(offset)
+    # limit(0) : pas de limite
+    return stream_cursor(cursor.limit(limit or 0).batch_size(batch_size))
+
+
+def _q3_pipeline(page):
+    return [
         {"$unwind": "$cast"},
         {
             "$group": {
@@ -70,26 +109,53 @@ def q3_multi_roles_struct(db):
             }
         },
         {"$match": {"count": {"$gt": 1}}},
-        {"$limit": 10},
+        *page,
     ]
-    return list(db[COLLECTION].aggregate(pipeline))
 
 
-def q4_collaborations_struct(db, actor_name):
-    """Q4: Collaborations"""
-    pipeline = [
-        {"$match": {"cast.name": {"$regex": actor_name, "$options": "i"}}},
+def q3_multi_roles_struct(db):
+    """Q3: Acteurs multi-rôles"""
+    return list(db[COLLECTION].aggregate(_q3_pipeline(page_stages(10))))
+
+
+def q3_multi_roles_struct_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q3 en flux : tous les couples (acteur, film) à plusieurs rôles"""
+    return stream_aggregate(db[COLLECTION], _q3_pipeline(page_stages(limit, offset)), batch_size)
+
+
+def _q4_pipeline(db, actor_name, page):
+    pids = resolve_person_ids_mongo(db, actor_name)
+    return [
+        {"$match": {"cast.person_id": {"$in": pids}}},
         {"$unwind": "$directors"},
-        {"$group": {"_id": "$directors.name", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10},
+        # Un groupe par réalisateur (homonymes distincts), départagé par nom comme en SQL
+        {
+            "$group": {
+                "_id": "$directors.person_id",
+                "name": {"$first": "$directors.name"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"count": -1, "name": 1, "_id": 1}},
+        *page,
     ]
-    return list(db[COLLECTION].aggregate(pipeline))
 
 
-def q5_popular_genres_struct(db):
-    """Q5: Genres populaires"""
-    pipeline = [
+def q4_collaborations_struct(db, actor_name):
+    """Q4: Collaborations"""
+    return list(db[COLLECTION].aggregate(_q4_pipeline(db, actor_name, page_stages(10))))
+
+
+def q4_collaborations_struct_stream(
+    db, actor_name, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q4 en flux"""
+    pipeline = _q4_pipeline(db, actor_name, page_stages(limit, offset))
+    return stream_aggregate(db[COLLECTION], pipeline, batch_size)
+
+
+def _q5_pipeline(page):
+    return [
         {"$unwind": "$genres"},
         {
             "$group": {
@@ -100,17 +166,26 @@ def q5_popular_genres_struct(db):
         },
         {"$match": {"avg_rating": {"$gt": 7.0}, "count": {"$gt": 50}}},
         {"$sort": {"avg_rating": -1}},
-        {"$limit": 10},
+        *page,
     ]
-    return list(db[COLLECTION].aggregate(pipeline))
 
 
-def q6_career_struct(db, actor_name):
-    """Q6: Carrière"""
-    pipeline = [
+def q5_popular_genres_struct(db):
+    """Q5: Genres populaires"""
+    return list(db[COLLECTION].aggregate(_q5_pipeline(page_stages(10))))
+
+
+def q5_popular_genres_struct_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q5 en flux"""
+    return stream_aggregate(db[COLLECTION], _q5_pipeline(page_stages(limit, offset)), batch_size)
+
+
+def _q6_pipeline(db, actor_name, page):
+    pids = resolve_person_ids_mongo(db, actor_name)
+    return [
         {
             "$match": {
-                "cast.name": {"$regex": actor_name, "$options": "i"},
+                "cast.person_id": {"$in": pids},
                 "year": {"$ne": None},
             }
         },
@@ -128,19 +203,114 @@ def q6_career_struct(db, actor_name):
             }
         },
         {"$sort": {"_id": 1}},
+        *page,
     ]
-    return list(db[COLLECTION].aggregate(pipeline))
 
 
-def q7_rank_genre_struct(db):
-    """Q7: Classement"""
+def q6_career_struct(db, actor_name):
+    """Q6: Carrière"""
+    return list(db[COLLECTION].aggregate(_q6_pipeline(db, actor_name, [])))
+
+
+def q6_career_struct_stream(db, actor_name, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q6 en flux"""
+    pipeline = _q6_pipeline(db, actor_name, page_stages(limit, offset))
+    return stream_aggregate(db[COLLECTION], pipeline, batch_size)
+
+
+def batch_person_ids(db, people, by_id=False):
+    """{person_id: [noms ou ids demandés]} : noms résolus un par un par l'index person_names"""
+    keys_by_pid = {}
+    for key in dict.fromkeys(people):
+        for pid in [key] if by_id else resolve_person_ids_mongo(db, key):
+            keys_by_pid.setdefault(pid, []).append(key)
+    return keys_by_pid
+
+
+def q1_filmography_struct_batch(db, people, by_id=False, limit=20):
+    """Q1 pour une liste de noms ou d'ids : un seul $in pour toutes les personnes"""
+    keys_by_pid = batch_person_ids(db, people, by_id)
+    pids = list(keys_by_pid)
+    pipeline = [
+        {"$match": {"cast.person_id": {"$in": pids}}},
+        {
+            "$project": {
+                "title": 1,
+                "year": 1,
+                "rating": "$rating.average",
+                "cast": {
+                    "$filter": {
+                        "input": "$cast",
+                        "as": "c",
+                        "cond": {"$in": ["$$c.person_id", pids]},
+                    }
+                },
+            }
+        },
+        {"$sort": {"year": -1}},
+    ]
+    results = {key: [] for key in dict.fromkeys(people)}
+    for doc in db[COLLECTION].aggregate(pipeline, allowDiskUse=True):
+        cast = doc.pop("cast")
+        for key in dict.fromkeys(k for c in cast for k in keys_by_pid[c["person_id"]]):
+            if len(results[key]) < limit:
+                role = [c for c in cast if key in keys_by_pid[c["person_id"]]]
+                results[key].append({**doc, "role": role})
+    return results
+
+
+def q6_career_struct_batch(db, people, by_id=False):
+    """Q6 pour une liste de noms ou d'ids : un seul $in, agrégation par personne en Python"""
+    keys_by_pid = batch_person_ids(db, people, by_id)
+    pids = list(keys_by_pid)
     pipeline = [
-        {"$match": {"rating.votes": {"$gt": 5000}}},
+        {"$match": {"cast.person_id": {"$in": pids}, "year": {"$ne": None}}},
+        {
+            "$project": {
+                "_id": 0,
+                "decade": {"$multiply": [{"$floor": {"$divide": ["$year", 10]}}, 10]},
+                "rating": "$rating.average",
+                "pids": {
+                    "$filter": {
+                        "input": "$cast.person_id",
+                        "as": "p",
+                        "cond": {"$in": ["$$p", pids]},
+                    }
+                },
+            }
+        },
+    ]
+    # Même calcul que q6_career_struct : un film compte une fois par personne demandée
+    decades = {key: {} for key in dict.fromkeys(people)}
+    for doc in db[COLLECTION].aggregate(pipeline, allowDiskUse=True):
+        for key in dict.fromkeys(k for pid in doc["pids"] for k in keys_by_pid[pid]):
+            stats = decades[key].setdefault(doc["decade"], [0, 0, 0.0])
+            stats[0] += 1
+            if doc.get("rating") is not None:
+                stats[1] += 1
+                stats[2] += doc["rating"]
+    return {
+        key: [
+            {
+                "_id": decade,
+                "count": count,
+                "avg_rating": rating_sum / rated if rated else None,
+            }
+            for decade, (count, rated, rating_sum) in sorted(by_decade.items())
+        ]
+        for key, by_decade in decades.items()
+    }
+
+
+def _q7_pipeline(min_votes, page):
+    return [
+        {"$match": {"rating.votes": {"$gt": min_votes}}},
         {"$unwind": "$genres"},
         {
             "$setWindowFields": {
                 "partitionBy": "$genres",
-                "sortBy": {"rating.average": -1},
+                # Départage par votes, titre puis identifiant, comme en SQL
+                "sortBy": {"rating.average": -1, "rating.votes": -1, "title": 1, "_id": 1},
                 "output": {"rank": {"$rank": {}}},
             }
         },
@@ -153,41 +323,147 @@ def q7_rank_genre_struct(db):
                 "rank": 1,
             }
         },
+        *page,
     ]
+
+
+def q7_rank_genre_struct(db, min_votes=1000):
+    """Q7: Classement"""
+    # Classements exportés à la migration (collection leaderboards)
+    results = top_per_genre_mongo(db, min_votes)
+    if results is not None:
+        return results
+
     try:
-        return list(db[COLLECTION].aggregate(pipeline))
+        return list(db[COLLECTION].aggregate(_q7_pipeline(min_votes, [])))
     except:
         return [{"error": "Version MongoDB < 5.0"}]
 
 
-def q8_breakout_struct(db):
-    """Q8: Percée"""
-    pipeline = [
-        {"$match": {"rating.votes": {"$gt": 200000}}},
-        {"$unwind": "$cast"},
-        {"$sort": {"year": 1}},
+def q7_rank_genre_struct_stream(
+    db, min_votes=1000, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE
+):
+    """Q7 en flux (les classements exportés tiennent en quelques documents par genre)"""
+    results = top_per_genre_mongo(db, min_votes)
+    if results is not None:
+        return iter(results[offset : None if limit is None else offset + limit])
+
+    pipeline = _q7_pipeline(min_votes, page_stages(limit, offset))
+    try:
+        return stream_aggregate(db[COLLECTION], pipeline, batch_size)
+    except:
+        return iter([{"error": "Version MongoDB < 5.0"}])
+
+
+def _q8_pipeline(page):
+    # Même percée que Q8 SQLite : premier film à plus de 200 000 votes (en tant
+    # qu'acteur) précédé d'au moins 3 films moins votés. Les films "avant" comptent
+    # tous les métiers présents dans le document (cast, directors, writers).
+    before = {
+        "$filter": {
+            "input": "$films",
+            "as": "b",
+            "cond": {
+                "$and": [
+                    # votes absents ou nuls : inférieurs à 0 dans l'ordre BSON
+                    {"$gte": ["$$b.votes", 0]},
+                    {"$lt": ["$$b.votes", BREAKTHROUGH_VOTES]},
+                    {"$lt": ["$$b.year", "$$f.year"]},
+                ]
+            },
+        }
+    }
+    return [
+        {"$match": {"year": {"$ne": None}}},
+        {
+            "$project": {
+                "title": 1,
+                "year": 1,
+                "votes": "$rating.votes",
+                "actors": "$cast.person_id",
+                "people": {"$concatArrays": ["$cast", "$directors", "$writers"]},
+            }
+        },
+        {"$unwind": "$people"},
+        # Films distincts de chaque personne ($addToSet : un film où elle a deux métiers compte une fois)
         {
             "$group": {
-                "_id": "$cast.person_id",
-                "first_hit": {"$first": "$title"},
-                "votes": {"$first": "$rating.votes"},
-                "year": {"$first": "$year"},
-                "name": {"$first": "$cast.name"},
+                "_id": "$people.person_id",
+                "name": {"$first": "$people.name"},
+                "films": {
+                    "$addToSet": {
+                        "movie_id": "$_id",
+                        "title": "$title",
+                        "year": "$year",
+                        "votes": "$votes",
+                        "acting": {"$in": ["$people.person_id", "$actors"]},
+                    }
+                },
+            }
+        },
+        {
+            "$project": {
+                "name": 1,
+                "hits": {
+                    "$filter": {
+                        "input": "$films",
+                        "as": "f",
+                        "cond": {
+                            "$and": [
+                                "$$f.acting",
+                                {"$gt": ["$$f.votes", BREAKTHROUGH_VOTES]},
+                                {"$gte": [{"$size": before}, 3]},
+                            ]
+                        },
+                    }
+                },
             }
         },
-        {"$limit": 10},
+        {"$unwind": "$hits"},
+        {"$sort": {"hits.year": 1, "hits.movie_id": 1}},
+        {
+            "$group": {
+                "_id": "$_id",
+                "first_hit": {"$first": "$hits.title"},
+                "votes": {"$first": "$hits.votes"},
+                "year": {"$first": "$hits.year"},
+                "name": {"$first": "$name"},
+            }
+        },
+        # Même ordre que Q8 SQLite
+        {"$sort": {"year": 1, "name": 1, "_id": 1}},
+        *page,
     ]
-    return list(db[COLLECTION].aggregate(pipeline))
 
 
-def q9_complex_struct(db):
-    """Q9: Complexe (Filtrage Region FR)"""
+def q8_breakout_struct(db):
+    """Q8: Percée"""
+    return list(db[COLLECTION].aggregate(_q8_pipeline(page_stages(10)), allowDiskUse=True))
+
+
+def q8_breakout_struct_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q8 en flux : toutes les percées"""
+    return stream_aggregate(db[COLLECTION], _q8_pipeline(page_stages(limit, offset)), batch_size)
+
+
+def _q9_cursor(db):
     query = {
         "runtime": {"$gt": 120},
         "rating.average": {"$gt": 8.0},
         "titles": {"$elemMatch": {"region": "FR"}},
     }
-    return list(db[COLLECTION].find(query, {"title": 1, "rating": 1}).limit(20))
+    return db[COLLECTION].find(query, {"title": 1, "rating": 1})
+
+
+def q9_complex_struct(db):
+    """Q9: Complexe (Filtrage Region FR)"""
+    return list(_q9_cursor(db).limit(20))
+
+
+def q9_complex_struct_stream(db, limit=None, offset=0, batch_size=STREAM_BATCH_SIZE):
+    """Q9 en flux : tous les films concernés"""
+    cursor = _q9_cursor(db).skip(offset).limit(limit or 0)
+    return stream_cursor(cursor.batch_size(batch_size))
 
 
 def run_benchmark():
@@ -199,7 +475,7 @@ def run_benchmark():
         return
 
     # Index (au cas où ils n'auraient pas été créés par la migration)
-    db[COLLECTION].create_index("cast.name")
+    db[COLLECTION].create_index("cast.person_id")
     db[COLLECTION].create_index("genres")
 
     tests = [
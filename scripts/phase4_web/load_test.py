@@ -0,0 +1,325 @@
+# Test de charge des vues Django : N clients simultanés sur les URL de config/urls.py,
+# avec un mélange réaliste d'identifiants et de recherches.
+# Cible : serveur local (python manage.py runserver) ou application WSGI en mémoire.
+# Rapporte débit et latences p50/p95/p99 par page, ainsi que le nombre de requêtes
+# SQL et de commandes MongoDB par requête HTTP (en-têtes de QueryCountMiddleware).
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_DIR)
+
+from scripts.phase1_sqlite.bench_harness import summarize
+from scripts.phase1_sqlite.imdb_ids import to_text
+
+DB_PATH = os.path.join(BASE_DIR, "data", "imdb.db")
+BASE_URL = "http://127.0.0.1:8000"
+
+CLIENTS = 8
+DURATION = 30
+SEED = 42
+
+# Part de chaque page dans le trafic (poids relatifs)
+ENDPOINT_MIX = {
+    "home": 10,
+    "movie_list": 20,
+    "movie_detail": 30,
+    "person_detail": 15,
+    "search": 15,
+    "stats": 10,
+}
+
+# La majorité des visites portent sur les films et personnes populaires
+POPULAR_SHARE = 0.8
+POOL_SIZE = 1000
+
+# Pages de la liste : les premières sont de loin les plus consultées
+PAGE_WEIGHTS = (60, 20, 10, 5, 5)
+SORTS = ("-year", "year", "title", "rating")
+
+SQL_HEADER = "X-SQL-Queries"
+MONGO_HEADER = "X-Mongo-Operations"
+
+
+def load_workload(db_path):
+    """Identifiants, genres et termes de recherche tirés de la base SQLite"""
+    conn = sqlite3.connect(db_path)
+
+    def column(sql, prefix=None):
+        values = [row[0] for row in conn.execute(sql, (POOL_SIZE,))]
+        return [to_text(v, prefix) for v in values] if prefix else values
+
+    workload = {
+        "popular_movies": column(
+            "SELECT movie_id FROM ratings ORDER BY num_votes DESC LIMIT ?", "tt"
+        ),
+        "random_movies": column(
+            "SELECT movie_id FROM movies ORDER BY RANDOM() LIMIT ?", "tt"
+        ),
+        "popular_persons": column(
+            """
+            SELECT person_id FROM principals
+            WHERE category IN ('actor', 'actress', 'director')
+            GROUP BY person_id ORDER BY COUNT(*) DESC LIMIT ?
+            """,
+            "nm",
+        ),
+        "random_persons": column(
+            "SELECT person_id FROM persons ORDER BY RANDOM() LIMIT ?", "nm"
+        ),
+        "genres": [row[0] for row in conn.execute("SELECT DISTINCT genre FROM genres")],
+    }
+
+    # Recherches : mots de titres populaires et noms de famille connus
+    titles = column(
+        """
+        SELECT m.title FROM movies m JOIN ratings r ON r.movie_id = m.movie_id
+        ORDER BY r.num_votes DESC LIMIT ?
+        """
+    )
+    names = column(
+        """
+        SELECT pe.name FROM persons pe
+        WHERE pe.person_id IN (
+            SELECT person_id FROM principals GROUP BY person_id ORDER BY COUNT(*) DESC LIMIT ?
+        )
+        """
+    )
+    words = [w for t in titles if t for w in t.split() if len(w) > 3]
+    words += [n.split()[-1] for n in names if n]
+    workload["search_terms"] = words or ["the"]
+    conn.close()
+    return workload
+
+
+def pick_id(rng, popular, others):
+    pool = popular if (rng.random() < POPULAR_SHARE and popular) else (others or popular)
+    return rng.choice(pool)
+
+
+def make_request(rng, workload):
+    """(page, chemin) tiré selon ENDPOINT_MIX"""
+    from django.urls import reverse
+
+    endpoint = rng.choices(list(ENDPOINT_MIX), weights=list(ENDPOINT_MIX.values()))[0]
+    if endpoint == "movie_detail":
+        movie_id = pick_id(rng, workload["popular_movies"], workload["random_movies"])
+        return endpoint, reverse(endpoint, args=[movie_id])
+    if endpoint == "person_detail":
+        person_id = pick_id(rng, workload["popular_persons"], workload["random_persons"])
+        return endpoint, reverse(endpoint, args=[person_id])
+    if endpoint == "search":
+        query = urlencode({"q": rng.choice(workload["search_terms"])})
+        return endpoint, f"{reverse(endpoint)}?{query}"
+    if endpoint == "movie_list":
+        params = {"sort": rng.choice(SORTS)}
+        if workload["genres"] and rng.random() < 0.5:
+            params["genre"] = rng.choice(workload["genres"])
+        if rng.random() < 0.3:
+            start = rng.randrange(1950, 2020, 10)
+            params.update(year_min=start, year_max=start + 9)
+        page = rng.choices(range(1, len(PAGE_WEIGHTS) + 1), weights=PAGE_WEIGHTS)[0]
+        if page > 1:
+            params["page"] = page
+        return endpoint, f"{reverse(endpoint)}?{urlencode(params)}"
+    return endpoint, reverse(endpoint)
+
+
+class HttpTarget:
+    """Serveur déjà lancé : une connexion keep-alive par client"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+
+    def open(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=60)
+
+    def get(self, conn, path):
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status, response.getheader(SQL_HEADER), response.getheader(MONGO_HEADER)
+
+    def close(self, conn):
+        conn.close()
+
+
+class WsgiTarget:
+    """Application WSGI dans le processus (django.test.Client, sans réseau)"""
+
+    def open(self):
+        from django.test import Client
+
+        return Client(raise_request_exception=False)
+
+    def get(self, client, path):
+        response = client.get(path, HTTP_HOST="localhost")
+        return (
+            response.status_code,
+            response.headers.get(SQL_HEADER),
+            response.headers.get(MONGO_HEADER),
+        )
+
+    def close(self, client):
+        from django.db import connections
+
+        connections.close_all()
+
+
+def run_client(target, workload, seed, deadline, max_requests, records):
+    rng = random.Random(seed)
+    conn = target.open()
+    sent = 0
+    try:
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            endpoint, path = make_request(rng, workload)
+            start = time.perf_counter_ns()
+            try:
+                status, sql, mongo = target.get(conn, path)
+            except (OSError, http.client.HTTPException):
+                status, sql, mongo = None, None, None
+                # Connexion coupée par le serveur : on en rouvre une
+                target.close(conn)
+                conn = target.open()
+            elapsed = time.perf_counter_ns() - start
+            records.append((endpoint, elapsed, status, sql, mongo))
+            sent += 1
+    finally:
+        target.close(conn)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def run_load(target, workload, clients=CLIENTS, duration=DURATION, requests=None, seed=SEED):
+    """
+    Lance `clients` threads pendant `duration` secondes (ou `requests` requêtes par
+    client) et agrège les mesures par page.
+    """
+    records = []
+    deadline = time.perf_counter() + (duration if requests is None else float("inf"))
+    threads = [
+        threading.Thread(
+            target=run_client, args=(target, workload, seed + i, deadline, requests, records)
+        )
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    report = {"clients": clients, "wall_s": wall, "total_requests": len(records), "endpoints": {}}
+    for endpoint in list(ENDPOINT_MIX) + ["TOTAL"]:
+        rows = [r for r in records if endpoint == "TOTAL" or r[0] == endpoint]
+        if not rows:
+            continue
+        sql = [int(r[3]) for r in rows if r[3] is not None]
+        mongo = [int(r[4]) for r in rows if r[4] is not None]
+        report["endpoints"][endpoint] = {
+            "requests": len(rows),
+            "errors": sum(1 for r in rows if r[2] is None or r[2] >= 500),
+            "not_found": sum(1 for r in rows if r[2] == 404),
+            "throughput_rps": len(rows) / wall,
+            "latency_ms": summarize([r[1] for r in rows]),
+            "sql_queries": {"mean": _mean(sql), "max": max(sql, default=None)},
+            "mongo_operations": {"mean": _mean(mongo), "max": max(mongo, default=None)},
+        }
+    return report
+
+
+def print_report(report):
+    print("\n" + "=" * 112)
+    print(
+        f"{'PAGE':<14} | {'REQ.':>6} | {'ERR.':>5} | {'REQ/S':>7} | {'P50 (ms)':>9} | "
+        f"{'P95 (ms)':>9} | {'P99 (ms)':>9} | {'SQL / REQ.':>12} | {'MONGO / REQ.':>12}"
+    )
+    print("-" * 112)
+    for endpoint, data in report["endpoints"].items():
+        if endpoint == "TOTAL":
+            print("-" * 112)
+        lat = data["latency_ms"]
+
+        def count(key):
+            stats = data[key]
+            if stats["mean"] is None:
+                return "-"
+            return f"{stats['mean']:.1f} (≤{stats['max']})"
+
+        print(
+            f"{endpoint:<14} | {data['requests']:>6} | {data['errors']:>5} | "
+            f"{data['throughput_rps']:>7.1f} | {lat['p50']:>9.2f} | {lat['p95']:>9.2f} | "
+            f"{lat['p99']:>9.2f} | {count('sql_queries'):>12} | {count('mongo_operations'):>12}"
+        )
+    print("=" * 112)
+    print(
+        f"{report['total_requests']} requêtes, {report['clients']} clients, "
+        f"{report['wall_s']:.1f} s. Compteurs SQL / Mongo : en-têtes de QueryCountMiddleware "
+        "(QUERY_COUNT_HEADERS)."
+    )
+
+
+def setup_django(db_path, in_process, mongo_uri=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    from django.conf import settings
+
+    if in_process:
+        # Avant django.setup() : la connexion n'est pas encore ouverte
+        settings.DATABASES["default"]["NAME"] = db_path
+        settings.QUERY_COUNT_HEADERS = True
+        if mongo_uri:
+            settings.MONGO_URI = mongo_uri
+        # Les erreurs 500 sont comptées dans le rapport, pas affichées une par une
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    import django
+
+    django.setup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge des vues Django")
+    parser.add_argument("--base-url", default=BASE_URL, help="Serveur à tester")
+    parser.add_argument(
+        "--in-process", action="store_true", help="Application WSGI dans le processus"
+    )
+    parser.add_argument("--db-path", default=DB_PATH, help="Base SQLite (identifiants tirés)")
+    parser.add_argument("--mongo-uri", help="MongoDB utilisé en mode --in-process")
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--duration", type=float, default=DURATION, help="Durée (s)")
+    parser.add_argument(
+        "--requests", type=int, help="Requêtes par client (remplace --duration)"
+    )
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Base introuvable : {args.db_path}")
+        sys.exit(1)
+
+    setup_django(args.db_path, args.in_process, args.mongo_uri)
+    workload = load_workload(args.db_path)
+    target = WsgiTarget() if args.in_process else HttpTarget(args.base_url)
+    where = "WSGI en mémoire" if args.in_process else args.base_url
+    print(f"🚦 {args.clients} clients sur {where}...")
+
+    report = run_load(target, workload, args.clients, args.duration, args.requests, args.seed)
+    report["target"] = where
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {args.output}")
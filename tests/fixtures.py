@@ -0,0 +1,24 @@
+# Bases de test : CSV synthétiques (generate_data.py) importés par le pipeline réel
+import contextlib
+import io
+import os
+
+from scripts.phase1_sqlite.create_schema import create_schema
+from scripts.phase1_sqlite.generate_data import generate
+from scripts.phase1_sqlite.import_data import import_data
+
+# 5 000 films : assez de films à plus de 200 000 votes pour Q8
+SCALE = 0.5
+
+
+def build_synthetic_db(directory, scale=SCALE, int_ids=False):
+    """Crée `directory`/imdb.db (schéma, import, index, synthèses) ; retourne son chemin"""
+    csv_dir = os.path.join(directory, "csv")
+    db_path = os.path.join(directory, "imdb.db")
+    # Les scripts rendent compte sur la sortie standard
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not os.path.exists(csv_dir):
+            generate(scale, output_dir=csv_dir)
+        create_schema(db_path=db_path, int_ids=int_ids)
+        import_data(db_path=db_path, csv_dir=csv_dir)
+    return db_path
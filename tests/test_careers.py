@@ -0,0 +1,97 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite import queries
+from scripts.phase1_sqlite.create_schema import create_schema
+from scripts.phase1_sqlite.summaries import refresh_summaries
+from tests.fixtures import build_synthetic_db
+
+
+def without_careers(conn, func, *args):
+    """Résultat de `func` par le SQL d'origine (person_careers masquée)"""
+    conn.execute("ALTER TABLE person_careers RENAME TO person_careers_hidden")
+    try:
+        return [tuple(row) for row in func(conn, *args)]
+    finally:
+        conn.execute("ALTER TABLE person_careers_hidden RENAME TO person_careers")
+
+
+class CareerPathsParityTest(unittest.TestCase):
+    """Q8 / Q9 : la version précalculée (person_careers) rend les lignes du SQL d'origine"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.conn = sqlite3.connect(build_synthetic_db(cls.directory))
+        cls.conn.row_factory = sqlite3.Row
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        shutil.rmtree(cls.directory)
+
+    def assertSameRows(self, func, *args):
+        rows = [tuple(row) for row in func(self.conn, *args)]
+        self.assertEqual(rows, without_careers(self.conn, func, *args))
+        return rows
+
+    def test_q8(self):
+        self.assertTrue(self.assertSameRows(queries.query_breakthrough_actors_stream))
+        self.assertSameRows(queries.query_breakthrough_actors)
+
+    def test_q9(self):
+        self.assertTrue(self.assertSameRows(queries.query_longest_careers_stream))
+        self.assertSameRows(queries.query_longest_careers)
+
+
+class BreakthroughTest(unittest.TestCase):
+    """Un premier succès sans 3 films moins votés avant lui ne masque pas la percée suivante"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        db_path = os.path.join(self.directory, "imdb.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_schema(db_path=db_path)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        # nm1 : succès en 1990 après 1 petit film, puis en 2000 après 3 petits films
+        films = [
+            ("tt1", "Petit 1", 1985, 1_000),
+            ("tt2", "Succès précoce", 1990, 500_000),
+            ("tt3", "Petit 2", 1992, 2_000),
+            ("tt4", "Petit 3", 1995, 3_000),
+            ("tt5", "Percée", 2000, 300_000),
+        ]
+        for movie_id, title, year, votes in films:
+            self.conn.execute(
+                "INSERT INTO movies VALUES (?, ?, ?, ?, 100)", (movie_id, title, title, year)
+            )
+            self.conn.execute("INSERT INTO ratings VALUES (?, 7.0, ?)", (movie_id, votes))
+            self.conn.execute(
+                "INSERT INTO principals VALUES (?, 1, 'nm1', 'actor', NULL)", (movie_id,)
+            )
+        self.conn.execute("INSERT INTO persons VALUES ('nm1', 'Jane Doe', NULL, NULL)")
+        refresh_summaries(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.directory)
+
+    def test_first_qualifying_hit(self):
+        expected = [("Jane Doe", "Percée", 2000)]
+        rows = queries.query_breakthrough_actors(self.conn)
+        self.assertEqual([tuple(row) for row in rows], expected)
+        self.assertEqual(without_careers(self.conn, queries.query_breakthrough_actors), expected)
+        career = self.conn.execute(
+            "SELECT first_hit_movie_id, films_before_hit FROM person_careers"
+        ).fetchone()
+        self.assertEqual(tuple(career), ("tt5", 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
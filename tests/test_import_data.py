@@ -0,0 +1,103 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite.create_schema import create_schema
+from scripts.phase1_sqlite.generate_data import generate
+from scripts.phase1_sqlite.import_data import (
+    TABLES_CONFIG,
+    import_data,
+    import_parallel,
+    import_table_streaming,
+    split_ranges,
+)
+
+
+class SplitRangesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.csv")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("mid,title\n")
+            for i in range(1000):
+                f.write(f"tt{i:07d},Titre {i}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_ranges_cover_the_data_on_line_starts(self):
+        ranges = split_ranges(self.path, 1000)
+        self.assertGreater(len(ranges), 10)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        header = data.index(b"\n") + 1
+        self.assertEqual(ranges[0][0], header)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1 : start], b"\n")
+
+    def test_small_file_is_one_range(self):
+        self.assertEqual(len(split_ranges(self.path)), 1)
+
+
+class ParallelImportTest(unittest.TestCase):
+    """Import parallèle par tranches : mêmes lignes que l'import séquentiel"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv_dir = os.path.join(self.directory, "csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate(0.05, output_dir=self.csv_dir)
+        self.connections = []
+
+    def tearDown(self):
+        for conn in self.connections:
+            conn.close()
+        shutil.rmtree(self.directory)
+
+    def new_db(self, name):
+        path = os.path.join(self.directory, name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_schema(db_path=path)
+        conn = sqlite3.connect(path)
+        self.connections.append(conn)
+        return conn
+
+    def test_same_rows_as_streaming(self):
+        tables = [
+            (os.path.join(self.csv_dir, csv_file), table, columns)
+            for csv_file, table, columns in TABLES_CONFIG
+        ]
+        sequential = self.new_db("sequential.db")
+        parallel = self.new_db("parallel.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path, table, columns in tables:
+                import_table_streaming(sequential, path, table, columns, chunksize=500)
+            import_parallel(parallel, tables, chunksize=500, workers=2, range_bytes=4096)
+
+        for _, table, columns in TABLES_CONFIG:
+            query = f"SELECT {', '.join(columns)} FROM {table} ORDER BY {', '.join(columns)}"
+            self.assertEqual(
+                parallel.execute(query).fetchall(), sequential.execute(query).fetchall(), table
+            )
+
+    def test_no_csv(self):
+        conn = self.new_db("empty.db")
+        self.assertEqual(import_parallel(conn, [], workers=2), ({}, {}))
+
+        csv_dir = os.path.join(self.directory, "no_csv")
+        os.mkdir(csv_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            problems = import_data(
+                mode="parallel", db_path=os.path.join(self.directory, "empty.db"), csv_dir=csv_dir
+            )
+        self.assertEqual(len(problems), len(TABLES_CONFIG))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite.create_schema import create_schema
+from scripts.phase1_sqlite.import_imdb_dumps import TITLE_BASICS, import_dumps
+
+BASICS = [
+    "tconst\ttitleType\tprimaryTitle\toriginalTitle\tisAdult\tstartYear\tendYear\truntimeMinutes\tgenres",
+    "tt0000001\tmovie\tGood\tGood\t0\t1994\t\\N\t142\tDrama",
+    # Colonnes décalées, comme dans le dump officiel : un genre à la place de la durée
+    "tt0000002\tmovie\tShifted\t0\t1995\t\\N\tDrama,Romance",
+    "tt0000003\tmovie\tBad runtime\tBad runtime\t0\t1996\t\\N\tComedy\tComedy",
+    "tt0000004\tmovie\tAlso good\tAlso good\t0\t2001\t\\N\t\\N\tComedy",
+]
+RATINGS = [
+    "tconst\taverageRating\tnumVotes",
+    "tt0000001\t9.3\t2000000",
+    "tt0000003\t5.0\t10",
+    "tt0000004\t7.1\t500",
+]
+
+
+def write_dump(directory, name, lines):
+    with gzip.open(os.path.join(directory, name), "wt", encoding="utf-8", newline="") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class ImportDumpsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dumps_dir = os.path.join(self.directory, "dumps")
+        os.mkdir(self.dumps_dir)
+        self.db_path = os.path.join(self.directory, "imdb.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_schema(db_path=self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def import_dumps(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            problems = import_dumps(self.dumps_dir, db_path=self.db_path)
+        return problems, out.getvalue()
+
+    def rows(self, sql):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_malformed_rows_are_skipped(self):
+        write_dump(self.dumps_dir, TITLE_BASICS, BASICS)
+        write_dump(self.dumps_dir, "title.ratings.tsv.gz", RATINGS)
+
+        problems, out = self.import_dumps()
+
+        self.assertIn("2 lignes mal formées ignorées", out)
+        self.assertNotIn(f"{TITLE_BASICS} :", " ".join(problems))
+        self.assertEqual(
+            self.rows("SELECT movie_id FROM movies ORDER BY movie_id"),
+            [("tt0000001",), ("tt0000004",)],
+        )
+        self.assertEqual(
+            self.rows("SELECT movie_id, genre FROM genres ORDER BY movie_id"),
+            [("tt0000001", "Drama"), ("tt0000004", "Comedy")],
+        )
+        # Note d'un film écarté : filtrée comme celle d'un film non retenu
+        self.assertEqual(
+            self.rows("SELECT movie_id FROM ratings ORDER BY movie_id"),
+            [("tt0000001",), ("tt0000004",)],
+        )
+
+    def test_missing_title_basics_fails_fast(self):
+        write_dump(self.dumps_dir, "title.ratings.tsv.gz", RATINGS)
+
+        problems, _ = self.import_dumps()
+
+        self.assertEqual(problems, [f"{TITLE_BASICS} manquant"])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM ratings"), [(0,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
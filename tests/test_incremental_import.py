@@ -0,0 +1,88 @@
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite.create_schema import create_schema
+from scripts.phase1_sqlite.generate_data import generate
+from scripts.phase1_sqlite.import_data import TABLES_CONFIG, import_data
+from scripts.phase1_sqlite.incremental_import import apply_table_delta, seed_hashes
+
+
+class FirstIncrementalRunTest(unittest.TestCase):
+    """Empreintes calculées depuis la base : le premier passage n'écrit que les différences"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv_dir = os.path.join(self.directory, "csv")
+        self.db_path = os.path.join(self.directory, "imdb.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate(0.05, output_dir=self.csv_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def import_and_seed(self, int_ids):
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_schema(db_path=self.db_path, int_ids=int_ids)
+            import_data(db_path=self.db_path, csv_dir=self.csv_dir)
+        conn = sqlite3.connect(self.db_path)
+        for _, table_name, sql_columns in TABLES_CONFIG:
+            seed_hashes(conn, table_name, sql_columns)
+        return conn
+
+    def delta(self, conn, csv_file):
+        for name, table_name, sql_columns in TABLES_CONFIG:
+            if name == csv_file:
+                path = os.path.join(self.csv_dir, csv_file)
+                return apply_table_delta(conn, path, table_name, sql_columns)
+
+    def check_unchanged_then_one_update(self, int_ids):
+        conn = self.import_and_seed(int_ids)
+        for csv_file, _, _ in TABLES_CONFIG:
+            self.assertEqual(self.delta(conn, csv_file), (0, 0, 0), csv_file)
+
+        path = os.path.join(self.csv_dir, "ratings.csv")
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        rows[1][-1] = str(int(rows[1][-1]) + 1)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+        self.assertEqual(self.delta(conn, "ratings.csv"), (0, 1, 0))
+        conn.close()
+
+    def test_text_ids(self):
+        self.check_unchanged_then_one_update(int_ids=False)
+
+    def test_int_ids(self):
+        self.check_unchanged_then_one_update(int_ids=True)
+
+    def test_null_key_deletion(self):
+        # character_name vide = NULL dans la clé : la suppression doit quand même s'appliquer
+        conn = self.import_and_seed(int_ids=False)
+        path = os.path.join(self.csv_dir, "characters.csv")
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        movie_id, person_id = rows[1][:2]
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow([movie_id, person_id, ""])
+        self.assertEqual(self.delta(conn, "characters.csv"), (1, 0, 0))
+        self.assertEqual(self.delta(conn, "characters.csv"), (0, 0, 0))
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+        self.assertEqual(self.delta(conn, "characters.csv"), (0, 0, 1))
+        self.assertEqual(self.delta(conn, "characters.csv"), (0, 0, 0))
+        null_rows = conn.execute(
+            "SELECT COUNT(*) FROM characters WHERE character_name IS NULL"
+        ).fetchone()[0]
+        self.assertEqual(null_rows, 0)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
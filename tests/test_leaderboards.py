@@ -0,0 +1,162 @@
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite import queries
+from scripts.phase1_sqlite.leaderboards import (
+    ALL_DECADES,
+    ALL_GENRES,
+    LEADERBOARD_SIZE,
+    LEADERBOARD_TABLE,
+    build_leaderboards,
+    export_leaderboards,
+    top_per_genre,
+    top_per_genre_mongo,
+    update_leaderboards,
+)
+from tests.fixtures import build_synthetic_db
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+def top_entries(conn):
+    """{(min_votes, genre, décennie): LEADERBOARD_SIZE premières entrées}"""
+    boards = {}
+    for row in conn.execute(
+        f"""
+        SELECT min_votes, genre, decade, average_rating, num_votes, movie_id
+        FROM {LEADERBOARD_TABLE}
+        ORDER BY min_votes, genre, decade,
+                 average_rating DESC, num_votes DESC, movie_id DESC
+        """
+    ):
+        entries = boards.setdefault(tuple(row[:3]), [])
+        if len(entries) < LEADERBOARD_SIZE:
+            entries.append(tuple(row[3:]))
+    return boards
+
+
+class IncrementalLeaderboardsTest(unittest.TestCase):
+    """update_leaderboards donne les mêmes classements qu'un recalcul complet"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # 2 000 films : classements "tous genres" tronqués (plus de LEADERBOARD_CAPACITY)
+        self.conn = sqlite3.connect(build_synthetic_db(self.directory, scale=0.2))
+        self.random = random.Random(7)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.directory)
+
+    def assertMatchesRebuild(self, movie_ids):
+        refilled = update_leaderboards(self.conn, movie_ids)
+        incremental = top_entries(self.conn)
+        build_leaderboards(self.conn)
+        self.assertEqual(incremental, top_entries(self.conn))
+        return refilled
+
+    def board_movies(self, genre=ALL_GENRES, decade=ALL_DECADES, min_votes=0):
+        return [
+            movie_id
+            for (movie_id,) in self.conn.execute(
+                f"""
+                SELECT movie_id FROM {LEADERBOARD_TABLE}
+                WHERE min_votes = ? AND genre = ? AND decade = ?
+                ORDER BY average_rating DESC, num_votes DESC, movie_id DESC
+                """,
+                (min_votes, genre, decade),
+            )
+        ]
+
+    def test_random_rating_changes(self):
+        movie_ids = [m for (m,) in self.conn.execute("SELECT movie_id FROM ratings")]
+        changed = self.random.sample(movie_ids, 300)
+        with self.conn:
+            for movie_id in changed:
+                self.conn.execute(
+                    "UPDATE ratings SET average_rating = ?, num_votes = ? WHERE movie_id = ?",
+                    (round(self.random.uniform(1, 10), 1), self.random.randint(0, 3000), movie_id),
+                )
+        self.assertMatchesRebuild(changed)
+
+    def test_top_movies_demoted(self):
+        # Le classement tronqué retombe sous LEADERBOARD_SIZE : recalcul depuis ratings
+        demoted = self.board_movies()[:150]
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE ratings SET average_rating = 1.0 WHERE movie_id = ?",
+                [(movie_id,) for movie_id in demoted],
+            )
+        self.assertGreater(self.assertMatchesRebuild(demoted), 0)
+
+    def test_year_and_genre_changes(self):
+        movie_ids = self.board_movies()[:20] + self.board_movies()[-20:]
+        with self.conn:
+            for movie_id in movie_ids:
+                self.conn.execute(
+                    "UPDATE movies SET year = ? WHERE movie_id = ?",
+                    (self.random.choice([None, 1955, 1987, 2012]), movie_id),
+                )
+                self.conn.execute("DELETE FROM genres WHERE movie_id = ?", (movie_id,))
+                self.conn.execute(
+                    "INSERT INTO genres (movie_id, genre) VALUES (?, ?)",
+                    (movie_id, self.random.choice(["Drama", "Comedy", "Western"])),
+                )
+            self.conn.execute("DELETE FROM ratings WHERE movie_id = ?", (movie_ids[0],))
+        self.assertMatchesRebuild(movie_ids)
+
+
+class TopPerGenreTest(unittest.TestCase):
+    """Q7 : classements SQLite et MongoDB, et fenêtre SQL, départagés de la même façon"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.conn = sqlite3.connect(build_synthetic_db(cls.directory, scale=0.2))
+        # Cinq films ex aequo (note et votes) en tête d'un genre
+        tied = [
+            movie_id
+            for (movie_id,) in cls.conn.execute(
+                "SELECT movie_id FROM genres WHERE genre = 'Drama' LIMIT 5"
+            )
+        ]
+        with cls.conn:
+            cls.conn.executemany(
+                "UPDATE ratings SET average_rating = 10.0, num_votes = 5000 WHERE movie_id = ?",
+                [(movie_id,) for movie_id in tied],
+            )
+        build_leaderboards(cls.conn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+        shutil.rmtree(cls.directory)
+
+    def test_leaderboards_match_window_sql(self):
+        for min_votes in (0, 1000):
+            rows = [tuple(row) for row in top_per_genre(self.conn, min_votes)]
+            window = self.conn.execute(queries._TOP_3_PER_GENRE_SQL, (min_votes,)).fetchall()
+            self.assertEqual(rows, window)
+            drama = [row for row in rows if row[0] == "Drama"]
+            self.assertEqual([row[1] for row in drama], [1, 2, 3])
+
+    @unittest.skipIf(mongomock is None, "mongomock non installé")
+    def test_mongo_leaderboards_match_sqlite(self):
+        db = mongomock.MongoClient()["imdb"]
+        export_leaderboards(self.conn, db)
+        for min_votes in (0, 1000):
+            documents = [
+                (d["genre"], d["rank"], d["title"], d["rating"])
+                for d in top_per_genre_mongo(db, min_votes)
+            ]
+            self.assertEqual(documents, [tuple(row) for row in top_per_genre(self.conn, min_votes)])
+
+
+if __name__ == "__main__":
+    unittest.main()
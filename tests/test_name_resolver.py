@@ -0,0 +1,85 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite import queries
+from scripts.phase1_sqlite.create_schema import create_schema
+from scripts.phase1_sqlite.name_resolver import (
+    MAX_MATCHES,
+    build_name_collection,
+    build_name_index,
+    resolve_person_ids,
+    resolve_person_ids_mongo,
+)
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+# Plus de MAX_MATCHES "Smith" : les index ne suffisent plus
+SMITHS = MAX_MATCHES + 50
+PERSONS = [(f"nm{i:07d}", f"John Smith {i}") for i in range(SMITHS)] + [
+    ("nm1000001", "Brad Pitt"),
+    ("nm1000002", "Jürgen Prochnow"),
+]
+
+
+class NameResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        db_path = os.path.join(self.directory, "imdb.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_schema(db_path=db_path)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executemany("INSERT INTO persons VALUES (?, ?, NULL, NULL)", PERSONS)
+        self.conn.execute("INSERT INTO movies VALUES ('tt1', 'Heat', 'Heat', 1995, 170)")
+        self.conn.executemany(
+            "INSERT INTO principals VALUES ('tt1', ?, ?, 'actor', NULL)",
+            [(i, person_id) for i, (person_id, _) in enumerate(PERSONS)],
+        )
+        self.conn.commit()
+        build_name_index(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.directory)
+
+    def test_broad_name_is_not_truncated(self):
+        self.assertEqual(len(resolve_person_ids(self.conn, "smith")), SMITHS)
+        self.assertEqual(len(resolve_person_ids(self.conn, "ohn smi")), SMITHS)
+        self.assertEqual(len(resolve_person_ids(self.conn, "smith", limit=10)), 10)
+
+    def test_short_substring(self):
+        # "ü" -> "u" : ni début de mot, ni trigramme
+        self.assertIn("nm1000002", resolve_person_ids(self.conn, "ü"))
+        self.assertEqual(resolve_person_ids(self.conn, "pi"), ["nm1000001"])
+
+    def test_ranking(self):
+        self.assertEqual(resolve_person_ids(self.conn, "John Smith 7")[0], "nm0000007")
+        self.assertEqual(resolve_person_ids(self.conn, "pitt"), ["nm1000001"])
+
+    def test_queries_accept_many_ids(self):
+        # Plus d'identifiants que MAX_MATCHES : passés en JSON (json_each)
+        rows = queries.query_actor_filmography_stream(self.conn, "smith")
+        self.assertEqual(len(list(rows)), SMITHS)
+
+    @unittest.skipIf(mongomock is None, "mongomock non installé")
+    def test_mongo_matches_sqlite(self):
+        db = mongomock.MongoClient()["imdb"]
+        db.persons.insert_many([{"person_id": p, "name": n} for p, n in PERSONS])
+        db.principals.insert_many([{"person_id": p, "movie_id": "tt1"} for p, _ in PERSONS])
+        build_name_collection(db)
+        for name in ("smith", "ohn smi", "ü", "pi", "John Smith 7"):
+            self.assertEqual(
+                resolve_person_ids_mongo(db, name), resolve_person_ids(self.conn, name), name
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import contextlib
+import io
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from scripts.phase1_sqlite.query_cache import CachedQueries, QueryCache, normalize_value
+from scripts.phase1_sqlite.summaries import dataset_version
+from scripts.phase2_mongodb.migrate_flat import repair_sqlite_database
+from tests.fixtures import build_synthetic_db
+
+
+def query_movies_by_genre(conn, genre):
+    return conn.execute("SELECT title FROM movies WHERE genre = ?", (genre,)).fetchall()
+
+
+class QueryCacheKeyTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE movies (title TEXT, genre TEXT)")
+        self.conn.execute("INSERT INTO movies VALUES ('Heat', 'Action')")
+        module = SimpleNamespace(query_movies_by_genre=query_movies_by_genre)
+        self.cached = CachedQueries(module, lambda conn: ("test", 1), QueryCache())
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_padded_string_does_not_share_key(self):
+        # " Action" ne trouve rien en SQL : son résultat ne doit pas servir pour "Action"
+        self.assertEqual(self.cached.query_movies_by_genre(self.conn, " Action"), [])
+        self.assertEqual(self.cached.query_movies_by_genre(self.conn, "Action"), [("Heat",)])
+        self.assertEqual(self.cached.cache.stats()["misses"], 2)
+
+    def test_same_string_hits(self):
+        self.cached.query_movies_by_genre(self.conn, "Action")
+        self.cached.query_movies_by_genre(self.conn, genre="Action")
+        self.assertEqual(self.cached.cache.stats()["hits"], 1)
+
+    def test_names_are_normalized(self):
+        self.assertEqual(
+            normalize_value("actor_name", "tom  HANKS"), normalize_value("actor_name", "Tom Hanks")
+        )
+        self.assertNotEqual(normalize_value("genre", " Action"), normalize_value("genre", "Action"))
+        # Requêtes groupées : le résultat est indexé par les noms tels que demandés
+        self.assertEqual(normalize_value("people", [" Tom Hanks"]), (" Tom Hanks",))
+
+
+class QueryCacheWeightTest(unittest.TestCase):
+    def test_evicts_by_total_rows(self):
+        cache = QueryCache(max_entries=100, max_rows=10)
+        cache.put("a", list(range(6)))
+        cache.put("b", list(range(3)))
+        cache.put("c", list(range(4)))
+        # 6 + 3 + 4 > 10 : le plus ancien sort, malgré la place en nombre d'entrées
+        self.assertFalse(cache.get("a")[0])
+        self.assertTrue(cache.get("b")[0])
+        self.assertEqual(cache.stats()["rows"], 7)
+
+    def test_batch_results_weigh_their_rows(self):
+        cache = QueryCache(max_rows=10)
+        cache.put("batch", {"p1": list(range(5)), "p2": list(range(5))})
+        self.assertEqual(cache.stats()["rows"], 10)
+        cache.put("batch", {"p1": [1]})
+        self.assertEqual(cache.stats()["rows"], 1)
+
+    def test_oversized_result_is_not_kept(self):
+        cache = QueryCache(max_rows=10)
+        cache.put("small", [1])
+        cache.put("huge", list(range(11)))
+        self.assertFalse(cache.get("huge")[0])
+        self.assertTrue(cache.get("small")[0])
+        self.assertEqual(cache.stats()["evictions"], 0)
+
+
+class RepairVersionTest(unittest.TestCase):
+    """La réparation avant migration change la version des données si elle supprime"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(build_synthetic_db(self.directory, scale=0.05))
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.directory)
+
+    def repair(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            repair_sqlite_database(self.conn)
+        return dataset_version(self.conn)
+
+    def test_orphans_bump_version(self):
+        before = self.repair()
+        self.conn.execute(
+            "INSERT INTO principals SELECT movie_id, 99, 'nm9999999', 'actor', NULL "
+            "FROM movies LIMIT 1"
+        )
+        self.conn.commit()
+        self.assertGreater(self.repair(), before)
+
+    def test_clean_database_keeps_version(self):
+        before = self.repair()
+        self.assertEqual(self.repair(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
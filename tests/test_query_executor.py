@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from scripts.phase1_sqlite.query_executor import GRACE, QueryExecutor, sqlite_query
+from tests.fixtures import build_synthetic_db
+
+
+class QueuedDeadlineTest(unittest.TestCase):
+    """Délai compté depuis la soumission : les requêtes en file ont aussi leur résultat"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.db_path = build_synthetic_db(cls.directory, scale=0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_queued_invocations_time_out(self):
+        release = threading.Event()
+
+        def hung(conn):
+            # Calcul Python que le progress handler ne peut pas interrompre
+            release.wait(10)
+            return []
+
+        def quick(conn):
+            return conn.execute("SELECT 1").fetchall()
+
+        timeout = 0.3
+        invocations = [sqlite_query("hung", hung)] + [
+            sqlite_query(f"quick {i}", quick) for i in range(3)
+        ]
+        start = time.monotonic()
+        with QueryExecutor(self.db_path, max_workers=1, timeout=timeout) as executor:
+            results = list(executor.run(invocations))
+        elapsed = time.monotonic() - start
+        release.set()
+
+        self.assertEqual(len(results), len(invocations))
+        self.assertEqual({r["status"] for r in results}, {"timeout"})
+        self.assertLess(elapsed, timeout + GRACE + 1)
+
+    def test_fast_invocations_ok(self):
+        invocations = [
+            sqlite_query(f"Q{i}", lambda conn: conn.execute("SELECT 1").fetchall())
+            for i in range(4)
+        ]
+        with QueryExecutor(self.db_path, max_workers=2, timeout=5) as executor:
+            results = list(executor.run(invocations))
+        self.assertEqual([r["status"] for r in results], ["ok"] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
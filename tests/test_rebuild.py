@@ -0,0 +1,86 @@
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from scripts.phase1_sqlite.rebuild import rebuild
+from tests.fixtures import build_synthetic_db
+
+
+class RebuildTest(unittest.TestCase):
+    """La base en service n'est remplacée que par une base complète"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = build_synthetic_db(self.directory, scale=0.05)
+        self.csv_dir = os.path.join(self.directory, "csv")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE django_session (session_key TEXT PRIMARY KEY)")
+            conn.execute("INSERT INTO django_session VALUES ('abc')")
+        conn.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rebuild(self, csv_dir):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            rebuild(db_path=self.db_path, csv_dir=csv_dir)
+        return out.getvalue()
+
+    def movie_count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_missing_csv_keeps_live_database(self):
+        partial_dir = os.path.join(self.directory, "partial")
+        shutil.copytree(self.csv_dir, partial_dir)
+        os.remove(os.path.join(partial_dir, "ratings.csv"))
+        inode = os.stat(self.db_path).st_ino
+
+        out = self.rebuild(partial_dir)
+
+        self.assertIn("ratings.csv manquant", out)
+        self.assertEqual(os.stat(self.db_path).st_ino, inode)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["csv", "imdb.db", "partial"])
+
+    def test_complete_rebuild_keeps_django_tables(self):
+        movies = self.movie_count()
+        inode = os.stat(self.db_path).st_ino
+
+        self.rebuild(self.csv_dir)
+
+        self.assertNotEqual(os.stat(self.db_path).st_ino, inode)
+        self.assertEqual(self.movie_count(), movies)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT * FROM django_session").fetchall(), [("abc",)])
+        conn.close()
+
+    def test_open_connection_cannot_corrupt_new_version(self):
+        # Connexion Django persistante, en écriture, ouverte avant le remplacement
+        self.rebuild(self.csv_dir)
+        old = sqlite3.connect(self.db_path)
+        old.execute("SELECT COUNT(*) FROM movies").fetchone()
+        previous = os.path.realpath(self.db_path)
+
+        self.rebuild(self.csv_dir)
+        old.execute("INSERT INTO django_session VALUES ('written after swap')")
+        old.commit()
+
+        self.assertTrue(os.path.islink(self.db_path))
+        self.assertFalse(os.path.exists(previous))
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("SELECT * FROM django_session").fetchall(), [("abc",)])
+        conn.close()
+        old.close()
+
+
+if __name__ == "__main__":
+    unittest.main()